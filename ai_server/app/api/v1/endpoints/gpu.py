@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from fastapi.responses import JSONResponse
-from app.services.runpod_client import runpod_client
+from app.services.runpod_client import long_runpod_client, runpod_client
+from app.services.keepwarm_scheduler import keepwarm_scheduler
 
 router = APIRouter()
 
@@ -13,7 +14,7 @@ async def trigger_warmup():
     Trigger GPU warmup asynchronously (SYS-001).
     Returns immediately with success status.
     """
-    result = runpod_client.warmup_async()
+    result = await runpod_client.warmup_async()
 
     if result["status"] == "failed":
         return JSONResponse(
@@ -26,3 +27,27 @@ async def trigger_warmup():
         )
 
     return {"success": True, "data": {"status": "WARMING_UP"}, "error": None}
+
+
+# GET endpoint for RunPod polling statistics
+# RunPod 폴링 통계를 조회하기 위한 GET 엔드포인트
+@router.get("/stats")
+async def get_runpod_stats():
+    """
+    Return RunPod job/polling counters (runsync hits, status polls per job).
+    The long-file queue, when configured, is reported under "long_queue".
+    """
+    data = runpod_client.get_stats()
+    if long_runpod_client is not None:
+        data["long_queue"] = long_runpod_client.get_stats()
+    return {"success": True, "data": data, "error": None}
+
+
+# GET endpoint for keep-warm scheduler metrics
+# 워밍 유지 스케줄러 지표를 조회하기 위한 GET 엔드포인트
+@router.get("/keepwarm")
+async def get_keepwarm_stats():
+    """
+    Return keep-warm policy state and cold vs warm job latency.
+    """
+    return {"success": True, "data": keepwarm_scheduler.get_stats(), "error": None}
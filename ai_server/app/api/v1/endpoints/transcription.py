@@ -1,107 +1,537 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from app.schemas.transcription import TranscriptionRequest, TranscriptionResponse
+import json
+from typing import Optional, Tuple
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Path, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from starlette.datastructures import UploadFile
+from app.schemas.transcription import (
+    DecodingProfile,
+    TranscriptionRequest,
+    TranscriptionResponse,
+    TranscriptionJobResponse,
+    TranscriptionJobData,
+    TranscriptionBatchRequest,
+    TranscriptionBatchResponse,
+)
+from app.core.config import settings
 
-# Use RunPod Client
-from app.services.runpod_client import runpod_client
+# Use Transcription Service (cache -> RunPod)
+from app.services.transcription_service import transcription_service, classify_error
+from app.services.transcription_cache import transcription_cache
+from app.services.metrics import latency_metrics
+from app.services.task_store import task_store
 import re
 
 router = APIRouter()
 
+# URL format (INVALID_URL)
+url_pattern = re.compile(
+    r"^(?:http|ftp)s?://"  # http:// or https://
+    r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
+    r"localhost|"  # localhost...
+    r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
+    r"(?::\d+)?"  # optional port
+    r"(?:/?|[/?]\S+)$",
+    re.IGNORECASE,
+)
 
-# POST endpoint for transcribing audio
-# 오디오 전사를 위한 POST 엔드포인트
-@router.post("/transcriptions", response_model=TranscriptionResponse)
-async def transcribe_audio(request: TranscriptionRequest):
+# HTTP status per error code (anything else is 500)
+# 에러 코드별 HTTP 상태 코드 (그 외는 500)
+ERROR_STATUS_CODES = {
+    "CIRCUIT_OPEN": 503,
+    "AUDIO_TOO_LONG": 413,
+    "AUDIO_TOO_LARGE": 413,
+}
+
+# Supported audio extensions (UNSUPPORTED_FORMAT)
+supported_formats = [
+    ".mp3",
+    ".wav",
+    ".m4a",
+    ".flac",
+    ".ogg",
+    ".aac",
+    ".wma",
+    ".webm",
+    ".mp4",
+]
+
+
+def validate_audio_url(audio_url: str) -> Optional[Tuple[str, str]]:
     """
-    Transcribe audio from a given URL (audioUrl).
-    Returns nested response: { "data": { "text": "..." } }
+    Returns (error_code, message) if the URL cannot be transcribed, else None.
     """
-
     # 1. Validate URL Format (INVALID_URL - 400)
     # URL 형식 검증
-    url_pattern = re.compile(
-        r"^(?:http|ftp)s?://"  # http:// or https://
-        r"(?:(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+(?:[A-Z]{2,6}\.?|[A-Z0-9-]{2,}\.?)|"  # domain...
-        r"localhost|"  # localhost...
-        r"\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})"  # ...or ip
-        r"(?::\d+)?"  # optional port
-        r"(?:/?|[/?]\S+)$",
-        re.IGNORECASE,
+    if not url_pattern.match(audio_url):
+        return "INVALID_URL", "유효한 URL인지 확인하세요."
+
+    # 2. Validate File Extension (UNSUPPORTED_FORMAT - 400)
+    # 파일 확장자 검증
+    # Check if URL ends with supported extension (ignoring query params)
+    clean_url = audio_url.split("?")[0].lower()
+    if not any(clean_url.endswith(ext) for ext in supported_formats):
+        return (
+            "UNSUPPORTED_FORMAT",
+            f"지원하지 않는 오디오 포맷 ({clean_url.split('.')[-1]})",
+        )
+    return None
+
+
+# Multipart framing allowance on top of the inline size cap
+# 인라인 크기 제한에 더해 허용하는 multipart 헤더/경계 크기
+UPLOAD_FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Both request bodies of POST /transcriptions, for the OpenAPI docs
+# POST /transcriptions가 받는 두 가지 요청 본문 (OpenAPI 문서용)
+TRANSCRIPTION_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {"$ref": "#/components/schemas/TranscriptionRequest"}
+            },
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "profile": {
+                            "type": "string",
+                            "enum": ["fast", "balanced", "accurate"],
+                        },
+                    },
+                    "required": ["file"],
+                }
+            },
+        },
+    }
+}
+
+
+def _body_validation_error(error: ValidationError) -> RequestValidationError:
+    # Same 422 shape FastAPI returns for a declared body model
+    # 선언된 본문 모델에 대해 FastAPI가 반환하는 것과 같은 422 형식
+    return RequestValidationError(
+        [{**detail, "loc": ("body", *detail["loc"])} for detail in error.errors()]
+    )
+
+
+async def _read_upload(request: Request):
+    """
+    Returns (audio bytes, profile) from a multipart upload, or an error
+    JSONResponse. The form is parsed as it streams in (the file part is
+    spooled, not buffered whole) and oversized bodies are refused from
+    Content-Length before reading.
+    """
+    max_bytes = settings.TRANSCRIPTION_INLINE_MAX_BYTES
+    too_large = JSONResponse(
+        status_code=413,
+        content={
+            "success": False,
+            "data": None,
+            "error": (
+                f"AUDIO_TOO_LARGE: 직접 업로드는 최대 {max_bytes} bytes까지 가능합니다. "
+                "큰 파일은 S3에 업로드한 뒤 audioUrl로 요청하세요."
+            ),
+        },
     )
+    content_length = request.headers.get("content-length")
+    if (
+        content_length
+        and content_length.isdigit()
+        and int(content_length) > max_bytes + UPLOAD_FORM_OVERHEAD_BYTES
+    ):
+        return too_large
+
+    async with request.form(max_files=1, max_fields=4) as form:
+        upload = form.get("file")
+        if not isinstance(upload, UploadFile):
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "success": False,
+                    "data": None,
+                    "error": "INVALID_FILE: file 필드에 오디오 파일을 첨부하세요.",
+                },
+            )
 
-    if not url_pattern.match(request.audio_url):
+        # Filename extension, like the URL path check (UNSUPPORTED_FORMAT)
+        # URL 경로 검사와 동일하게 파일 확장자 검증
+        filename = (upload.filename or "").lower()
+        if not any(filename.endswith(ext) for ext in supported_formats):
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "success": False,
+                    "data": None,
+                    "error": (
+                        "UNSUPPORTED_FORMAT: "
+                        f"지원하지 않는 오디오 포맷 ({filename.split('.')[-1]})"
+                    ),
+                },
+            )
+
+        try:
+            profile = TypeAdapter(Optional[DecodingProfile]).validate_python(
+                form.get("profile") or None
+            )
+        except ValidationError as e:
+            raise _body_validation_error(e)
+
+        if upload.size is not None and upload.size > max_bytes:
+            return too_large
+        data = await upload.read()
+
+    if not data:
         return JSONResponse(
             status_code=400,
             content={
                 "success": False,
                 "data": None,
-                "error": "INVALID_URL: 유효한 URL인지 확인하세요.",
+                "error": "INVALID_FILE: 빈 파일입니다.",
             },
         )
+    return data, profile
 
-    # 2. Validate File Extension (UNSUPPORTED_FORMAT - 400)
-    # 파일 확장자 검증
-    supported_formats = [
-        ".mp3",
-        ".wav",
-        ".m4a",
-        ".flac",
-        ".ogg",
-        ".aac",
-        ".wma",
-        ".webm",
-        ".mp4",
-    ]
-    # Check if URL ends with supported extension (ignoring query params)
-    clean_url = request.audio_url.split("?")[0].lower()
-    if not any(clean_url.endswith(ext) for ext in supported_formats):
+
+# POST endpoint for transcribing audio (URL, or a short clip uploaded directly)
+# 오디오 전사를 위한 POST 엔드포인트 (URL 또는 직접 업로드한 짧은 클립)
+@router.post(
+    "/transcriptions",
+    response_model=TranscriptionResponse,
+    openapi_extra=TRANSCRIPTION_REQUEST_BODY,
+)
+async def transcribe_audio(request: Request):
+    """
+    Transcribe audio from a given URL (JSON: audioUrl), or from a file
+    uploaded as multipart/form-data (file, profile). Uploads up to
+    TRANSCRIPTION_INLINE_MAX_BYTES are sent to the worker inline, skipping
+    the S3 upload and presigned-URL download.
+    Returns nested response: { "data": { "text": "..." } }
+    """
+    upload = None
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        upload = await _read_upload(request)
+        if isinstance(upload, JSONResponse):
+            return upload
+    else:
+        try:
+            body = TranscriptionRequest.model_validate(await request.json())
+        except json.JSONDecodeError as e:
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "json_invalid",
+                        "loc": ("body", e.pos),
+                        "msg": "JSON decode error",
+                        "input": {},
+                        "ctx": {"error": e.msg},
+                    }
+                ]
+            )
+        except ValidationError as e:
+            raise _body_validation_error(e)
+
+        invalid = validate_audio_url(body.audio_url)
+        if invalid:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "success": False,
+                    "data": None,
+                    "error": f"{invalid[0]}: {invalid[1]}",
+                },
+            )
+
+    try:
+        # Call the transcription service (serves cache hits without RunPod)
+        # 전사 서비스 호출 (캐시 적중 시 RunPod 호출 생략)
+        if upload is not None:
+            data, profile = upload
+            result = await transcription_service.transcribe_upload(
+                data,
+                language="ko",  # Force Korean for backend
+                profile=profile,
+            )
+        else:
+            result = await transcription_service.transcribe(
+                audio_url=str(body.audio_url),
+                language="ko",  # Force Korean for backend
+                profile=body.profile,
+            )
+
+        # Worker-side failures (bad audio, decode errors) are not a transcript
+        # 워커 측 실패(잘못된 오디오, 디코딩 오류)는 전사 결과로 반환하지 않음
+        if "error" in result:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Transcription job failed: {result['error']}",
+            )
+
+        # Map flat result from RunPod to standard envelope structure
+        # RunPod의 플랫한 결과를 표준 응답 구조(success, data, error)로 매핑
+        return {
+            "success": True,
+            "data": {"text": result.get("text", "")},
+            "error": None,
+        }
+    except Exception as e:
+        # Handle unexpected errors with Custom Error Codes
+        error_msg = str(getattr(e, "detail", e))
+        error_code = classify_error(error_msg)
+        return JSONResponse(
+            status_code=ERROR_STATUS_CODES.get(error_code, 500),
+            content={
+                "success": False,
+                "data": None,
+                "error": f"{error_code}: {error_msg}",
+            },
+        )
+
+
+# POST endpoint for streaming partial transcripts (NDJSON)
+# 부분 전사 결과를 스트리밍하기 위한 POST 엔드포인트 (NDJSON)
+@router.post("/transcriptions/stream")
+async def transcribe_audio_stream(request: TranscriptionRequest):
+    """
+    Transcribe audio and stream results as newline-delimited JSON:
+    {"type": "segment", "start", "end", "text"} per decoded segment, then
+    {"type": "final", "text"} or {"type": "error", "error"}.
+    """
+    invalid = validate_audio_url(request.audio_url)
+    if invalid:
         return JSONResponse(
             status_code=400,
             content={
                 "success": False,
                 "data": None,
-                "error": f"UNSUPPORTED_FORMAT: 지원하지 않는 오디오 포맷 ({clean_url.split('.')[-1]})",
+                "error": f"{invalid[0]}: {invalid[1]}",
             },
         )
 
+    # Size/length limits are checked before the 200 and its headers go out
+    # 크기/길이 제한은 200 응답 헤더를 보내기 전에 검사
     try:
-        # Call the RunPod client
-        # RunPod 클라이언트 호출
-        result = runpod_client.transcribe_sync(
+        stream = await transcription_service.transcribe_stream(
             audio_url=str(request.audio_url),
             language="ko",  # Force Korean for backend
+            profile=request.profile,
+        )
+    except Exception as e:
+        error_msg = str(getattr(e, "detail", e))
+        error_code = classify_error(error_msg)
+        return JSONResponse(
+            status_code=ERROR_STATUS_CODES.get(error_code, 500),
+            content={
+                "success": False,
+                "data": None,
+                "error": f"{error_code}: {error_msg}",
+            },
         )
 
-        # Map flat result from RunPod to standard envelope structure
-        # RunPod의 플랫한 결과를 표준 응답 구조(success, data, error)로 매핑
+    async def events():
+        try:
+            async for event in stream:
+                event_type = event.get("type")
+                if event_type == "segment":
+                    line = {
+                        "type": "segment",
+                        "start": event.get("start"),
+                        "end": event.get("end"),
+                        "text": event.get("text", ""),
+                    }
+                elif event_type == "final":
+                    line = {"type": "final", "text": event.get("text", "")}
+                else:
+                    error_msg = event.get("error", "Unknown worker error")
+                    line = {
+                        "type": "error",
+                        "error": f"{classify_error(error_msg)}: {error_msg}",
+                    }
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        except Exception as e:
+            # Headers are already sent; report the failure in-band
+            # 응답 헤더가 이미 전송되었으므로 오류를 스트림 안에서 전달
+            error_msg = str(getattr(e, "detail", e))
+            line = {
+                "type": "error",
+                "error": f"{classify_error(error_msg)}: {error_msg}",
+            }
+            yield json.dumps(line, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+# POST endpoint for transcribing several clips in one RunPod job
+# 여러 클립을 하나의 RunPod 작업으로 전사하기 위한 POST 엔드포인트
+@router.post("/transcriptions/batch", response_model=TranscriptionBatchResponse)
+async def transcribe_audio_batch(request: TranscriptionBatchRequest):
+    """
+    Transcribe several audio URLs (audioUrls) in a single worker job.
+    Returns per-file results: { "data": { "results": [{ "audioUrl", "text", "error" }] } }
+    """
+    if len(request.audio_urls) > settings.TRANSCRIPTION_BATCH_MAX_FILES:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "data": None,
+                "error": (
+                    "BATCH_TOO_LARGE: 한 번에 최대 "
+                    f"{settings.TRANSCRIPTION_BATCH_MAX_FILES}개 파일까지 요청할 수 있습니다."
+                ),
+            },
+        )
+
+    for audio_url in request.audio_urls:
+        invalid = validate_audio_url(audio_url)
+        if invalid:
+            return JSONResponse(
+                status_code=400,
+                content={
+                    "success": False,
+                    "data": None,
+                    "error": f"{invalid[0]}: {invalid[1]} ({audio_url})",
+                },
+            )
+
+    try:
+        results = await transcription_service.transcribe_batch(
+            request.audio_urls,
+            language="ko",  # Force Korean for backend
+            profile=request.profile,
+        )
         return {
             "success": True,
-            "data": {"text": result.get("text", "")},
+            "data": {
+                "results": [
+                    {
+                        "audioUrl": result["audio_url"],
+                        "text": result.get("text") if "error" not in result else None,
+                        "error": (
+                            f"{classify_error(result['error'])}: {result['error']}"
+                            if "error" in result
+                            else None
+                        ),
+                    }
+                    for result in results
+                ]
+            },
             "error": None,
         }
     except Exception as e:
-        # Handle unexpected errors with Custom Error Codes
         error_msg = str(e)
-        status_code = 500
-        error_code = "STT_FAILURE"
-
-        # Analyze error message to determine specific code
-        # 에러 메시지 분석
-        if "timeout" in error_msg.lower():
-            # RunPod Timeout
-            error_code = "STT_FAILURE"  # Still server error
-        elif (
-            "download" in error_msg.lower() or "403" in error_msg or "404" in error_msg
-        ):
-            # Download failure (S3 permission, etc) - Guessing from typical error strings
-            error_code = "DOWNLOAD_FAILURE"
-
+        error_code = classify_error(error_msg)
         return JSONResponse(
-            status_code=status_code,
+            status_code=ERROR_STATUS_CODES.get(error_code, 500),
             content={
                 "success": False,
                 "data": None,
                 "error": f"{error_code}: {error_msg}",
             },
         )
+
+
+# POST endpoint for submitting a transcription job (returns immediately)
+# 전사 작업을 등록하고 즉시 반환하는 POST 엔드포인트
+@router.post(
+    "/transcriptions/jobs", response_model=TranscriptionJobResponse, status_code=202
+)
+async def submit_transcription_job(
+    request: TranscriptionRequest, background_tasks: BackgroundTasks
+):
+    """
+    [STT-002] 비동기 전사 요청
+    - 작업을 배경 작업으로 등록하고 즉시 202 Accepted와 jobId를 반환합니다.
+    - 결과는 GET /transcriptions/jobs/{jobId} 로 조회합니다.
+    """
+    invalid = validate_audio_url(request.audio_url)
+    if invalid:
+        return JSONResponse(
+            status_code=400,
+            content={
+                "success": False,
+                "data": None,
+                "error": {"code": invalid[0], "msg": invalid[1]},
+            },
+        )
+
+    job_id = transcription_service.create_job()
+    background_tasks.add_task(
+        transcription_service.transcribe_background,
+        job_id=job_id,
+        audio_url=request.audio_url,
+        language="ko",  # Force Korean for backend
+        profile=request.profile,
+    )
+
+    return TranscriptionJobResponse(
+        success=True,
+        data=TranscriptionJobData(jobId=job_id, status="PENDING"),
+        error=None,
+    )
+
+
+# GET endpoint for polling a transcription job
+# 전사 작업 상태/결과를 조회하는 GET 엔드포인트
+@router.get("/transcriptions/jobs/{jobId}", response_model=TranscriptionJobResponse)
+async def get_transcription_job(
+    job_id: str = Path(..., alias="jobId", description="전사 작업 ID"),
+):
+    """
+    [STT-003] 전사 결과 조회 (Polling)
+    - PENDING | PROCESSING | COMPLETED | FAILED
+    """
+    task_data = task_store.get_task(job_id)
+    if not task_data:
+        return JSONResponse(
+            status_code=404,
+            content={
+                "success": False,
+                "data": None,
+                "error": {
+                    "code": "TASK_NOT_FOUND",
+                    "msg": "존재하지 않거나 만료된 작업입니다.",
+                },
+            },
+        )
+
+    if task_data.get("status") == "FAILED":
+        return TranscriptionJobResponse(
+            success=False,
+            data=TranscriptionJobData(jobId=job_id, status="FAILED", result=None),
+            error=task_data.get("error"),
+        )
+
+    return TranscriptionJobResponse(
+        success=True,
+        data=TranscriptionJobData(
+            jobId=job_id,
+            status=task_data["status"],
+            result=task_data.get("result"),  # None until COMPLETED
+        ),
+        error=None,
+    )
+
+
+# GET endpoint for transcription cache statistics
+# 전사 캐시 통계를 조회하기 위한 GET 엔드포인트
+@router.get("/transcriptions/stats")
+async def get_transcription_stats():
+    """
+    Return transcription cache hit/miss, request coalescing statistics,
+    per-stage latency histograms (worker stages, RunPod queue/execution) and
+    task store usage (job and submission states kept in memory).
+    """
+    return {
+        "success": True,
+        "data": {
+            "cache": transcription_cache.get_stats(),
+            "coalescing": transcription_service.get_stats(),
+            "latency": latency_metrics.get_stats(),
+            "tasks": task_store.get_stats(),
+        },
+        "error": None,
+    }
@@ -17,9 +17,119 @@ class Settings(BaseSettings):
     # RunPod 설정
     RUNPOD_API_KEY: str = ""
     RUNPOD_ENDPOINT_ID: str = ""
+    # Override to point at the local emulator (e.g. http://127.0.0.1:8001/v2)
+    RUNPOD_BASE_URL: str = "https://api.runpod.ai/v2"
+
+    # Optional second endpoint (separate queue) for long files; empty = one queue
+    # 긴 파일 전용 엔드포인트 (별도 대기열), 비어 있으면 하나의 대기열 사용
+    RUNPOD_LONG_ENDPOINT_ID: str = ""
 
     # Timeout for polling
     RUNPOD_TIMEOUT_SECONDS: int = 600
+    # Jobs with a probed duration get max(RUNPOD_TIMEOUT_SECONDS, expected * factor)
+    # 길이를 아는 작업은 예상 시간 * factor 만큼 타임아웃을 늘림
+    RUNPOD_TIMEOUT_EXPECTED_FACTOR: float = 3.0
+
+    # RunPod HTTP connection pool / per-call timeouts
+    # RunPod HTTP 커넥션 풀 및 호출별 타임아웃
+    RUNPOD_HTTP_TIMEOUT_SECONDS: float = 30.0
+    RUNPOD_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    RUNPOD_MAX_CONNECTIONS: int = 200
+    RUNPOD_MAX_KEEPALIVE_CONNECTIONS: int = 50
+
+    # Adaptive polling: runsync fast path for short jobs, then /run + backoff
+    # 적응형 폴링: 짧은 작업은 runsync로 처리, 그 외에는 /run + 지수 백오프
+    RUNPOD_RUNSYNC_ENABLED: bool = True
+    RUNPOD_RUNSYNC_MAX_EXPECTED_SECONDS: float = 30.0
+    RUNPOD_RUNSYNC_WAIT_SECONDS: float = 60.0
+    RUNPOD_EXPECTED_JOB_SECONDS: float = 10.0
+    # Cost model for probed jobs: overhead + audio seconds * seconds per audio
+    # second (both start here and follow completed jobs)
+    # 길이를 아는 작업의 예상 시간 = 고정 오버헤드 + 오디오 길이 * 오디오 1초당 처리 시간
+    RUNPOD_EXPECTED_OVERHEAD_SECONDS: float = 3.0
+    RUNPOD_EXPECTED_SECONDS_PER_AUDIO_SECOND: float = 0.1
+    RUNPOD_POLL_MIN_INTERVAL_SECONDS: float = 0.5
+    RUNPOD_POLL_MAX_INTERVAL_SECONDS: float = 10.0
+    RUNPOD_POLL_BACKOFF_FACTOR: float = 1.5
+    # Streaming jobs poll /stream with a tighter ceiling so partial text flows
+    # 스트리밍 작업은 부분 결과가 바로 전달되도록 더 짧은 최대 간격으로 /stream 폴링
+    RUNPOD_STREAM_MAX_POLL_INTERVAL_SECONDS: float = 2.0
+
+    # Circuit breaker around RunPod (consecutive failures/timeouts)
+    # RunPod 서킷 브레이커 (연속 실패/타임아웃 기준)
+    RUNPOD_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    RUNPOD_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Hedged submission: duplicate a job stuck IN_QUEUE past the queue-delay
+    # percentile, cancel the loser
+    # 헤지 제출: 대기열 지연 백분위를 넘겨 IN_QUEUE인 작업을 중복 제출
+    RUNPOD_HEDGE_ENABLED: bool = False
+    RUNPOD_HEDGE_PERCENTILE: float = 0.95
+    RUNPOD_HEDGE_MIN_SAMPLES: int = 20
+    RUNPOD_HEDGE_DEFAULT_DELAY_SECONDS: float = 15.0
+
+    # Keep-warm scheduler for the RunPod STT worker
+    # RunPod STT 워커 워밍 유지 스케줄러
+    KEEPWARM_ENABLED: bool = False
+    KEEPWARM_TICK_SECONDS: float = 30.0
+    # Ping when the worker has been quiet this long (below RunPod idle timeout)
+    KEEPWARM_PING_INTERVAL_SECONDS: float = 240.0
+    # Arrival-rate window and minimum predicted demand worth keeping warm for
+    KEEPWARM_WINDOW_SECONDS: float = 900.0
+    KEEPWARM_MIN_RATE_PER_HOUR: float = 4.0
+    # Cost limit
+    KEEPWARM_MAX_PINGS_PER_HOUR: int = 15
+    # Queue delay above which a job counts as a cold start
+    KEEPWARM_COLD_START_THRESHOLD_SECONDS: float = 5.0
+    KEEPWARM_LATENCY_SAMPLES: int = 500
+
+    # In-memory task store (transcription jobs, solo submissions)
+    # 인메모리 작업 저장소 (전사 작업, 솔로 제출)
+    # COMPLETED / FAILED tasks are dropped this long after their last update
+    # 완료/실패 작업은 마지막 갱신 후 이 시간이 지나면 삭제
+    TASK_STORE_TTL_SECONDS: float = 3600.0
+    # Least recently used finished tasks are evicted above these limits
+    # 이 한도를 넘으면 가장 오래 사용하지 않은 완료 작업부터 제거
+    TASK_STORE_MAX_ENTRIES: int = 10000
+    TASK_STORE_MAX_BYTES: int = 64 * 1024 * 1024
+    TASK_STORE_SWEEP_SECONDS: float = 60.0
+    # Stored results at least this large are zlib-compressed
+    # 이 크기 이상의 결과는 zlib으로 압축해 저장
+    TASK_STORE_COMPRESS_MIN_BYTES: int = 1024
+
+    # Max files per batch transcription request
+    TRANSCRIPTION_BATCH_MAX_FILES: int = 10
+
+    # Transcription result cache (keyed by audio ETag / content hash)
+    # 전사 결과 캐시 (오디오 ETag / 콘텐츠 해시 기준)
+    TRANSCRIPTION_CACHE_ENABLED: bool = True
+    TRANSCRIPTION_CACHE_MAX_ENTRIES: int = 1000
+    TRANSCRIPTION_CACHE_TTL_SECONDS: float = 86400.0
+    # Optional on-disk tier (empty = memory only)
+    TRANSCRIPTION_CACHE_DIR: str = ""
+    # Objects without an ETag are hashed only up to this size
+    TRANSCRIPTION_CACHE_HASH_MAX_BYTES: int = 25 * 1024 * 1024
+    AUDIO_PROBE_TIMEOUT_SECONDS: float = 5.0
+
+    # Probe (header Range GET) before dispatch: admission and cost routing
+    # 작업 전 헤더 조회: 입력 제한 및 예상 비용 기반 라우팅
+    AUDIO_PROBE_ENABLED: bool = True
+    AUDIO_PROBE_HEADER_BYTES: int = 64 * 1024
+    # Bitrate assumed when the container does not state a duration
+    # 컨테이너에 길이 정보가 없을 때 가정하는 비트레이트
+    AUDIO_PROBE_FALLBACK_KBPS: int = 32
+    # Rejected before dispatch (duration only when read from the header)
+    # 작업 전에 거절 (길이는 헤더에서 읽은 경우에만 적용)
+    TRANSCRIPTION_MAX_AUDIO_SECONDS: float = 3600.0
+    TRANSCRIPTION_MAX_AUDIO_BYTES: int = 500 * 1024 * 1024
+    # Files at least this long go to RUNPOD_LONG_ENDPOINT_ID
+    # 이 길이 이상은 긴 파일 전용 엔드포인트로 전송
+    TRANSCRIPTION_LONG_AUDIO_SECONDS: float = 600.0
+    # Uploaded clips up to this size go to the worker inline (base64 in the
+    # job input, well under RunPod's 10 MB /run payload limit); larger files
+    # must be uploaded to S3 and sent as audioUrl
+    # 이 크기 이하의 업로드는 작업 입력에 base64로 직접 전달 (초과 시 S3 업로드 후 audioUrl 사용)
+    TRANSCRIPTION_INLINE_MAX_BYTES: int = 4 * 1024 * 1024
 
     # Gemini Configuration
     GEMINI_API_KEY: str = ""
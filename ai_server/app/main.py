@@ -1,8 +1,13 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, Security
 from fastapi.responses import JSONResponse
 from fastapi.security import APIKeyHeader
 from app.api.v1.router import api_router
 from app.core.config import settings
+from app.services.runpod_client import long_runpod_client, runpod_client
+from app.services.audio_probe import audio_probe
+from app.services.keepwarm_scheduler import keepwarm_scheduler
+from app.services.task_store import task_store
 import logging
 
 # Configure logging
@@ -12,6 +17,22 @@ logger = logging.getLogger("whoo-ai-server")
 # Swagger Auth
 api_key_header = APIKeyHeader(name="x-internal-secret", auto_error=False)
 
+
+# App lifecycle: background schedulers / task sweeper, pooled HTTP connections
+# 앱 수명주기: 백그라운드 스케줄러와 작업 정리 시작 및 종료 시 HTTP 커넥션 풀 정리
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    keepwarm_scheduler.start()
+    task_store.start()
+    yield
+    await keepwarm_scheduler.stop()
+    await task_store.stop()
+    await runpod_client.close()
+    if long_runpod_client is not None:
+        await long_runpod_client.close()
+    await audio_probe.close()
+
+
 # Initialize FastAPI app
 # FastAPI 앱 초기화
 app = FastAPI(
@@ -19,6 +40,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     root_path=settings.ROOT_PATH,
     dependencies=[Security(api_key_header)],  # Add Global Security
+    lifespan=lifespan,
 )
 
 
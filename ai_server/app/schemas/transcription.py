@@ -1,5 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, Any, List, Literal
+
+# Worker decoding profiles (speed vs accuracy)
+# 워커 디코딩 프로필 (속도 vs 정확도)
+DecodingProfile = Literal["fast", "balanced", "accurate"]
 
 
 # Request Schema for Transcription
@@ -11,6 +15,10 @@ class TranscriptionRequest(BaseModel):
     audio_url: str = Field(
         ..., alias="audioUrl", description="오디오 파일 경로 (S3 Presigned URL)"
     )
+    profile: Optional[DecodingProfile] = Field(
+        None,
+        description="디코딩 프로필 (fast: 짧은 답변용 | balanced | accurate: 기본값, 가장 정확)",
+    )
 
     class Config:
         populate_by_name = True
@@ -27,3 +35,55 @@ class TranscriptionResponse(BaseModel):
     success: bool
     data: Optional[TranscriptionData] = None
     error: Optional[str] = None
+
+
+# Inner Data Schema for asynchronous transcription jobs
+# 비동기 전사 작업 응답의 data 필드
+class TranscriptionJobData(BaseModel):
+    job_id: str = Field(..., alias="jobId")
+    status: str = Field(..., description="PENDING | PROCESSING | COMPLETED | FAILED")
+    result: Optional[TranscriptionData] = None
+
+    class Config:
+        populate_by_name = True
+
+
+# Response Schema for transcription job submit/poll (error: {"code", "msg"})
+# 전사 작업 등록/조회 응답 스키마
+class TranscriptionJobResponse(BaseModel):
+    success: bool
+    data: Optional[TranscriptionJobData] = None
+    error: Optional[Any] = None
+
+
+# Request Schema for Batch Transcription (several clips in one RunPod job)
+# 배치 전사 요청 스키마 (여러 클립을 하나의 RunPod 작업으로)
+class TranscriptionBatchRequest(BaseModel):
+    audio_urls: List[str] = Field(
+        ..., alias="audioUrls", min_length=1, description="오디오 파일 경로 목록"
+    )
+    profile: Optional[DecodingProfile] = Field(None, description="디코딩 프로필")
+
+    class Config:
+        populate_by_name = True
+
+
+# Per-file result of a batch transcription
+# 배치 전사의 파일별 결과
+class TranscriptionBatchItem(BaseModel):
+    audio_url: str = Field(..., alias="audioUrl")
+    text: Optional[str] = None
+    error: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+
+
+class TranscriptionBatchData(BaseModel):
+    results: List[TranscriptionBatchItem]
+
+
+class TranscriptionBatchResponse(BaseModel):
+    success: bool
+    data: Optional[TranscriptionBatchData] = None
+    error: Optional[str] = None
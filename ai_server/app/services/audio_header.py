@@ -0,0 +1,292 @@
+import struct
+from typing import Optional, Tuple
+
+# Container header parsing for duration estimates without downloading the
+# audio. Every parser works on the first bytes of the object (plus, for
+# Ogg and MP4, one more small range) and returns None when unsure.
+# 오디오를 내려받지 않고 컨테이너 헤더만으로 길이를 추정하는 파서 모음
+# (판단할 수 없으면 None 반환)
+
+# MPEG audio layer III bitrates (kbps) and sample rates
+MP3_BITRATES = {
+    "mpeg1": (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    "mpeg2": (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+MP3_SAMPLE_RATES = {
+    "mpeg1": (44100, 48000, 32000),
+    "mpeg2": (22050, 24000, 16000),
+    "mpeg2.5": (11025, 12000, 8000),
+}
+AAC_SAMPLE_RATES = (
+    96000, 88200, 64000, 48000, 44100, 32000, 24000,
+    22050, 16000, 12000, 11025, 8000, 7350,
+)  # fmt: skip
+
+
+# Same signatures as the worker's AudioLoader.detect_format
+# 워커 AudioLoader.detect_format과 같은 시그니처로 판별
+def detect_format(head: bytes) -> str:
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:3] == b"ID3":
+        return "mp3"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:4] == b"\x30\x26\xb2\x75":
+        return "wma"
+    if len(head) >= 2 and head[0] == 0xFF:
+        if head[1] & 0xF6 == 0xF0:
+            return "aac"
+        if head[1] & 0xE0 == 0xE0:
+            return "mp3"
+    return "unknown"
+
+
+def wav_duration(head: bytes, size: Optional[int]) -> Optional[float]:
+    pos = 12
+    byte_rate = None
+    while pos + 8 <= len(head):
+        chunk_id = head[pos : pos + 4]
+        chunk_size = int.from_bytes(head[pos + 4 : pos + 8], "little")
+        if chunk_id == b"fmt " and pos + 20 <= len(head):
+            byte_rate = int.from_bytes(head[pos + 16 : pos + 20], "little")
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed recorders leave the data size at 0 / 0xFFFFFFFF
+            # 스트리밍 녹음기는 data 크기를 0 또는 0xFFFFFFFF로 남김
+            if size is not None and (
+                chunk_size in (0, 0xFFFFFFFF) or pos + 8 + chunk_size > size
+            ):
+                chunk_size = size - (pos + 8)
+            return chunk_size / byte_rate
+        pos += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def mp3_duration(head: bytes, size: Optional[int]) -> Optional[float]:
+    pos = 0
+    if head[:3] == b"ID3" and len(head) >= 10:
+        # Syncsafe tag size (+ optional footer)
+        tag_size = (
+            (head[6] & 0x7F) << 21
+            | (head[7] & 0x7F) << 14
+            | (head[8] & 0x7F) << 7
+            | (head[9] & 0x7F)
+        )
+        pos = 10 + tag_size + (10 if head[5] & 0x10 else 0)
+
+    while pos + 4 <= len(head):
+        frame = _mp3_frame(head, pos)
+        if frame is not None:
+            break
+        pos += 1
+    else:
+        return None
+
+    version, bitrate, sample_rate, samples_per_frame, mono = frame
+    # Xing/Info (VBR or LAME CBR) and VBRI headers carry the frame count
+    # Xing/Info, VBRI 헤더에는 전체 프레임 수가 기록되어 있음
+    side_info = (17 if mono else 32) if version == "mpeg1" else (9 if mono else 17)
+    xing = pos + 4 + side_info
+    if head[xing : xing + 4] in (b"Xing", b"Info") and len(head) >= xing + 12:
+        flags = int.from_bytes(head[xing + 4 : xing + 8], "big")
+        if flags & 1:
+            frames = int.from_bytes(head[xing + 8 : xing + 12], "big")
+            return frames * samples_per_frame / sample_rate
+    vbri = pos + 4 + 32
+    if head[vbri : vbri + 4] == b"VBRI" and len(head) >= vbri + 18:
+        frames = int.from_bytes(head[vbri + 14 : vbri + 18], "big")
+        return frames * samples_per_frame / sample_rate
+
+    # Constant bitrate
+    if size is None:
+        return None
+    return (size - pos) * 8 / (bitrate * 1000)
+
+
+def _mp3_frame(head: bytes, pos: int) -> Optional[Tuple[str, int, int, int, bool]]:
+    if head[pos] != 0xFF or head[pos + 1] & 0xE0 != 0xE0:
+        return None
+    header = int.from_bytes(head[pos : pos + 4], "big")
+    version = {3: "mpeg1", 2: "mpeg2", 0: "mpeg2.5"}.get((header >> 19) & 3)
+    layer = (header >> 17) & 3
+    bitrate_index = (header >> 12) & 0xF
+    rate_index = (header >> 10) & 3
+    # Layer III only; anything else is left to the bitrate fallback
+    if version is None or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    table = "mpeg1" if version == "mpeg1" else "mpeg2"
+    return (
+        version,
+        MP3_BITRATES[table][bitrate_index],
+        MP3_SAMPLE_RATES[version][rate_index],
+        1152 if version == "mpeg1" else 576,
+        (header >> 6) & 3 == 3,
+    )
+
+
+def flac_duration(head: bytes) -> Optional[float]:
+    # STREAMINFO is always the first metadata block
+    # STREAMINFO는 항상 첫 번째 메타데이터 블록
+    if len(head) < 26 or head[4] & 0x7F != 0:
+        return None
+    info = int.from_bytes(head[18:26], "big")
+    sample_rate = info >> 44
+    total_samples = info & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def aac_duration(head: bytes, size: Optional[int]) -> Optional[float]:
+    # ADTS has no global header: average the frame length over the head
+    # ADTS는 전체 헤더가 없으므로 앞부분 프레임의 평균 길이로 추정
+    if size is None:
+        return None
+    pos, frames, sample_rate = 0, 0, None
+    while pos + 7 <= len(head) and head[pos] == 0xFF and head[pos + 1] & 0xF6 == 0xF0:
+        rate_index = (head[pos + 2] >> 2) & 0xF
+        if rate_index >= len(AAC_SAMPLE_RATES):
+            return None
+        sample_rate = AAC_SAMPLE_RATES[rate_index]
+        length = (head[pos + 3] & 3) << 11 | head[pos + 4] << 3 | head[pos + 5] >> 5
+        if length < 7:
+            return None
+        pos += length
+        frames += 1
+    if not frames:
+        return None
+    return size / (pos / frames) * 1024 / sample_rate
+
+
+def webm_duration(head: bytes) -> Optional[float]:
+    # Segment Info: TimecodeScale (2AD7B1) and Duration (4489), before the
+    # first Cluster. MediaRecorder output often has no Duration at all.
+    # MediaRecorder로 녹음한 파일은 Duration이 없는 경우가 많음
+    cluster = head.find(b"\x1f\x43\xb6\x75")
+    info = head[: cluster if cluster >= 0 else len(head)]
+
+    scale = 1_000_000
+    found = _ebml_element(info, b"\x2a\xd7\xb1")
+    if found is not None:
+        scale = int.from_bytes(found, "big") or scale
+
+    found = _ebml_element(info, b"\x44\x89")
+    if found is None or len(found) not in (4, 8):
+        return None
+    value = struct.unpack(">f" if len(found) == 4 else ">d", found)[0]
+    return value * scale / 1e9 if value > 0 else None
+
+
+def _ebml_element(data: bytes, element_id: bytes) -> Optional[bytes]:
+    pos = data.find(element_id)
+    if pos < 0 or pos + len(element_id) >= len(data):
+        return None
+    pos += len(element_id)
+    first = data[pos]
+    length = next((i + 1 for i in range(8) if first & (0x80 >> i)), None)
+    if length is None or pos + length > len(data):
+        return None
+    value = first & (0xFF >> length)
+    for byte in data[pos + 1 : pos + length]:
+        value = value << 8 | byte
+    pos += length
+    if pos + value > len(data):
+        return None
+    return data[pos : pos + value]
+
+
+def ogg_duration(head: bytes, tail: bytes) -> Optional[float]:
+    # Last page granule position / sample rate from the first (ident) header
+    # 마지막 페이지의 granule 위치 / 첫 헤더의 샘플레이트
+    last_page = tail.rfind(b"OggS")
+    if last_page < 0 or last_page + 14 > len(tail):
+        return None
+    granule = int.from_bytes(tail[last_page + 6 : last_page + 14], "little")
+
+    opus = head.find(b"OpusHead")
+    if opus >= 0 and opus + 12 <= len(head):
+        pre_skip = int.from_bytes(head[opus + 10 : opus + 12], "little")
+        return max(granule - pre_skip, 0) / 48000
+    vorbis = head.find(b"\x01vorbis")
+    if vorbis >= 0 and vorbis + 16 <= len(head):
+        sample_rate = int.from_bytes(head[vorbis + 12 : vorbis + 16], "little")
+        return granule / sample_rate if sample_rate else None
+    return None
+
+
+def mp4_duration(data: bytes, offset: int) -> Tuple[Optional[float], Optional[int]]:
+    """
+    Walks top-level boxes of `data` (read from absolute `offset`).
+    Returns (duration, None) once moov/mvhd is found, or (None, next_offset)
+    when the next top-level box starts beyond `data` (moov after mdat).
+    """
+    pos = 0
+    while pos + 8 <= len(data):
+        box_size = int.from_bytes(data[pos : pos + 4], "big")
+        box_type = data[pos + 4 : pos + 8]
+        header = 8
+        if box_size == 1 and pos + 16 <= len(data):
+            box_size = int.from_bytes(data[pos + 8 : pos + 16], "big")
+            header = 16
+        if box_type == b"moov":
+            mvhd = data.find(b"mvhd", pos + header)
+            if mvhd < 0 or mvhd + 36 > len(data):
+                return None, offset + pos
+            if data[mvhd + 4] == 1:
+                timescale = int.from_bytes(data[mvhd + 24 : mvhd + 28], "big")
+                duration = int.from_bytes(data[mvhd + 28 : mvhd + 36], "big")
+            else:
+                timescale = int.from_bytes(data[mvhd + 16 : mvhd + 20], "big")
+                duration = int.from_bytes(data[mvhd + 20 : mvhd + 24], "big")
+            return (duration / timescale if timescale else None), None
+        if box_size < header:
+            # size 0 (box runs to EOF) or corrupt: no moov after it
+            return None, None
+        pos += box_size
+    return None, offset + pos
+
+
+def parse_duration(head: bytes, size: Optional[int]) -> Tuple[str, Optional[float]]:
+    """
+    Returns (format, duration seconds or None) for formats whose duration can
+    be read from the first bytes. Ogg and MP4 need extra ranges (see
+    AudioProbe.probe).
+    """
+    audio_format = detect_format(head)
+    parsers = {
+        "wav": lambda: wav_duration(head, size),
+        "mp3": lambda: mp3_duration(head, size),
+        "flac": lambda: flac_duration(head),
+        "aac": lambda: aac_duration(head, size),
+        "webm": lambda: webm_duration(head),
+    }
+    parser = parsers.get(audio_format)
+    try:
+        return audio_format, parser() if parser else None
+    except (IndexError, ValueError, struct.error, ZeroDivisionError):
+        return audio_format, None
+
+
+def parse_duration_bytes(data: bytes) -> Tuple[str, Optional[float]]:
+    """
+    parse_duration() for a whole file already in memory (inline uploads):
+    Ogg and MP4 are read from the same bytes instead of extra ranges.
+    """
+    audio_format, duration = parse_duration(data, len(data))
+    if duration is None:
+        try:
+            if audio_format == "mp4":
+                duration, _ = mp4_duration(data, 0)
+            elif audio_format == "ogg":
+                duration = ogg_duration(data, data[-65536:])
+        except (IndexError, ValueError, struct.error, ZeroDivisionError):
+            duration = None
+    return audio_format, duration
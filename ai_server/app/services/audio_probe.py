@@ -0,0 +1,210 @@
+import hashlib
+import logging
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
+
+from app.core.config import settings
+from app.services.audio_header import mp4_duration, ogg_duration, parse_duration
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only sign or expire a presigned URL (S3, GCS,
+# CloudFront, Azure SAS); everything else in the query names the object
+# 서명/만료 전용 쿼리 파라미터 (S3, GCS, CloudFront, Azure SAS), 나머지는 객체를 구분함
+SIGNING_PARAM_PREFIXES = ("x-amz-", "x-goog-")
+SIGNING_PARAMS = {
+    "awsaccesskeyid",
+    "signature",
+    "expires",
+    "googleaccessid",
+    "policy",
+    "key-pair-id",
+    "sig",
+    "se",
+    "st",
+    "sp",
+    "sv",
+    "sr",
+    "spr",
+    "skoid",
+    "sktid",
+    "skt",
+    "ske",
+    "sks",
+    "skv",
+}
+
+
+def normalize_url(url: str) -> str:
+    """
+    The URL without its signing params, so a re-signed presigned URL for the
+    same object normalizes to the same string.
+    """
+    parts = urlsplit(url)
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in SIGNING_PARAMS
+        and not name.lower().startswith(SIGNING_PARAM_PREFIXES)
+    )
+    normalized = f"{parts.scheme}://{parts.netloc.lower()}{parts.path}"
+    return f"{normalized}?{urlencode(query)}" if query else normalized
+
+
+def _strong_etag(value: Optional[str]) -> Optional[str]:
+    # Weak ETags (W/"...") only promise equivalent content, not the same
+    # bytes, so they are not used as an identity
+    # 약한 ETag(W/"...")는 동일한 바이트를 보장하지 않으므로 식별자로 쓰지 않음
+    if not value or value.startswith("W/"):
+        return None
+    return value.strip('"') or None
+
+
+class AudioProbe:
+    """
+    Lightweight inspection of remote audio objects.
+    - Presigned S3 URLs are signed for GET only, so metadata is read with a
+      one-byte Range GET instead of HEAD.
+    - Identity is derived from the URL without its signing params + ETag +
+      size, so the same object under a new signature resolves to the same key.
+    - Duration is estimated from the container header in the first bytes
+      (plus one small extra range for Ogg / MP4 with moov at the end).
+    """
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=settings.AUDIO_PROBE_TIMEOUT_SECONDS,
+                follow_redirects=True,
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    async def head(self, url: str) -> dict:
+        """
+        Fetch object metadata (etag, size, content_type) via a Range GET.
+        """
+        meta, _ = await self._read_range(url, "0-0", 1)
+        return meta
+
+    async def probe(self, url: str) -> Optional[dict]:
+        """
+        Object metadata plus format and estimated duration, read from the
+        header bytes. duration_source is "header" when the container states
+        it, "bitrate" when it is guessed from the size. None if the probe fails.
+        """
+        try:
+            limit = settings.AUDIO_PROBE_HEADER_BYTES
+            meta, head = await self._read_range(url, f"0-{limit - 1}", limit)
+            size = meta["size"]
+            audio_format, duration = parse_duration(head, size)
+
+            if audio_format == "ogg" and size:
+                _, tail = await self._read_range(url, f"-{limit}", limit)
+                duration = ogg_duration(head, tail)
+            elif audio_format == "mp4":
+                duration, next_offset = mp4_duration(head, 0)
+                # moov after mdat: hop over top-level boxes with small ranges
+                # moov가 mdat 뒤에 있으면 작은 Range 요청으로 박스를 건너뜀
+                for _ in range(4):
+                    if next_offset is None or (size and next_offset >= size):
+                        break
+                    _, data = await self._read_range(
+                        url, f"{next_offset}-{next_offset + 4095}", 4096
+                    )
+                    duration, next_offset = mp4_duration(data, next_offset)
+
+            source = "header" if duration is not None else None
+            if duration is None and size:
+                duration = size * 8 / (settings.AUDIO_PROBE_FALLBACK_KBPS * 1000)
+                source = "bitrate"
+            return {
+                **meta,
+                "format": audio_format,
+                "duration_seconds": round(duration, 3) if duration else None,
+                "duration_source": source,
+            }
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Audio probe failed: {e}")
+            return None
+
+    async def _read_range(
+        self, url: str, byte_range: str, limit: int
+    ) -> Tuple[dict, bytes]:
+        # Streamed so a server that ignores Range never sends the whole object
+        # Range를 무시하는 서버라도 전체 객체를 받지 않도록 스트리밍으로 읽음
+        body = bytearray()
+        async with self._get_client().stream(
+            "GET", url, headers={"Range": f"bytes={byte_range}"}
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                body.extend(chunk)
+                if len(body) >= limit:
+                    break
+
+        size = None
+        content_range = response.headers.get("content-range", "")
+        if "/" in content_range and not content_range.endswith("/*"):
+            size = int(content_range.rsplit("/", 1)[1])
+        elif response.status_code == 200 and response.headers.get("content-length"):
+            # Server ignored the Range header and returned the full object
+            size = int(response.headers["content-length"])
+
+        meta = {
+            "etag": _strong_etag(response.headers.get("etag")),
+            "size": size,
+            "content_type": response.headers.get("content-type"),
+        }
+        return meta, bytes(body[:limit])
+
+    async def identify(self, url: str, meta: Optional[dict] = None) -> Optional[str]:
+        """
+        Returns a content identity key for the audio, or None if unknown.
+        1. Normalized URL + strong ETag + size from object metadata
+           (no body download)
+        2. SHA-256 of the body for small objects without an ETag
+        `meta` from a previous probe() saves the metadata request.
+        """
+        try:
+            meta = meta or await self.head(url)
+            if meta["etag"] and meta["size"] is not None:
+                # Web servers derive ETags from mtime + size, which can repeat
+                # across files, so the object's URL is part of the identity
+                # 웹 서버 ETag는 mtime+크기로 만들어져 파일 간 겹칠 수 있어 URL도 포함
+                return f"etag:{normalize_url(url)}:{meta['etag']}:{meta['size']}"
+
+            if (
+                meta["size"] is not None
+                and meta["size"] > settings.TRANSCRIPTION_CACHE_HASH_MAX_BYTES
+            ):
+                return None
+            return await self._content_hash(url)
+
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Audio probe failed, skipping identity: {e}")
+            return None
+
+    async def _content_hash(self, url: str) -> Optional[str]:
+        digest = hashlib.sha256()
+        received = 0
+        async with self._get_client().stream("GET", url) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                received += len(chunk)
+                if received > settings.TRANSCRIPTION_CACHE_HASH_MAX_BYTES:
+                    return None
+                digest.update(chunk)
+        return f"sha256:{digest.hexdigest()}"
+
+
+audio_probe = AudioProbe()
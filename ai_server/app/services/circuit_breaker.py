@@ -0,0 +1,92 @@
+import logging
+import time
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    - CLOSED: calls pass through; N consecutive failures open the circuit.
+    - OPEN: calls fail fast (503 CIRCUIT_OPEN) until reset_timeout elapses.
+    - HALF_OPEN: a single trial call is let through; its outcome closes or
+      re-opens the circuit.
+    """
+
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def before_call(self):
+        """
+        Raises HTTPException(503) if the call must not be attempted.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+
+        self._stats["rejected"] += 1
+        retry_after = max(self.reset_timeout - (time.monotonic() - self._opened_at), 0)
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                f"CIRCUIT_OPEN: {self.name} is unavailable, "
+                f"retry after {retry_after:.0f}s"
+            ),
+        )
+
+    def record_success(self):
+        self._failures = 0
+        self._trial_in_flight = False
+        if self._state != self.CLOSED:
+            logger.info(f"Circuit {self.name} closed.")
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self._failures += 1
+        self._trial_in_flight = False
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self._stats["opened"] += 1
+                logger.warning(
+                    f"Circuit {self.name} opened after {self._failures} failures."
+                )
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """
+        Call finished without a verdict (e.g. cancelled): free the trial slot.
+        """
+        self._trial_in_flight = False
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "state": self.state,
+            "consecutive_failures": self._failures,
+        }
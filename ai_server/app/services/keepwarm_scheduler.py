@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.metrics import percentile
+from app.services.runpod_client import runpod_client
+
+logger = logging.getLogger(__name__)
+
+# Weight of the newest hour in the hour-of-day demand profile
+# 시간대별 수요 프로파일에서 최신 한 시간의 가중치
+PROFILE_ALPHA = 0.3
+
+
+class KeepWarmScheduler:
+    """
+    Background keep-warm policy for the RunPod STT worker.
+    - Tracks transcription arrivals (recent window + hour-of-day profile).
+    - Sends warmup pings before the worker's idle timeout while demand is
+      current or predicted for the next hour; stays quiet when idle.
+    - Caps pings per hour as a cost limit.
+    - Classifies finished jobs as cold/warm from RunPod's queue delay.
+    """
+
+    def __init__(self):
+        self._arrivals: Deque[float] = deque()
+        self._pings: Deque[float] = deque()
+        self._last_activity = 0.0
+        # Smoothed arrivals-per-hour for each hour of the day
+        self._hourly_profile: List[float] = [0.0] * 24
+        self._current_hour: Optional[int] = None
+        self._current_hour_count = 0
+
+        self._latencies: Dict[str, Deque[float]] = {
+            "cold": deque(maxlen=settings.KEEPWARM_LATENCY_SAMPLES),
+            "warm": deque(maxlen=settings.KEEPWARM_LATENCY_SAMPLES),
+        }
+        self._stats = {
+            "pings_sent": 0,
+            "pings_failed": 0,
+            "skipped_idle": 0,
+            "skipped_budget": 0,
+            "cold_jobs": 0,
+            "warm_jobs": 0,
+        }
+        self._task: Optional[asyncio.Task] = None
+        runpod_client.add_listener(self.record_job)
+
+    def start(self):
+        if not settings.KEEPWARM_ENABLED or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info("Keep-warm scheduler started.")
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record_arrival(self):
+        """
+        Called for every transcription that needs the GPU worker.
+        """
+        now = time.time()
+        self._arrivals.append(now)
+        self._last_activity = now
+        self._roll_profile(now)
+        self._current_hour_count += 1
+
+    def record_job(self, job_data: dict, elapsed: float):
+        """
+        RunPod client listener: classify the job as cold or warm start.
+        """
+        delay_ms = job_data.get("delayTime")
+        if delay_ms is None:
+            return
+        self._last_activity = time.time()
+        kind = (
+            "cold"
+            if delay_ms / 1000 >= settings.KEEPWARM_COLD_START_THRESHOLD_SECONDS
+            else "warm"
+        )
+        self._latencies[kind].append(elapsed)
+        self._stats[f"{kind}_jobs"] += 1
+
+    async def _run(self):
+        while True:
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Keep-warm tick failed: {e}")
+            await asyncio.sleep(settings.KEEPWARM_TICK_SECONDS)
+
+    async def _tick(self):
+        now = time.time()
+        self._roll_profile(now)
+        self._trim(now)
+
+        # Worker is still warm from recent traffic or a recent ping
+        if now - self._last_activity < settings.KEEPWARM_PING_INTERVAL_SECONDS:
+            return
+
+        if self.predicted_rate_per_hour(now) < settings.KEEPWARM_MIN_RATE_PER_HOUR:
+            self._stats["skipped_idle"] += 1
+            return
+
+        if len(self._pings) >= settings.KEEPWARM_MAX_PINGS_PER_HOUR:
+            self._stats["skipped_budget"] += 1
+            return
+
+        result = await runpod_client.warmup_async()
+        if result["status"] == "failed":
+            self._stats["pings_failed"] += 1
+            return
+        self._pings.append(now)
+        self._last_activity = now
+        self._stats["pings_sent"] += 1
+
+    def current_rate_per_hour(self, now: Optional[float] = None) -> float:
+        now = now or time.time()
+        self._trim(now)
+        return len(self._arrivals) * 3600 / settings.KEEPWARM_WINDOW_SECONDS
+
+    def predicted_rate_per_hour(self, now: Optional[float] = None) -> float:
+        """
+        Expected demand: the larger of the recent arrival rate and the
+        historical rate for this hour and the next one.
+        """
+        now = now or time.time()
+        hour = datetime.fromtimestamp(now).hour
+        historical = max(
+            self._hourly_profile[hour], self._hourly_profile[(hour + 1) % 24]
+        )
+        return max(self.current_rate_per_hour(now), historical)
+
+    def _trim(self, now: float):
+        while (
+            self._arrivals
+            and now - self._arrivals[0] > settings.KEEPWARM_WINDOW_SECONDS
+        ):
+            self._arrivals.popleft()
+        while self._pings and now - self._pings[0] > 3600:
+            self._pings.popleft()
+
+    def _roll_profile(self, now: float):
+        # Fold the finished hour's count into the hour-of-day profile
+        hour = datetime.fromtimestamp(now).hour
+        if self._current_hour is None:
+            self._current_hour = hour
+        elif hour != self._current_hour:
+            previous = self._hourly_profile[self._current_hour]
+            self._hourly_profile[self._current_hour] = (
+                PROFILE_ALPHA * self._current_hour_count
+                + (1 - PROFILE_ALPHA) * previous
+            )
+            self._current_hour = hour
+            self._current_hour_count = 0
+
+    def get_stats(self) -> dict:
+        now = time.time()
+        latency = {}
+        for kind, values in self._latencies.items():
+            samples = list(values)
+            latency[kind] = {
+                "count": len(samples),
+                "avg": sum(samples) / len(samples) if samples else None,
+                "p50": percentile(samples, 0.5),
+                "p95": percentile(samples, 0.95),
+            }
+        return {
+            **self._stats,
+            "enabled": settings.KEEPWARM_ENABLED,
+            "current_rate_per_hour": self.current_rate_per_hour(now),
+            "predicted_rate_per_hour": self.predicted_rate_per_hour(now),
+            "pings_last_hour": len(self._pings),
+            "latency_seconds": latency,
+        }
+
+
+keepwarm_scheduler = KeepWarmScheduler()
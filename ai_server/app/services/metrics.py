@@ -0,0 +1,85 @@
+from bisect import bisect_left
+from collections import deque
+from typing import Deque, Dict, Optional, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    """
+    Nearest-rank percentile (q in [0, 1]); None for an empty sample.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+# Upper bucket bounds in seconds (the last bucket is open-ended)
+# 히스토그램 버킷 상한(초), 마지막 버킷은 상한 없음
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram plus a bounded window of recent samples for
+    percentiles.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS, window: int = 1000):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._recent: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self._recent.append(value)
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound:g}" for bound in self.buckets] + ["inf"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "p50": percentile(self._recent, 0.5),
+            "p95": percentile(self._recent, 0.95),
+            "p99": percentile(self._recent, 0.99),
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class LatencyMetrics:
+    """
+    Named latency histograms for transcription jobs: worker stages (download,
+    decode, language detection, decoding, ...), RunPod queue delay and
+    execution time, and the real-time factor.
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def observe(self, name: str, value: Optional[float]):
+        if value is None:
+            return
+        if name not in self._histograms:
+            self._histograms[name] = LatencyHistogram()
+        self._histograms[name].observe(value)
+
+    def observe_result(self, result: dict):
+        """
+        Record the "timings" and "real_time_factor" of one transcription result.
+        """
+        for stage, seconds in (result.get("timings") or {}).items():
+            self.observe(stage, seconds)
+        self.observe("real_time_factor", result.get("real_time_factor"))
+
+    def get_stats(self) -> dict:
+        return {
+            name: histogram.snapshot()
+            for name, histogram in sorted(self._histograms.items())
+        }
+
+
+latency_metrics = LatencyMetrics()
@@ -1,61 +1,506 @@
-import requests
+import asyncio
+import base64
 import time
+from collections import deque
+from typing import AsyncIterator, Callable, Deque, List, Optional
+
+import httpx
 
 from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.metrics import latency_metrics, percentile
 from fastapi import HTTPException
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Weight of the newest sample in the job duration moving average
+# 작업 소요 시간 이동 평균에서 최신 샘플의 가중치
+EWMA_ALPHA = 0.2
+
 
 # Service to interact with RunPod Serverless API
 # RunPod Serverless API와 상호작용하는 서비스
 class RunPodClient:
-    def __init__(self):
+    def __init__(self, endpoint_id: Optional[str] = None, name: str = "runpod"):
+        self.name = name
         self.api_key = settings.RUNPOD_API_KEY
-        self.endpoint_id = settings.RUNPOD_ENDPOINT_ID
-        self.base_url = f"https://api.runpod.ai/v2/{self.endpoint_id}"
+        self.endpoint_id = endpoint_id or settings.RUNPOD_ENDPOINT_ID
+        self.base_url = f"{settings.RUNPOD_BASE_URL.rstrip('/')}/{self.endpoint_id}"
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
+        # Shared keep-alive pool, created lazily inside the running event loop
+        # 이벤트 루프 안에서 지연 생성되는 공유 keep-alive 커넥션 풀
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # Moving average of end-to-end job duration, used to pace polling
+        # 폴링 간격 조절에 사용하는 작업 소요 시간 이동 평균
+        self._expected_job_seconds = settings.RUNPOD_EXPECTED_JOB_SECONDS
+        # Cost model for jobs with a probed audio duration (moving averages)
+        # 오디오 길이를 아는 작업의 비용 모델 (이동 평균)
+        self._overhead_seconds = settings.RUNPOD_EXPECTED_OVERHEAD_SECONDS
+        self._seconds_per_audio_second = (
+            settings.RUNPOD_EXPECTED_SECONDS_PER_AUDIO_SECOND
+        )
+
+        # Callbacks notified with (status payload, wall seconds) per completed job
+        # 완료된 작업마다 (상태 페이로드, 소요 시간)을 전달받는 콜백 목록
+        self._listeners: List[Callable[[dict, float], None]] = []
+
+        # Fail fast when the endpoint keeps failing or timing out
+        # 엔드포인트가 연속으로 실패/타임아웃되면 즉시 실패 처리
+        self.circuit_breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.RUNPOD_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.RUNPOD_CIRCUIT_RESET_SECONDS,
+        )
+
+        # Recent queue delays (seconds), used to pick the hedge delay
+        # 헤지 제출 시점을 정하기 위한 최근 대기열 지연 시간(초)
+        self._queue_delays: Deque[float] = deque(maxlen=200)
+
+        # Polling counters
+        # 폴링 통계
+        self._stats = {
+            "jobs": 0,
+            "runsync_completed": 0,
+            "polled_jobs": 0,
+            "status_polls": 0,
+            "max_polls_per_job": 0,
+            "hedged_jobs": 0,
+            "hedge_wins": 0,
+            "streamed_jobs": 0,
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=self.headers,
+                timeout=httpx.Timeout(
+                    settings.RUNPOD_HTTP_TIMEOUT_SECONDS,
+                    connect=settings.RUNPOD_CONNECT_TIMEOUT_SECONDS,
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.RUNPOD_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.RUNPOD_MAX_KEEPALIVE_CONNECTIONS,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        """
+        Close the pooled HTTP connections (called on app shutdown).
+        앱 종료 시 풀링된 HTTP 커넥션을 정리합니다.
+        """
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
 
-    # Helper method to run sync or async request
-    # RunPod 요청을 보내고 결과를 기다리는 메서드
-    def transcribe_sync(self, audio_url: str, language: str = None) -> dict:
+    # Submit a transcription job and wait for its result without blocking the loop
+    # 이벤트 루프를 막지 않고 전사 작업을 제출한 뒤 결과를 기다리는 메서드
+    # (audio_data: clip bytes sent inline instead of audio_url)
+    # (audio_data: URL 대신 작업 입력에 직접 담아 보내는 클립 바이트)
+    async def transcribe(
+        self,
+        audio_url: Optional[str] = None,
+        language: Optional[str] = None,
+        timeout: Optional[float] = None,
+        expected_seconds: Optional[float] = None,
+        profile: Optional[str] = None,
+        audio_data: Optional[bytes] = None,
+    ) -> dict:
         if not self.endpoint_id or not self.api_key:
             # For local testing without RunPod keys, mock it or raise error
             # RunPod 키 없이 로컬 테스트 시 모의(Mock) 처리 또는 오류 발생
             logger.warning("RunPod credentials not set. Returning mock response.")
             return self._mock_response(audio_url)
 
-        payload = {"input": {"audio_url": audio_url, "language": language}}
+        payload = {"input": {"language": language, "profile": profile}}
+        if audio_data is not None:
+            payload["input"]["audio_base64"] = base64.b64encode(audio_data).decode()
+        else:
+            payload["input"]["audio_url"] = audio_url
+        return await self._run_job(payload, timeout, expected_seconds)
+
+    # Submit several clips as one job (one queue/dispatch/model overhead)
+    # 여러 클립을 하나의 작업으로 제출 (대기열/디스패치/모델 오버헤드 1회)
+    async def transcribe_batch(
+        self,
+        audio_urls: List[str],
+        language: Optional[str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[str] = None,
+        expected_seconds: Optional[float] = None,
+    ) -> List[dict]:
+        if not self.endpoint_id or not self.api_key:
+            logger.warning("RunPod credentials not set. Returning mock response.")
+            return [
+                {"audio_url": url, **self._mock_response(url)} for url in audio_urls
+            ]
+
+        payload = {
+            "input": {
+                "audio_urls": audio_urls,
+                "language": language,
+                "profile": profile,
+            }
+        }
+        output = await self._run_job(
+            payload,
+            timeout,
+            expected_seconds=(
+                expected_seconds or self._expected_job_seconds * len(audio_urls)
+            ),
+        )
+        return output["results"]
+
+    async def _run_job(
+        self,
+        payload: dict,
+        timeout: Optional[float] = None,
+        expected_seconds: Optional[float] = None,
+    ) -> dict:
+        timeout = timeout or settings.RUNPOD_TIMEOUT_SECONDS
+        expected = expected_seconds or self._expected_job_seconds
+
+        # Fail fast while the endpoint is known to be degraded
+        # 엔드포인트 장애가 감지된 동안에는 즉시 실패 처리
+        self.circuit_breaker.before_call()
+        started = time.monotonic()
+        self._stats["jobs"] += 1
+        verdict = False
 
         try:
-            # 1. Run Job (Sync run)
-            # 1. 작업 실행 (동기 실행 요청)
-            # Using 'runsync' endpoint for waiting connection, or 'run' for async.
-            # 'runsync' is easier for immediate response if duration is short (< 90s).
-            # For longer, use 'run' and poll. Assuming 'run' for robustness.
-            run_url = f"{self.base_url}/run"
+            # 1. Short jobs: try 'runsync' first, which returns the output directly
+            # 1. 짧은 작업: 결과를 바로 돌려주는 'runsync'를 먼저 시도
+            if (
+                settings.RUNPOD_RUNSYNC_ENABLED
+                and expected <= settings.RUNPOD_RUNSYNC_MAX_EXPECTED_SECONDS
+            ):
+                job_data = await self._submit_runsync(payload, timeout)
+            else:
+                # 2. Long jobs: plain 'run' and poll for status
+                # 2. 긴 작업: 'run' 후 상태 폴링
+                job_data = await self._submit_run(payload)
 
-            logger.info(f"Sending job to RunPod: {run_url}")
-            response = requests.post(run_url, headers=self.headers, json=payload)
-            response.raise_for_status()
+            if job_data.get("status") == "COMPLETED":
+                self._stats["runsync_completed"] += 1
+            else:
+                self._check_failed(job_data)
+                job_id = job_data["id"]
+                logger.info(f"Job started with ID: {job_id}. Polling for status...")
+                remaining = timeout - (time.monotonic() - started)
+                job_data = await self._await_job(
+                    job_id, payload, remaining, expected, started
+                )
 
-            job_data = response.json()
-            job_id = job_data["id"]
+            # A streaming worker reports its failure as the last item of a
+            # COMPLETED job; treat it like a FAILED one
+            # 스트리밍 워커의 실패는 COMPLETED 작업의 마지막 항목으로 오므로 FAILED와 동일하게 처리
+            output = self._unwrap_output(job_data["output"])
+            if isinstance(output, dict) and "error" in output:
+                logger.error(f"Job failed: {output['error']}")
+                self.circuit_breaker.record_failure()
+                verdict = True
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Transcription job failed: {output['error']}",
+                )
+
+            self.circuit_breaker.record_success()
+            verdict = True
 
-            logger.info(f"Job started with ID: {job_id}. Polling for status...")
-            return self._poll_status(job_id)
+            elapsed = time.monotonic() - started
+            self._record_duration(elapsed)
+            self._notify_listeners(job_data, elapsed)
+            self._record_timings(output, job_data, elapsed)
+            return output
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"RunPod internal error: {e}")
+            self.circuit_breaker.record_failure()
+            verdict = True
             raise HTTPException(
                 status_code=502, detail=f"RunPod communication error: {str(e)}"
             )
+        except HTTPException as e:
+            # Timeouts count against the endpoint; a FAILED job means the
+            # endpoint itself answered (e.g. bad audio)
+            # 타임아웃은 엔드포인트 장애로, FAILED 작업은 정상 응답으로 간주
+            if verdict:
+                raise
+            if e.status_code == 504:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            verdict = True
+            raise
+        finally:
+            if not verdict:
+                self.circuit_breaker.release()
+
+    # Stream partial results of a job as the worker yields them
+    # 워커가 생성하는 부분 결과를 순서대로 전달하는 비동기 제너레이터
+    async def stream_transcribe(
+        self,
+        audio_url: str,
+        language: Optional[str] = None,
+        timeout: Optional[float] = None,
+        profile: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Submit a streaming job and yield the worker's events as they arrive
+        ({"type": "segment"} ..., then {"type": "final"} or {"type": "error"}).
+        Requires the worker to run stream_handler. If the caller stops
+        iterating, the RunPod job is cancelled.
+        """
+        if not self.endpoint_id or not self.api_key:
+            logger.warning("RunPod credentials not set. Returning mock response.")
+            yield {"type": "final", **self._mock_response(audio_url)}
+            return
+
+        timeout = timeout or settings.RUNPOD_TIMEOUT_SECONDS
+        payload = {
+            "input": {
+                "audio_url": audio_url,
+                "language": language,
+                "profile": profile,
+                "stream": True,
+            }
+        }
+
+        self.circuit_breaker.before_call()
+        started = time.monotonic()
+        self._stats["jobs"] += 1
+        self._stats["streamed_jobs"] += 1
+        verdict = False
+        job_id = None
+        finished = False
+        terminal = False
+
+        try:
+            job_id = (await self._submit_run(payload))["id"]
+            logger.info(f"Streaming job started with ID: {job_id}.")
+            stream_url = f"{self.base_url}/stream/{job_id}"
+            interval = settings.RUNPOD_POLL_MIN_INTERVAL_SECONDS
+
+            while True:
+                remaining = timeout - (time.monotonic() - started)
+                if remaining <= 0:
+                    raise HTTPException(
+                        status_code=504, detail="Transcription job timed out"
+                    )
+                await asyncio.sleep(min(interval, remaining))
+
+                response = await self._get_client().get(stream_url)
+                response.raise_for_status()
+                data = response.json()
+
+                items = data.get("stream") or []
+                for item in items:
+                    output = item.get("output")
+                    if isinstance(output, dict) and output.get("type") == "final":
+                        latency_metrics.observe_result(output)
+                        latency_metrics.observe(
+                            "round_trip", time.monotonic() - started
+                        )
+                    if isinstance(output, dict) and output.get("type") in (
+                        "final",
+                        "error",
+                    ):
+                        terminal = True
+                    yield output
+
+                if data.get("status") == "COMPLETED":
+                    finished = True
+                    if not terminal:
+                        # A worker without stream_handler yields nothing to
+                        # /stream; its result is only in /status
+                        # stream_handler가 없는 워커는 /stream에 아무것도 내보내지
+                        # 않으므로 /status의 결과를 최종 결과로 전달
+                        result = await self._stream_result(job_id)
+                        if result["type"] == "final":
+                            latency_metrics.observe_result(result)
+                            latency_metrics.observe(
+                                "round_trip", time.monotonic() - started
+                            )
+                        yield result
+                    break
+                self._check_failed(data)
+
+                # Poll fast while text is flowing, back off while it is not
+                # 결과가 나오는 동안은 빠르게, 없을 때는 간격을 늘려 폴링
+                if items:
+                    interval = settings.RUNPOD_POLL_MIN_INTERVAL_SECONDS
+                else:
+                    interval = min(
+                        interval * settings.RUNPOD_POLL_BACKOFF_FACTOR,
+                        settings.RUNPOD_STREAM_MAX_POLL_INTERVAL_SECONDS,
+                    )
+
+            self.circuit_breaker.record_success()
+            verdict = True
+            self._record_duration(time.monotonic() - started)
+
+        except httpx.HTTPError as e:
+            logger.error(f"RunPod internal error: {e}")
+            self.circuit_breaker.record_failure()
+            verdict = True
+            raise HTTPException(
+                status_code=502, detail=f"RunPod communication error: {str(e)}"
+            )
+        except HTTPException as e:
+            if e.status_code == 504:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+            verdict = True
+            raise
+        finally:
+            if not verdict:
+                self.circuit_breaker.release()
+            if job_id and not finished:
+                # Caller went away or the job failed: stop paying for the GPU job
+                # 호출자가 떠났거나 작업이 실패한 경우 GPU 작업을 취소
+                await asyncio.shield(self.cancel_job(job_id))
+
+    async def _stream_result(self, job_id: str) -> dict:
+        response = await self._get_client().get(f"{self.base_url}/status/{job_id}")
+        response.raise_for_status()
+        output = self._unwrap_output(response.json().get("output"))
+        if not isinstance(output, dict):
+            return {"type": "error", "error": "Worker returned no output"}
+        if "error" in output:
+            return {"type": "error", "error": output["error"]}
+        return {"type": "final", **output}
+
+    async def _submit_run(self, payload: dict) -> dict:
+        run_url = f"{self.base_url}/run"
+        logger.info(f"Sending job to RunPod: {run_url}")
+        response = await self._get_client().post(run_url, json=payload)
+        response.raise_for_status()
+        return response.json()
 
-    def warmup_async(self) -> dict:
+    async def _await_job(
+        self,
+        job_id: str,
+        payload: dict,
+        timeout: float,
+        expected: float,
+        started: float,
+    ) -> dict:
+        """
+        Poll the job; if it is still IN_QUEUE past the hedge delay, submit a
+        duplicate and take whichever finishes first. Jobs nobody waits for
+        anymore (hedge losers, timed-out or cancelled callers) are cancelled
+        on RunPod.
+        """
+        polls = {
+            asyncio.create_task(
+                self._poll_status(job_id, timeout, expected, started)
+            ): job_id
+        }
+        try:
+            hedge_delay = self._hedge_delay()
+            if hedge_delay is not None:
+                wait = hedge_delay - (time.monotonic() - started)
+                done, _ = await asyncio.wait(set(polls), timeout=max(wait, 0))
+                if not done and await self._get_status(job_id) == "IN_QUEUE":
+                    hedge_id = (await self._submit_run(payload))["id"]
+                    logger.info(f"Job {job_id} still queued, hedged with {hedge_id}.")
+                    self._stats["hedged_jobs"] += 1
+                    hedge_started = time.monotonic()
+                    remaining = timeout - (hedge_started - started)
+                    polls[
+                        asyncio.create_task(
+                            self._poll_status(
+                                hedge_id, remaining, expected, hedge_started
+                            )
+                        )
+                    ] = hedge_id
+
+            pending = set(polls)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if polls[task] != job_id:
+                            self._stats["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+
+        finally:
+            # Nobody is waiting for these anymore: stop paying for the GPU job
+            # 더 이상 기다리지 않는 작업은 GPU 비용이 들지 않도록 취소
+            for task, pending_job_id in polls.items():
+                if self._abandoned(task):
+                    task.cancel()
+                    await asyncio.shield(self.cancel_job(pending_job_id))
+
+    @staticmethod
+    def _abandoned(task: asyncio.Task) -> bool:
+        # Still polling, or gave up (timeout, network error) on a job RunPod
+        # may still run; only COMPLETED and FAILED jobs are finished
+        # 폴링 중이거나 타임아웃/통신 오류로 포기한 작업 (RunPod에서는 계속 실행될 수 있음)
+        if not task.done() or task.cancelled():
+            return True
+        error = task.exception()
+        return error is not None and not (
+            isinstance(error, HTTPException) and error.status_code == 500
+        )
+
+    async def _get_status(self, job_id: str) -> Optional[str]:
+        response = await self._get_client().get(f"{self.base_url}/status/{job_id}")
+        response.raise_for_status()
+        return response.json().get("status")
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not settings.RUNPOD_HEDGE_ENABLED:
+            return None
+        if len(self._queue_delays) < settings.RUNPOD_HEDGE_MIN_SAMPLES:
+            return settings.RUNPOD_HEDGE_DEFAULT_DELAY_SECONDS
+        return percentile(self._queue_delays, settings.RUNPOD_HEDGE_PERCENTILE)
+
+    async def _submit_runsync(self, payload: dict, timeout: float) -> dict:
+        # RunPod holds the request open for up to 'wait' ms, then returns the job id
+        # RunPod는 최대 'wait' ms 동안 응답을 보류한 뒤 작업 ID를 반환함
+        wait = min(settings.RUNPOD_RUNSYNC_WAIT_SECONDS, timeout)
+        runsync_url = f"{self.base_url}/runsync"
+        logger.info(f"Sending job to RunPod: {runsync_url} (wait={wait:.0f}s)")
+
+        response = await self._get_client().post(
+            runsync_url,
+            params={"wait": int(wait * 1000)},
+            json=payload,
+            timeout=httpx.Timeout(
+                wait + settings.RUNPOD_HTTP_TIMEOUT_SECONDS,
+                connect=settings.RUNPOD_CONNECT_TIMEOUT_SECONDS,
+            ),
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def cancel_job(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running RunPod job (best effort).
+        대기 중이거나 실행 중인 RunPod 작업을 취소합니다 (최선 노력).
+        """
+        try:
+            response = await self._get_client().post(f"{self.base_url}/cancel/{job_id}")
+            response.raise_for_status()
+            logger.info(f"Cancelled RunPod job {job_id}.")
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to cancel RunPod job {job_id}: {e}")
+            return False
+
+    async def warmup_async(self) -> dict:
         """
         Send a warmup request to RunPod asynchronously.
         RunPod에 워밍업 요청을 비동기적으로 보냅니다.
@@ -71,42 +516,187 @@ class RunPodClient:
             run_url = f"{self.base_url}/run"
             logger.info(f"Sending warmup signal to RunPod({self.endpoint_id})...")
 
-            response = requests.post(run_url, headers=self.headers, json=payload)
+            response = await self._get_client().post(run_url, json=payload)
             response.raise_for_status()
 
             job_data = response.json()
             return {"status": "success", "job_id": job_data["id"]}
 
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Warmup failed: {e}")
             # Warmup failure shouldn't crash the server, but we report it
             return {"status": "failed", "error": str(e)}
 
-    def _poll_status(self, job_id: str) -> dict:
+    async def _poll_status(
+        self, job_id: str, timeout: float, expected: float, started: float
+    ) -> dict:
         status_url = f"{self.base_url}/status/{job_id}"
-        start_time = time.time()
+        deadline = time.monotonic() + timeout
+        polls = 0
+        self._stats["polled_jobs"] += 1
 
-        while time.time() - start_time < settings.RUNPOD_TIMEOUT_SECONDS:
-            response = requests.get(status_url, headers=self.headers)
-            response.raise_for_status()
+        # First check lands around the expected finish time, then back off
+        # 첫 조회는 예상 완료 시점에 맞추고, 이후에는 지수 백오프
+        interval = self._clamp_interval(expected - (time.monotonic() - started))
 
-            data = response.json()
-            status = data.get("status")
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(min(interval, max(deadline - time.monotonic(), 0)))
 
-            if status == "COMPLETED":
-                logger.info("Job completed successfully.")
-                return data["output"]
-            elif status == "FAILED":
-                logger.error(f"Job failed: {data}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Transcription job failed: {data.get('error')}",
-                )
+                response = await self._get_client().get(status_url)
+                polls += 1
+                response.raise_for_status()
 
-            time.sleep(2)  # Polling interval
+                data = response.json()
+                status = data.get("status")
+
+                if status == "COMPLETED":
+                    logger.info(f"Job completed successfully after {polls} polls.")
+                    return data
+                self._check_failed(data)
+
+                if polls == 1:
+                    interval = settings.RUNPOD_POLL_MIN_INTERVAL_SECONDS
+                else:
+                    interval = self._clamp_interval(
+                        interval * settings.RUNPOD_POLL_BACKOFF_FACTOR
+                    )
+        finally:
+            self._stats["status_polls"] += polls
+            self._stats["max_polls_per_job"] = max(
+                self._stats["max_polls_per_job"], polls
+            )
 
         raise HTTPException(status_code=504, detail="Transcription job timed out")
 
+    def add_listener(self, listener: Callable[[dict, float], None]):
+        """
+        Register a callback for completed jobs. The status payload carries
+        RunPod's delayTime (queue) and executionTime in milliseconds.
+        """
+        self._listeners.append(listener)
+
+    def _notify_listeners(self, job_data: dict, elapsed: float):
+        if job_data.get("delayTime") is not None:
+            self._queue_delays.append(job_data["delayTime"] / 1000)
+        for listener in self._listeners:
+            try:
+                listener(job_data, elapsed)
+            except Exception as e:
+                logger.warning(f"RunPod job listener failed: {e}")
+
+    def estimate_job_seconds(self, audio_seconds: Optional[float] = None) -> float:
+        """
+        Expected end-to-end seconds for a job: overhead + audio seconds x
+        seconds per audio second when the duration is known, else the moving
+        average of recent jobs.
+        작업 예상 소요 시간 (길이를 알면 비용 모델, 모르면 최근 작업 평균)
+        """
+        if not audio_seconds:
+            return self._expected_job_seconds
+        return self._overhead_seconds + audio_seconds * self._seconds_per_audio_second
+
+    def _record_timings(self, output, job_data: dict, elapsed: float):
+        """
+        Add RunPod's queue delay / execution time and the round trip to the
+        result's "timings" and feed everything into the latency histograms.
+        상태 페이로드의 대기열 지연/실행 시간을 결과의 timings에 추가하고 히스토그램에 기록합니다.
+        """
+        job_timings = {
+            "queue_delay": (
+                job_data["delayTime"] / 1000
+                if job_data.get("delayTime") is not None
+                else None
+            ),
+            "execution": (
+                job_data["executionTime"] / 1000
+                if job_data.get("executionTime") is not None
+                else None
+            ),
+            "round_trip": round(elapsed, 4),
+        }
+        for name, seconds in job_timings.items():
+            latency_metrics.observe(name, seconds)
+
+        if not isinstance(output, dict):
+            return
+        if isinstance(output.get("results"), list):
+            # Batch job: per-file worker timings, job-level RunPod timings
+            # 배치 작업: 워커 시간은 파일별로, RunPod 시간은 작업 단위로 기록
+            for item in output["results"]:
+                if isinstance(item, dict):
+                    latency_metrics.observe_result(item)
+            return
+        latency_metrics.observe_result(output)
+        if "error" not in output:
+            output["timings"] = {**(output.get("timings") or {}), **job_timings}
+            self._update_cost_model(output.get("audio_duration"), job_timings)
+
+    def _update_cost_model(self, audio_seconds: Optional[float], job_timings: dict):
+        execution = job_timings["execution"]
+        if not audio_seconds or execution is None:
+            return
+        self._seconds_per_audio_second = (
+            EWMA_ALPHA * (execution / audio_seconds)
+            + (1 - EWMA_ALPHA) * self._seconds_per_audio_second
+        )
+        overhead = max(job_timings["round_trip"] - execution, 0.0)
+        self._overhead_seconds = (
+            EWMA_ALPHA * overhead + (1 - EWMA_ALPHA) * self._overhead_seconds
+        )
+
+    @staticmethod
+    def _unwrap_output(output):
+        # A streaming worker (return_aggregate_stream) reports every yielded
+        # item; the last one is the full result, or {"type": "error", ...}
+        # 스트리밍 워커는 생성한 모든 항목을 리스트로 반환하므로 마지막 항목이 최종 결과 (또는 오류)
+        if isinstance(output, list):
+            if not output:
+                return {"error": "Worker returned no output"}
+            output = output[-1]
+        if isinstance(output, dict) and "type" in output:
+            if output["type"] == "error":
+                return {"error": output.get("error") or "Worker reported an error"}
+            output = {k: v for k, v in output.items() if k != "type"}
+        return output
+
+    def _check_failed(self, data: dict):
+        if data.get("status") == "FAILED":
+            logger.error(f"Job failed: {data}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Transcription job failed: {data.get('error')}",
+            )
+
+    def _clamp_interval(self, seconds: float) -> float:
+        return min(
+            max(seconds, settings.RUNPOD_POLL_MIN_INTERVAL_SECONDS),
+            settings.RUNPOD_POLL_MAX_INTERVAL_SECONDS,
+        )
+
+    def _record_duration(self, seconds: float):
+        self._expected_job_seconds = (
+            EWMA_ALPHA * seconds + (1 - EWMA_ALPHA) * self._expected_job_seconds
+        )
+
+    def get_stats(self) -> dict:
+        """
+        Polling counters for monitoring.
+        폴링 횟수 등 모니터링용 통계를 반환합니다.
+        """
+        polled = self._stats["polled_jobs"]
+        return {
+            **self._stats,
+            "avg_polls_per_polled_job": (
+                self._stats["status_polls"] / polled if polled else 0.0
+            ),
+            "expected_job_seconds": round(self._expected_job_seconds, 3),
+            "expected_overhead_seconds": round(self._overhead_seconds, 3),
+            "seconds_per_audio_second": round(self._seconds_per_audio_second, 4),
+            "hedge_delay_seconds": self._hedge_delay(),
+            "circuit": self.circuit_breaker.get_stats(),
+        }
+
     def _mock_response(self, url: str):
         return {
             "text": "This is a mock transcription because RunPod API key is missing.",
@@ -117,3 +707,11 @@ class RunPodClient:
 
 
 runpod_client = RunPodClient()
+
+# Separate queue for long files (None when RUNPOD_LONG_ENDPOINT_ID is unset)
+# 긴 파일 전용 대기열 (RUNPOD_LONG_ENDPOINT_ID가 없으면 None)
+long_runpod_client = (
+    RunPodClient(settings.RUNPOD_LONG_ENDPOINT_ID, name="runpod-long")
+    if settings.RUNPOD_LONG_ENDPOINT_ID
+    else None
+)
@@ -1,21 +1,49 @@
+import asyncio
+import json
+import logging
+import time
+import zlib
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# States that no longer change; only these expire or get evicted
+# 더 이상 바뀌지 않는 상태 (이 상태의 작업만 만료/제거 대상)
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+
+# Rough per-entry cost of the dict, key and status strings
+# 항목당 딕셔너리/키/상태 문자열의 대략적인 메모리 비용
+ENTRY_OVERHEAD_BYTES = 256
+
 
 class TaskStore:
     """
     [v1 Only] In-Memory Task Storage
-    - Uses a simple Python dictionary to store task states.
+    - Ordered dictionary of task states, least recently used first.
+    - Results are kept as compact JSON bytes (zlib above
+      TASK_STORE_COMPRESS_MIN_BYTES) and decoded on read.
+    - COMPLETED / FAILED tasks expire after TASK_STORE_TTL_SECONDS (checked
+      on read and by a background sweeper), and are evicted LRU-first above
+      TASK_STORE_MAX_ENTRIES / TASK_STORE_MAX_BYTES. Tasks still PENDING or
+      PROCESSING are never dropped.
     - Singleton pattern to ensure shared state across the application instance.
     - FUTURE (v2): Replace this class with a Redis-based implementation.
     """
 
     _instance = None
-    _tasks: Dict[str, Dict[str, Any]] = {}
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(TaskStore, cls).__new__(cls)
-            cls._tasks = {}
+            instance = super(TaskStore, cls).__new__(cls)
+            # task_id -> {"status", "result", "compressed", "error", "updated_at", "size"}
+            instance._tasks = OrderedDict()
+            instance._bytes = 0
+            instance._stats = {"expirations": 0, "evictions": 0}
+            instance._sweeper = None
+            cls._instance = instance
         return cls._instance
 
     def save_task(
@@ -28,26 +56,153 @@ class TaskStore:
         """
         Saves or updates a task's state.
         """
+        blob, compressed = self._encode(result)
+        size = ENTRY_OVERHEAD_BYTES + len(blob or b"")
+        if error is not None:
+            size += len(json.dumps(error, ensure_ascii=False).encode("utf-8"))
+
+        self._remove(task_id)
         self._tasks[task_id] = {
-            "taskId": task_id,
             "status": status,
-            "result": result,
+            "result": blob,
+            "compressed": compressed,
             "error": error,
+            "updated_at": time.time(),
+            "size": size,
         }
+        self._bytes += size
+        self._enforce_limits(keep=task_id)
 
     def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
         """
         Retrieves a task by ID.
-        Returns None if not found.
+        Returns None if not found or expired.
         """
-        return self._tasks.get(task_id)
+        entry = self._tasks.get(task_id)
+        if entry is None:
+            return None
+        if self._expired(entry, time.time()):
+            self._remove(task_id)
+            self._stats["expirations"] += 1
+            return None
+
+        self._tasks.move_to_end(task_id)
+        return {
+            "taskId": task_id,
+            "status": entry["status"],
+            "result": self._decode(entry["result"], entry["compressed"]),
+            "error": entry["error"],
+        }
 
     def delete_task(self, task_id: str):
         """
         [Cleanup] Removes a task from memory.
         """
-        if task_id in self._tasks:
-            del self._tasks[task_id]
+        self._remove(task_id)
+
+    def sweep(self) -> int:
+        """
+        Drops every expired task; returns how many were removed.
+        만료된 작업을 모두 삭제하고 삭제한 개수를 반환합니다.
+        """
+        now = time.time()
+        expired = [
+            task_id
+            for task_id, entry in self._tasks.items()
+            if self._expired(entry, now)
+        ]
+        for task_id in expired:
+            self._remove(task_id)
+        self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def start(self):
+        if self._sweeper is not None:
+            return
+        self._sweeper = asyncio.create_task(self._run_sweeper())
+
+    async def stop(self):
+        if self._sweeper is None:
+            return
+        self._sweeper.cancel()
+        try:
+            await self._sweeper
+        except asyncio.CancelledError:
+            pass
+        self._sweeper = None
+
+    async def _run_sweeper(self):
+        while True:
+            await asyncio.sleep(settings.TASK_STORE_SWEEP_SECONDS)
+            try:
+                removed = self.sweep()
+                if removed:
+                    logger.info(f"Task store: expired {removed} tasks")
+            except Exception as e:
+                logger.error(f"Task store sweep failed: {e}")
+
+    def get_stats(self) -> dict:
+        active = sum(
+            1
+            for entry in self._tasks.values()
+            if entry["status"] not in TERMINAL_STATUSES
+        )
+        return {
+            **self._stats,
+            "entries": len(self._tasks),
+            "active": active,
+            "bytes": self._bytes,
+            "max_entries": settings.TASK_STORE_MAX_ENTRIES,
+            "max_bytes": settings.TASK_STORE_MAX_BYTES,
+        }
+
+    def _enforce_limits(self, keep: str):
+        # Oldest finished tasks first; running tasks and the task just saved
+        # (its result is not polled yet) stay even over the limits
+        # 오래된 완료 작업부터 제거 (진행 중인 작업과 방금 저장한 작업은 한도를 넘어도 유지)
+        if (
+            len(self._tasks) <= settings.TASK_STORE_MAX_ENTRIES
+            and self._bytes <= settings.TASK_STORE_MAX_BYTES
+        ):
+            return
+        for task_id in list(self._tasks):
+            if (
+                len(self._tasks) <= settings.TASK_STORE_MAX_ENTRIES
+                and self._bytes <= settings.TASK_STORE_MAX_BYTES
+            ):
+                break
+            if task_id != keep and self._tasks[task_id]["status"] in TERMINAL_STATUSES:
+                self._remove(task_id)
+                self._stats["evictions"] += 1
+
+    def _remove(self, task_id: str):
+        entry = self._tasks.pop(task_id, None)
+        if entry is not None:
+            self._bytes -= entry["size"]
+
+    @staticmethod
+    def _expired(entry: Dict[str, Any], now: float) -> bool:
+        return (
+            entry["status"] in TERMINAL_STATUSES
+            and now - entry["updated_at"] > settings.TASK_STORE_TTL_SECONDS
+        )
+
+    @staticmethod
+    def _encode(result: Optional[Dict]) -> tuple:
+        if result is None:
+            return None, False
+        blob = json.dumps(
+            result, ensure_ascii=False, separators=(",", ":"), default=str
+        ).encode("utf-8")
+        if len(blob) >= settings.TASK_STORE_COMPRESS_MIN_BYTES:
+            return zlib.compress(blob), True
+        return blob, False
+
+    @staticmethod
+    def _decode(blob: Optional[bytes], compressed: bool) -> Optional[Dict]:
+        if blob is None:
+            return None
+        return json.loads(zlib.decompress(blob) if compressed else blob)
 
 
 # Create a global instance to be imported by other services
@@ -0,0 +1,135 @@
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionCache:
+    """
+    Transcription result cache keyed by audio identity (not the signed URL).
+    - Memory tier: LRU ordered dict bounded by entry count, with TTL expiry.
+    - Disk tier (optional): one JSON file per key under TRANSCRIPTION_CACHE_DIR,
+      so results survive restarts and memory evictions.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.TRANSCRIPTION_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = settings.TRANSCRIPTION_CACHE_TTL_SECONDS,
+        disk_dir: str = settings.TRANSCRIPTION_CACHE_DIR,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir or None
+        # key -> (stored_at, result)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, result = entry
+            if not self._expired(stored_at):
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return result
+            del self._entries[key]
+            self._stats["expirations"] += 1
+
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                stored_at, result = entry
+                self._put_memory(key, stored_at, result)
+                self._stats["disk_hits"] += 1
+                return result
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, result: Dict[str, Any]):
+        stored_at = time.time()
+        self._put_memory(key, stored_at, result)
+        self._stats["stores"] += 1
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, stored_at, result)
+
+    def get_stats(self) -> dict:
+        lookups = self._stats["hits"] + self._stats["disk_hits"] + self._stats["misses"]
+        hits = self._stats["hits"] + self._stats["disk_hits"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _put_memory(self, key: str, stored_at: float, result: Dict[str, Any]):
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _expired(self, stored_at: float) -> bool:
+        return time.time() - stored_at > self.ttl_seconds
+
+    def _disk_path(self, key: str) -> str:
+        name = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, f"{name}.json")
+
+    def _read_disk(self, key: str) -> Optional[tuple]:
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            stored_at, result = data["stored_at"], data["result"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Corrupt cache file {path}: {e}")
+            self._remove_disk(path)
+            return None
+
+        if self._expired(stored_at):
+            self._remove_disk(path)
+            self._stats["expirations"] += 1
+            return None
+        return stored_at, result
+
+    @staticmethod
+    def _remove_disk(path: str):
+        # Best effort: a file that cannot be removed is still a cache miss
+        # 삭제에 실패해도 요청은 캐시 미스로 처리
+        with contextlib.suppress(OSError):
+            os.remove(path)
+
+    def _write_disk(self, key: str, stored_at: float, result: Dict[str, Any]):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "result": result}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to write cache file {path}: {e}")
+
+
+transcription_cache = TranscriptionCache()
@@ -0,0 +1,443 @@
+import asyncio
+import hashlib
+import logging
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.audio_header import parse_duration_bytes
+from app.services.audio_probe import audio_probe, normalize_url
+from app.services.keepwarm_scheduler import keepwarm_scheduler
+from app.services.runpod_client import RunPodClient, long_runpod_client, runpod_client
+from app.services.task_store import task_store
+from app.services.transcription_cache import transcription_cache
+
+logger = logging.getLogger(__name__)
+
+
+def classify_error(error_msg: str) -> str:
+    """
+    Map a transcription error message to a custom error code.
+    에러 메시지를 분석하여 커스텀 에러 코드로 변환합니다.
+    """
+    if "CIRCUIT_OPEN" in error_msg:
+        # RunPod endpoint degraded, failing fast
+        return "CIRCUIT_OPEN"
+    for code in ("AUDIO_TOO_LONG", "AUDIO_TOO_LARGE"):
+        # Rejected by the probe before dispatch
+        if code in error_msg:
+            return code
+    if "timeout" in error_msg.lower():
+        # RunPod Timeout
+        return "STT_FAILURE"  # Still server error
+    if "download" in error_msg.lower() or "403" in error_msg or "404" in error_msg:
+        # Download failure (S3 permission, etc) - Guessing from typical error strings
+        return "DOWNLOAD_FAILURE"
+    return "STT_FAILURE"
+
+
+class TranscriptionService:
+    """
+    Orchestrates a transcription request:
+    1. Probes the audio header (size, estimated duration) and rejects
+       oversized inputs
+    2. Resolves the audio identity (ETag/content hash)
+    3. Serves cached results without touching RunPod
+    4. Coalesces concurrent requests for the same audio into one RunPod job,
+       routed by expected cost (runsync fast path / long-file queue)
+    5. Caches the result
+    """
+
+    def __init__(self):
+        # key -> {"task": asyncio.Task, "waiters": int}
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self._stats = {
+            "started": 0,
+            "coalesced": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "long_queue": 0,
+            "inline": 0,
+        }
+
+    async def transcribe(
+        self,
+        audio_url: str,
+        language: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> dict:
+        probe = await self._probe(audio_url)
+        cache_key = None
+        if settings.TRANSCRIPTION_CACHE_ENABLED:
+            identity = await audio_probe.identify(audio_url, probe)
+            if identity:
+                cache_key = self._cache_key(identity, language, profile)
+                cached = await transcription_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Transcription cache hit: {cache_key}")
+                    return cached
+
+        # Without an identity, the URL minus its signing parameters still
+        # names the same object across retries
+        # 식별자가 없으면 서명 파라미터를 제외한 URL로 동일 객체를 판별
+        flight_key = cache_key or (
+            f"url:{normalize_url(audio_url)}:{language}:{profile}"
+        )
+        return await self._single_flight(
+            flight_key,
+            lambda: self._run(
+                audio_url, language, profile, cache_key, self._duration(probe)
+            ),
+        )
+
+    async def transcribe_upload(
+        self,
+        data: bytes,
+        language: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> dict:
+        """
+        Transcribe an uploaded clip by sending its bytes inline in the RunPod
+        job input (no S3 upload / presigned URL / worker download). Clips over
+        TRANSCRIPTION_INLINE_MAX_BYTES are rejected (413) and must go through
+        audioUrl. Cache and coalescing are keyed by the content hash, the
+        same identity a URL without an ETag gets.
+        """
+        audio_format, duration = parse_duration_bytes(data)
+        self._admit(
+            len(data),
+            duration,
+            settings.TRANSCRIPTION_INLINE_MAX_BYTES,
+            hint="; upload to S3 and send audioUrl",
+        )
+        logger.info(f"Inline upload: {len(data)} bytes, {audio_format}, {duration}s")
+
+        cache_key = self._cache_key(
+            f"sha256:{hashlib.sha256(data).hexdigest()}", language, profile
+        )
+        if settings.TRANSCRIPTION_CACHE_ENABLED:
+            cached = await transcription_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Transcription cache hit: {cache_key}")
+                return cached
+
+        self._stats["inline"] += 1
+        return await self._single_flight(
+            cache_key,
+            lambda: self._run(
+                None,
+                language,
+                profile,
+                cache_key if settings.TRANSCRIPTION_CACHE_ENABLED else None,
+                duration,
+                audio_data=data,
+            ),
+        )
+
+    async def transcribe_stream(
+        self,
+        audio_url: str,
+        language: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Admit the clip, then return an iterator of transcription events as the
+        worker produces them:
+        {"type": "segment", "start", "end", "text"} ..., then
+        {"type": "final", ...} or {"type": "error", "error"}.
+        Admission errors (413) are raised here, before any event is sent.
+        A cache hit yields the final result immediately.
+        """
+        probe = await self._probe(audio_url)
+        return self._stream_events(audio_url, language, profile, probe)
+
+    async def _stream_events(
+        self,
+        audio_url: str,
+        language: Optional[str],
+        profile: Optional[str],
+        probe: Optional[dict],
+    ) -> AsyncIterator[dict]:
+        cache_key = None
+        if settings.TRANSCRIPTION_CACHE_ENABLED:
+            identity = await audio_probe.identify(audio_url, probe)
+            if identity:
+                cache_key = self._cache_key(identity, language, profile)
+                cached = await transcription_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Transcription cache hit: {cache_key}")
+                    yield {"type": "final", **cached}
+                    return
+
+        keepwarm_scheduler.record_arrival()
+        client, _, timeout = self._route(self._duration(probe))
+        async for event in client.stream_transcribe(
+            audio_url, language, timeout=timeout, profile=profile
+        ):
+            if event.get("type") == "final" and cache_key:
+                await transcription_cache.set(
+                    cache_key, {k: v for k, v in event.items() if k != "type"}
+                )
+            yield event
+
+    async def transcribe_batch(
+        self,
+        audio_urls: List[str],
+        language: Optional[str] = None,
+        profile: Optional[str] = None,
+    ) -> List[dict]:
+        """
+        Transcribe several clips; cached clips are served locally and only the
+        misses are sent to RunPod, as a single batch job.
+        Returns one result per URL, in order ({"audio_url", "text"} or "error").
+        """
+        cache_keys: List[Optional[str]] = [None] * len(audio_urls)
+        results: List[Optional[dict]] = [None] * len(audio_urls)
+
+        # Oversized files fail individually, like any other bad file
+        # 크기 제한을 넘는 파일은 다른 실패와 마찬가지로 파일 단위로 실패 처리
+        probes = await asyncio.gather(
+            *(self._probe(url) for url in audio_urls), return_exceptions=True
+        )
+        for i, probe in enumerate(probes):
+            if isinstance(probe, HTTPException):
+                results[i] = {"audio_url": audio_urls[i], "error": probe.detail}
+                probes[i] = None
+            elif isinstance(probe, BaseException):
+                raise probe
+
+        if settings.TRANSCRIPTION_CACHE_ENABLED:
+            identities = await asyncio.gather(
+                *(
+                    audio_probe.identify(url, probe)
+                    if results[i] is None
+                    else asyncio.sleep(0)
+                    for i, (url, probe) in enumerate(zip(audio_urls, probes))
+                )
+            )
+            for i, identity in enumerate(identities):
+                if identity:
+                    cache_keys[i] = self._cache_key(identity, language, profile)
+                    cached = await transcription_cache.get(cache_keys[i])
+                    if cached is not None:
+                        results[i] = {"audio_url": audio_urls[i], **cached}
+
+        misses = [i for i, result in enumerate(results) if result is None]
+        if misses:
+            keepwarm_scheduler.record_arrival()
+            durations = [self._duration(probes[i]) for i in misses]
+            total = sum(durations) if all(durations) else None
+            client, expected, timeout = self._route(total)
+            batch_results = await client.transcribe_batch(
+                [audio_urls[i] for i in misses],
+                language=language,
+                timeout=timeout,
+                profile=profile,
+                expected_seconds=expected,
+            )
+            for i, result in zip(misses, batch_results):
+                results[i] = result
+                if cache_keys[i] and "error" not in result:
+                    cached = {k: v for k, v in result.items() if k != "audio_url"}
+                    await transcription_cache.set(cache_keys[i], cached)
+
+        return results
+
+    def create_job(self) -> str:
+        """
+        Registers a new transcription job in PENDING state and returns its id.
+        """
+        job_id = uuid.uuid4().hex
+        task_store.save_task(job_id, "PENDING")
+        return job_id
+
+    async def transcribe_background(
+        self,
+        job_id: str,
+        audio_url: str,
+        language: Optional[str] = None,
+        profile: Optional[str] = None,
+    ):
+        """
+        Background task entry point for the submit + poll job API.
+        """
+        logger.info(f"Transcription job {job_id}: Started.")
+        task_store.save_task(job_id, "PROCESSING")
+
+        try:
+            result = await self.transcribe(audio_url, language, profile)
+            if "error" in result:
+                raise RuntimeError(result["error"])
+
+            task_store.save_task(
+                job_id, "COMPLETED", result={"text": result.get("text", "")}
+            )
+            logger.info(f"Transcription job {job_id}: Completed.")
+
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"Transcription job {job_id}: Failed with error {error_msg}")
+            task_store.save_task(
+                job_id,
+                "FAILED",
+                error={"code": classify_error(error_msg), "msg": error_msg},
+            )
+
+    async def _run(
+        self,
+        audio_url: str,
+        language: Optional[str],
+        profile: Optional[str],
+        cache_key: Optional[str],
+        audio_seconds: Optional[float] = None,
+        audio_data: Optional[bytes] = None,
+    ) -> dict:
+        keepwarm_scheduler.record_arrival()
+        client, expected, timeout = self._route(audio_seconds)
+        result = await client.transcribe(
+            audio_url=audio_url,
+            language=language,
+            timeout=timeout,
+            expected_seconds=expected,
+            profile=profile,
+            audio_data=audio_data,
+        )
+
+        # Worker-side failures come back as {"error": ...}; never cache those
+        # 워커 측 실패는 {"error": ...}로 반환되므로 캐시하지 않음
+        if cache_key and "error" not in result:
+            await transcription_cache.set(cache_key, result)
+        return result
+
+    async def _probe(self, audio_url: str) -> Optional[dict]:
+        """
+        Header probe before dispatch; raises 413 for inputs over the limits.
+        A failed probe lets the request through (the worker still validates).
+        """
+        if not settings.AUDIO_PROBE_ENABLED:
+            return None
+        probe = await audio_probe.probe(audio_url)
+        if probe is None:
+            return None
+
+        # A bitrate guess is too rough to reject on
+        # 비트레이트 추정값은 거절 기준으로 쓰지 않음
+        self._admit(
+            probe.get("size"),
+            (
+                probe.get("duration_seconds")
+                if probe.get("duration_source") == "header"
+                else None
+            ),
+            settings.TRANSCRIPTION_MAX_AUDIO_BYTES,
+        )
+        return probe
+
+    def _admit(
+        self,
+        size: Optional[int],
+        duration: Optional[float],
+        max_bytes: int,
+        hint: str = "",
+    ):
+        """
+        Raises 413 (AUDIO_TOO_LARGE / AUDIO_TOO_LONG) for inputs over the limits.
+        입력 크기/길이 제한을 넘으면 413 오류를 발생시킵니다.
+        """
+        if size and size > max_bytes:
+            self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=413,
+                detail=f"AUDIO_TOO_LARGE: {size} bytes (max {max_bytes}{hint})",
+            )
+        if duration and duration > settings.TRANSCRIPTION_MAX_AUDIO_SECONDS:
+            self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=413,
+                detail=(
+                    f"AUDIO_TOO_LONG: {duration:.0f}s "
+                    f"(max {settings.TRANSCRIPTION_MAX_AUDIO_SECONDS:.0f}s)"
+                ),
+            )
+
+    @staticmethod
+    def _duration(probe: Optional[dict]) -> Optional[float]:
+        return probe.get("duration_seconds") if probe else None
+
+    def _route(
+        self, audio_seconds: Optional[float]
+    ) -> Tuple[RunPodClient, Optional[float], Optional[float]]:
+        """
+        Pick the endpoint and derive (expected seconds, timeout) from the
+        estimated audio length. The expected time drives runsync vs /run and
+        the first poll; long files get a proportionally longer timeout.
+        예상 오디오 길이로 엔드포인트, 예상 소요 시간, 타임아웃을 결정합니다.
+        """
+        client = runpod_client
+        if (
+            long_runpod_client is not None
+            and audio_seconds
+            and audio_seconds >= settings.TRANSCRIPTION_LONG_AUDIO_SECONDS
+        ):
+            client = long_runpod_client
+            self._stats["long_queue"] += 1
+        if not audio_seconds:
+            return client, None, None
+
+        expected = client.estimate_job_seconds(audio_seconds)
+        timeout = max(
+            settings.RUNPOD_TIMEOUT_SECONDS,
+            expected * settings.RUNPOD_TIMEOUT_EXPECTED_FACTOR,
+        )
+        return client, expected, timeout
+
+    async def _single_flight(self, key: str, factory) -> dict:
+        """
+        Run factory() once per key; concurrent callers await the same task.
+        The shared task is cancelled only when its last waiter goes away.
+        """
+        flight = self._in_flight.get(key)
+        if flight is None:
+            task = asyncio.create_task(factory())
+            flight = {"task": task, "waiters": 0}
+            self._in_flight[key] = flight
+            task.add_done_callback(lambda _: self._release(key, flight))
+            self._stats["started"] += 1
+        else:
+            logger.info(f"Joining in-flight transcription: {key}")
+            self._stats["coalesced"] += 1
+
+        flight["waiters"] += 1
+        try:
+            return await asyncio.shield(flight["task"])
+        except asyncio.CancelledError:
+            if flight["waiters"] == 1 and not flight["task"].done():
+                flight["task"].cancel()
+                self._stats["cancelled"] += 1
+                # The task may take a while to wind down (/cancel); new callers
+                # must start a fresh call instead of joining a cancelled one
+                # 취소 처리 중인 작업에 새 요청이 합류하지 않도록 즉시 제거
+                self._release(key, flight)
+            raise
+        finally:
+            flight["waiters"] -= 1
+
+    def _release(self, key: str, flight: Dict[str, Any]):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    @staticmethod
+    def _cache_key(
+        identity: str, language: Optional[str], profile: Optional[str]
+    ) -> str:
+        # Different profiles can produce different text for the same audio
+        # 프로필에 따라 같은 오디오라도 결과가 다를 수 있으므로 키에 포함
+        return f"{identity}:{language or 'auto'}:{profile or 'default'}"
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "in_flight": len(self._in_flight)}
+
+
+transcription_service = TranscriptionService()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Tests import the service modules as "app.*", like the server does
+# 서버와 동일하게 "app.*" 경로로 모듈을 임포트하기 위해 ai_server를 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
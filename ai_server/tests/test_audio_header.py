@@ -0,0 +1,177 @@
+import io
+import struct
+import wave
+
+import pytest
+
+from app.services.audio_header import (
+    detect_format,
+    mp4_duration,
+    parse_duration,
+    parse_duration_bytes,
+)
+
+
+def _wav(seconds: float, rate: int = 16000) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(b"\x00\x00" * int(seconds * rate))
+    return buffer.getvalue()
+
+
+def _flac(total_samples: int, rate: int = 16000) -> bytes:
+    info = rate << 44 | 0 << 41 | 15 << 36 | total_samples
+    streaminfo = b"\x00" * 10 + info.to_bytes(8, "big") + b"\x00" * 16
+    return b"fLaC" + b"\x80" + len(streaminfo).to_bytes(3, "big") + streaminfo
+
+
+def _mp3_cbr(size: int) -> bytes:
+    # MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo
+    return (b"\xff\xfb\x90\x64" + b"\x00" * size)[:size]
+
+
+def _mp3_xing(frames: int) -> bytes:
+    header = b"\xff\xfb\x90\x64" + b"\x00" * 32
+    xing = b"Xing" + (1).to_bytes(4, "big") + frames.to_bytes(4, "big")
+    return header + xing + b"\x00" * 64
+
+
+def _adts(frames: int, length: int = 200) -> bytes:
+    # AAC LC, 44.1 kHz (sample rate index 4)
+    header = bytes(
+        [
+            0xFF,
+            0xF1,
+            0x50,
+            0x80 | (length >> 11),
+            (length >> 3) & 0xFF,
+            (length & 7) << 5,
+            0xFC,
+        ]
+    )
+    return (header + b"\x00" * (length - len(header))) * frames
+
+
+def _box(box_type: bytes, body: bytes) -> bytes:
+    return (8 + len(body)).to_bytes(4, "big") + box_type + body
+
+
+def _mp4(seconds: int, timescale: int = 1000) -> bytes:
+    mvhd = _box(
+        b"mvhd",
+        b"\x00" * 12
+        + timescale.to_bytes(4, "big")
+        + (seconds * timescale).to_bytes(4, "big")
+        + b"\x00" * 80,
+    )
+    return _box(b"ftyp", b"isom\x00\x00\x02\x00") + _box(b"moov", mvhd)
+
+
+def _webm(duration_ms: float) -> bytes:
+    return (
+        b"\x1a\x45\xdf\xa3\x80"
+        + b"\x2a\xd7\xb1\x83"
+        + (1_000_000).to_bytes(3, "big")
+        + b"\x44\x89\x88"
+        + struct.pack(">d", duration_ms)
+        + b"\x1f\x43\xb6\x75"
+    )
+
+
+def _ogg_opus(seconds: int, pre_skip: int = 312) -> bytes:
+    first = (
+        b"OggS\x00\x02"
+        + b"\x00" * 22
+        + b"OpusHead\x01\x01"
+        + pre_skip.to_bytes(2, "little")
+    )
+    granule = (seconds * 48000 + pre_skip).to_bytes(8, "little")
+    last = b"OggS\x00\x04" + granule + b"\x00" * 14
+    return first + b"\x00" * 100 + last
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (_wav(0.1), "wav"),
+        (_flac(16000), "flac"),
+        (_mp3_cbr(64), "mp3"),
+        (b"ID3\x04\x00\x00\x00\x00\x00\x00", "mp3"),
+        (_adts(1), "aac"),
+        (_mp4(1), "mp4"),
+        (_webm(1000), "webm"),
+        (_ogg_opus(1), "ogg"),
+        (b"not audio at all", "unknown"),
+    ],
+)
+def test_detect_format(data, expected):
+    assert detect_format(data) == expected
+
+
+def test_wav_duration():
+    data = _wav(2.5)
+    assert parse_duration(data[:64], len(data)) == ("wav", pytest.approx(2.5))
+
+
+def test_wav_streamed_data_size_uses_object_size():
+    data = bytearray(_wav(1.0))
+    data[40:44] = b"\xff\xff\xff\xff"
+    assert parse_duration(bytes(data[:64]), len(data))[1] == pytest.approx(1.0)
+
+
+def test_flac_duration():
+    assert parse_duration(_flac(48000), None) == ("flac", 3.0)
+
+
+def test_mp3_cbr_duration():
+    assert parse_duration(_mp3_cbr(64), 16000) == ("mp3", pytest.approx(1.0))
+
+
+def test_mp3_xing_frame_count():
+    assert parse_duration(_mp3_xing(100), None)[1] == pytest.approx(100 * 1152 / 44100)
+
+
+def test_mp3_cbr_needs_size():
+    assert parse_duration(_mp3_cbr(64), None) == ("mp3", None)
+
+
+def test_aac_duration_from_average_frame():
+    data = _adts(10)
+    assert parse_duration(data, len(data))[1] == pytest.approx(10 * 1024 / 44100)
+
+
+def test_webm_duration():
+    assert parse_duration(_webm(5000.0), None) == ("webm", pytest.approx(5.0))
+
+
+def test_webm_without_duration():
+    assert parse_duration(b"\x1a\x45\xdf\xa3\x80\x1f\x43\xb6\x75", None) == (
+        "webm",
+        None,
+    )
+
+
+def test_mp4_moov_first():
+    assert mp4_duration(_mp4(7), 0) == (7.0, None)
+    assert parse_duration_bytes(_mp4(7)) == ("mp4", 7.0)
+
+
+def test_mp4_moov_after_mdat_asks_for_next_box():
+    ftyp = _box(b"ftyp", b"isom\x00\x00\x02\x00")
+    mdat_header = (1_000_000).to_bytes(4, "big") + b"mdat"
+    duration, next_offset = mp4_duration(ftyp + mdat_header, 0)
+    assert duration is None
+    assert next_offset == len(ftyp) + 1_000_000
+
+
+def test_ogg_opus_duration():
+    assert parse_duration_bytes(_ogg_opus(3)) == ("ogg", 3.0)
+
+
+def test_truncated_headers_return_none():
+    assert parse_duration(_wav(1.0)[:20], None) == ("wav", None)
+    assert parse_duration(b"fLaC\x00", None) == ("flac", None)
+    assert parse_duration_bytes(b"\x00\x00\x00\x20ftyp") == ("mp4", None)
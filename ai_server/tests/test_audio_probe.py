@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+
+from app.services.audio_probe import AudioProbe
+
+AUDIO = b"\x00" * 64
+
+
+def make_probe(etags: dict) -> AudioProbe:
+    """
+    AudioProbe answering Range GETs with the ETag configured per path.
+    """
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        headers = {"content-range": f"bytes 0-0/{len(AUDIO)}"}
+        if etags.get(request.url.path):
+            headers["etag"] = etags[request.url.path]
+        return httpx.Response(206, headers=headers, content=AUDIO[:1])
+
+    probe = AudioProbe()
+    probe._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return probe
+
+
+def identify(probe: AudioProbe, url: str):
+    return asyncio.run(probe.identify(url))
+
+
+def test_resigned_url_keeps_its_identity():
+    probe = make_probe({"/a.wav": '"abc"'})
+    first = identify(probe, "https://b.s3.amazonaws.com/a.wav?X-Amz-Signature=1")
+    retry = identify(probe, "https://b.s3.amazonaws.com/a.wav?X-Amz-Signature=2")
+    assert first == retry
+    assert first.startswith("etag:https://b.s3.amazonaws.com/a.wav:abc:")
+
+
+def test_same_etag_on_different_paths_is_not_shared():
+    # nginx / Apache ETags are mtime + size, so two files can share one
+    probe = make_probe({"/a.wav": '"5f1-40"', "/b.wav": '"5f1-40"'})
+    assert identify(probe, "https://cdn.example.com/a.wav") != identify(
+        probe, "https://cdn.example.com/b.wav"
+    )
+
+
+def test_weak_etag_falls_back_to_content_hash():
+    probe = make_probe({"/a.wav": 'W/"5f1-40"'})
+    assert identify(probe, "https://cdn.example.com/a.wav").startswith("sha256:")
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.circuit_breaker import CircuitBreaker
+
+
+def _open(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    _open(breaker)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(HTTPException) as exc:
+        breaker.before_call()
+    assert exc.value.status_code == 503
+    assert "CIRCUIT_OPEN" in exc.value.detail
+    assert breaker.get_stats()["rejected"] == 1
+
+
+def test_half_open_lets_one_trial_through(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    _open(breaker)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(HTTPException):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_failed_trial_reopens(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30)
+    _open(breaker)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.get_stats()["opened"] == 2
+
+
+def test_release_frees_the_trial_slot(monkeypatch):
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=30)
+    _open(breaker)
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,213 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.services.runpod_client import RunPodClient
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(settings, "RUNPOD_RUNSYNC_ENABLED", False)
+    monkeypatch.setattr(settings, "RUNPOD_HEDGE_ENABLED", False)
+    monkeypatch.setattr(settings, "RUNPOD_POLL_MIN_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "RUNPOD_POLL_MAX_INTERVAL_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "RUNPOD_EXPECTED_JOB_SECONDS", 0.01)
+
+
+class FakeRunPod:
+    """
+    Answers the RunPod serverless routes from canned job states and records
+    every request made by the client.
+    """
+
+    def __init__(self, statuses=None, streams=None):
+        # job id -> status payload returned by /status
+        self.statuses = statuses or {}
+        # job id -> items returned (once) by /stream
+        self.streams = streams or {}
+        self.submitted = []
+        self.cancelled = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/")
+        action = path[3]
+        job_id = path[4] if len(path) > 4 else None
+        if action == "run":
+            job_id = f"job-{len(self.submitted) + 1}"
+            self.submitted.append(job_id)
+            return httpx.Response(200, json={"id": job_id, "status": "IN_QUEUE"})
+        if action == "status":
+            status = self.statuses.get(job_id, {"status": "IN_QUEUE"})
+            return httpx.Response(200, json={"id": job_id, **status})
+        if action == "stream":
+            status = self.statuses.get(job_id, {"status": "IN_QUEUE"})["status"]
+            items = self.streams.pop(job_id, [])
+            return httpx.Response(
+                200,
+                json={"status": status, "stream": [{"output": i} for i in items]},
+            )
+        if action == "cancel":
+            self.cancelled.append(job_id)
+            return httpx.Response(200, json={"id": job_id, "status": "CANCELLED"})
+        return httpx.Response(404)
+
+
+def make_client(fake: FakeRunPod) -> RunPodClient:
+    client = RunPodClient(endpoint_id="test")
+    client.api_key = "key"
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    return client
+
+
+def test_completed_job_returns_output():
+    fake = FakeRunPod({"job-1": {"status": "COMPLETED", "output": {"text": "안녕"}}})
+
+    async def run():
+        return await make_client(fake).transcribe("https://x/a.wav", timeout=5)
+
+    assert asyncio.run(run())["text"] == "안녕"
+    assert fake.cancelled == []
+
+
+def test_timeout_cancels_the_job():
+    fake = FakeRunPod()
+    client = make_client(fake)
+
+    async def run():
+        await client.transcribe("https://x/a.wav", timeout=0.05)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 504
+    assert fake.cancelled == ["job-1"]
+    assert client.circuit_breaker.get_stats()["consecutive_failures"] == 1
+
+
+def test_failed_job_is_not_cancelled():
+    fake = FakeRunPod({"job-1": {"status": "FAILED", "error": "bad audio"}})
+
+    async def run():
+        await make_client(fake).transcribe("https://x/a.wav", timeout=5)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 500
+    assert fake.cancelled == []
+
+
+def test_hedge_loser_is_cancelled(monkeypatch):
+    monkeypatch.setattr(settings, "RUNPOD_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "RUNPOD_HEDGE_DEFAULT_DELAY_SECONDS", 0.0)
+    # The original stays queued; the hedge completes
+    fake = FakeRunPod({"job-2": {"status": "COMPLETED", "output": {"text": "ok"}}})
+    client = make_client(fake)
+
+    async def run():
+        return await client.transcribe("https://x/a.wav", timeout=5)
+
+    assert asyncio.run(run())["text"] == "ok"
+    assert fake.submitted == ["job-1", "job-2"]
+    assert fake.cancelled == ["job-1"]
+    assert client.get_stats()["hedge_wins"] == 1
+
+
+def test_hedged_timeout_cancels_both_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "RUNPOD_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "RUNPOD_HEDGE_DEFAULT_DELAY_SECONDS", 0.0)
+    fake = FakeRunPod()
+
+    async def run():
+        await make_client(fake).transcribe("https://x/a.wav", timeout=0.1)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(run())
+    assert sorted(fake.cancelled) == ["job-1", "job-2"]
+
+
+@pytest.mark.parametrize(
+    "output, expected",
+    [
+        ({"text": "a"}, {"text": "a"}),
+        (
+            [{"type": "segment", "text": "a"}, {"type": "final", "text": "ab"}],
+            {"text": "ab"},
+        ),
+        (
+            [{"type": "segment", "text": "a"}, {"type": "error", "error": "boom"}],
+            {"error": "boom"},
+        ),
+        ([{"type": "segment", "text": "a"}, {"error": "boom"}], {"error": "boom"}),
+        ([], {"error": "Worker returned no output"}),
+    ],
+)
+def test_unwrap_output(output, expected):
+    assert RunPodClient._unwrap_output(output) == expected
+
+
+@pytest.mark.parametrize(
+    "output",
+    [
+        [{"type": "segment", "text": "a"}, {"type": "error", "error": "decode failed"}],
+        [{"error": "decode failed"}],
+    ],
+)
+def test_error_item_in_completed_stream_fails_the_job(output):
+    fake = FakeRunPod({"job-1": {"status": "COMPLETED", "output": output}})
+    client = make_client(fake)
+
+    async def run():
+        await client.transcribe("https://x/a.wav", timeout=5)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 500
+    assert "decode failed" in exc.value.detail
+    assert client.circuit_breaker.get_stats()["consecutive_failures"] == 1
+
+
+def test_error_item_fails_a_batch_job():
+    output = [{"type": "error", "error": "decode failed"}]
+    fake = FakeRunPod({"job-1": {"status": "COMPLETED", "output": output}})
+
+    async def run():
+        await make_client(fake).transcribe_batch(["https://x/a.wav"], timeout=5)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(run())
+    assert exc.value.status_code == 500
+
+
+def stream_events(fake: FakeRunPod) -> list:
+    async def run():
+        client = make_client(fake)
+        return [event async for event in client.stream_transcribe("https://x/a.wav")]
+
+    return asyncio.run(run())
+
+
+def test_stream_yields_worker_events():
+    fake = FakeRunPod(
+        {"job-1": {"status": "COMPLETED"}},
+        {"job-1": [{"type": "segment", "text": "a"}, {"type": "final", "text": "a"}]},
+    )
+    assert [e["type"] for e in stream_events(fake)] == ["segment", "final"]
+    assert fake.cancelled == []
+
+
+def test_stream_without_terminal_item_reads_status():
+    # A worker without stream_handler leaves /stream empty
+    fake = FakeRunPod({"job-1": {"status": "COMPLETED", "output": {"text": "ok"}}})
+    events = stream_events(fake)
+    assert len(events) == 1
+    assert events[0]["type"] == "final"
+    assert events[0]["text"] == "ok"
+
+
+@pytest.mark.parametrize("output", [None, {"error": "decode failed"}])
+def test_stream_without_result_ends_in_error(output):
+    fake = FakeRunPod({"job-1": {"status": "COMPLETED", "output": output}})
+    events = stream_events(fake)
+    assert [e["type"] for e in events] == ["error"]
@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI
+
+from test_runpod_client import FakeRunPod, fast_polling, make_client  # noqa: F401
+
+
+class SlowRunPod(FakeRunPod):
+    """
+    FakeRunPod whose /status answers take a while, like a slow RunPod API.
+    """
+
+    def __init__(self, statuses=None, delay=0.05):
+        super().__init__(statuses)
+        self.delay = delay
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.delay)
+        return self(request)
+
+
+def make_app(client) -> FastAPI:
+    # Same shutdown path as app.main: the lifespan closes the pooled client
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        yield
+        await client.close()
+
+    app = FastAPI(lifespan=lifespan)
+
+    @app.get("/health")
+    def health_check():
+        return {"status": "ok"}
+
+    @app.post("/transcribe")
+    async def transcribe():
+        return await client.transcribe("https://x/a.wav", timeout=5)
+
+    return app
+
+
+def test_health_answers_during_a_long_poll():
+    fake = SlowRunPod()
+    client = make_client(fake)
+    client._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handle))
+    app = make_app(client)
+
+    async def run():
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://test"
+        ) as http:
+            job = asyncio.create_task(http.post("/transcribe"))
+            await asyncio.sleep(0.1)
+
+            # The job is still polling RunPod, yet /health answers right away
+            started = asyncio.get_running_loop().time()
+            health = await http.get("/health")
+            elapsed = asyncio.get_running_loop().time() - started
+            assert health.json() == {"status": "ok"}
+            assert elapsed < fake.delay
+            assert not job.done()
+
+            fake.statuses["job-1"] = {"status": "COMPLETED", "output": {"text": "ok"}}
+            response = await job
+        return response
+
+    response = asyncio.run(run())
+    assert response.json()["text"] == "ok"
+
+
+def test_lifespan_shutdown_closes_the_pool():
+    fake = FakeRunPod({"job-1": {"status": "COMPLETED", "output": {"text": "ok"}}})
+    client = make_client(fake)
+    app = make_app(client)
+
+    async def run():
+        pool = client._client
+        async with app.router.lifespan_context(app):
+            await client.transcribe("https://x/a.wav", timeout=5)
+            # Every request went through the one pooled client
+            assert client._client is pool
+            assert not pool.is_closed
+        return pool
+
+    pool = asyncio.run(run())
+    assert pool.is_closed
+    assert client._client is None
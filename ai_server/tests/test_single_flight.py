@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from app.services.audio_probe import normalize_url
+from app.services.transcription_service import TranscriptionService
+
+
+def test_concurrent_callers_share_one_call():
+    service = TranscriptionService()
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"text": "안녕하세요"}
+
+    async def run():
+        return await asyncio.gather(
+            *(service._single_flight("key", factory) for _ in range(5))
+        )
+
+    results = asyncio.run(run())
+    assert results == [{"text": "안녕하세요"}] * 5
+    assert len(calls) == 1
+    assert service.get_stats()["coalesced"] == 4
+    assert service.get_stats()["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    service = TranscriptionService()
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return {}
+
+    async def run():
+        await asyncio.gather(
+            service._single_flight("a", factory),
+            service._single_flight("b", factory),
+        )
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_errors_reach_every_waiter():
+    service = TranscriptionService()
+
+    async def factory():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("worker failed")
+
+    async def run():
+        return await asyncio.gather(
+            *(service._single_flight("key", factory) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert service.get_stats()["in_flight"] == 0
+
+
+def test_shared_call_survives_until_last_waiter_leaves():
+    service = TranscriptionService()
+    started = []
+
+    async def factory():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return {"text": "done"}
+
+    async def run():
+        first = asyncio.create_task(service._single_flight("key", factory))
+        second = asyncio.create_task(service._single_flight("key", factory))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # One waiter left: the shared call keeps running for it
+        result = await second
+
+        third = asyncio.create_task(service._single_flight("key", factory))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await third
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == {"text": "done"}
+    assert len(started) == 2
+    assert service.get_stats()["cancelled"] == 1
+    assert service.get_stats()["in_flight"] == 0
+
+
+def test_normalize_url_drops_only_signing_params():
+    first = normalize_url(
+        "https://Bucket.S3.amazonaws.com/a.wav?X-Amz-Algorithm=AWS4-HMAC-SHA256"
+        "&X-Amz-Credential=abc&X-Amz-Signature=111&X-Amz-Expires=300"
+    )
+    retry = normalize_url(
+        "https://bucket.s3.amazonaws.com/a.wav?X-Amz-Signature=222&x-amz-date=1"
+    )
+    assert first == retry == "https://bucket.s3.amazonaws.com/a.wav"
+
+    cloudfront = "https://cdn.example.com/a.wav?Expires=1&Signature=x&Key-Pair-Id=k"
+    assert normalize_url(cloudfront) == "https://cdn.example.com/a.wav"
+
+
+def test_normalize_url_keeps_object_params():
+    assert normalize_url("https://api.example.com/audio?id=1") != normalize_url(
+        "https://api.example.com/audio?id=2"
+    )
+    # Order does not matter, and signing params are still ignored
+    assert normalize_url(
+        "https://api.example.com/audio?b=2&a=1&Signature=x"
+    ) == normalize_url("https://api.example.com/audio?a=1&b=2&Signature=y")
+    assert (
+        normalize_url("https://x.blob.core.windows.net/c/a.wav?versionid=3&sv=1&sig=s")
+        == "https://x.blob.core.windows.net/c/a.wav?versionid=3"
+    )
+
+
+def test_caller_arriving_during_cancellation_starts_a_new_call():
+    service = TranscriptionService()
+    started = []
+
+    async def factory():
+        started.append(1)
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            # Like _await_job waiting on the shielded /cancel request
+            await asyncio.sleep(0.1)
+            raise
+        return {"text": "done"}
+
+    async def quick():
+        started.append(1)
+        return {"text": "fresh"}
+
+    async def run():
+        first = asyncio.create_task(service._single_flight("key", factory))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        # The cancelled call is still winding down; a new caller must not join it
+        result = await service._single_flight("key", quick)
+        await asyncio.sleep(0.15)
+        return result
+
+    assert asyncio.run(run()) == {"text": "fresh"}
+    assert len(started) == 2
+    assert service.get_stats()["in_flight"] == 0
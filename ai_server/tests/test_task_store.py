@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.task_store import TaskStore
+
+
+@pytest.fixture
+def store(monkeypatch):
+    # TaskStore is a process-wide singleton; each test gets a fresh one
+    monkeypatch.setattr(TaskStore, "_instance", None)
+    monkeypatch.setattr(settings, "TASK_STORE_TTL_SECONDS", 60)
+    monkeypatch.setattr(settings, "TASK_STORE_MAX_ENTRIES", 3)
+    monkeypatch.setattr(settings, "TASK_STORE_MAX_BYTES", 1024 * 1024)
+    monkeypatch.setattr(settings, "TASK_STORE_COMPRESS_MIN_BYTES", 64)
+    return TaskStore()
+
+
+def test_round_trip_and_compression(store):
+    small = {"text": "짧은 결과"}
+    large = {"text": "긴 결과 " * 100}
+    store.save_task("small", "COMPLETED", result=small)
+    store.save_task("large", "COMPLETED", result=large)
+
+    assert store.get_task("small")["result"] == small
+    assert store.get_task("large")["result"] == large
+    assert store._tasks["small"]["compressed"] is False
+    assert store._tasks["large"]["compressed"] is True
+
+
+def test_error_is_kept_as_is(store):
+    error = {"code": "STT_FAILURE", "msg": "boom"}
+    store.save_task("t", "FAILED", error=error)
+    task = store.get_task("t")
+    assert task == {"taskId": "t", "status": "FAILED", "result": None, "error": error}
+
+
+def test_finished_tasks_expire(store, monkeypatch):
+    store.save_task("done", "COMPLETED", result={})
+    store.save_task("running", "PROCESSING")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.get_task("done") is None
+    assert store.get_task("running")["status"] == "PROCESSING"
+    assert store.get_stats()["expirations"] == 1
+
+
+def test_sweep_removes_only_expired(store, monkeypatch):
+    store.save_task("a", "COMPLETED", result={})
+    store.save_task("b", "FAILED", error={"code": "X", "msg": ""})
+    store.save_task("c", "PENDING")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert store.sweep() == 2
+    assert list(store._tasks) == ["c"]
+
+
+def test_lru_eviction_spares_active_and_latest(store):
+    store.save_task("old", "COMPLETED", result={})
+    store.save_task("recent", "COMPLETED", result={})
+    store.save_task("running", "PROCESSING")
+    # Reading "old" makes "recent" the least recently used finished task
+    store.get_task("old")
+    store.save_task("new", "COMPLETED", result={})
+
+    assert set(store._tasks) == {"old", "running", "new"}
+    assert store.get_stats()["evictions"] == 1
+
+
+def test_active_tasks_are_never_evicted(store):
+    for i in range(4):
+        store.save_task(f"t{i}", "PROCESSING")
+    store.save_task("t4", "COMPLETED", result={})
+
+    assert len(store._tasks) == 5
+    assert store.get_stats()["active"] == 4
+
+
+def test_byte_budget_is_tracked(store, monkeypatch):
+    store.save_task("a", "COMPLETED", result={"text": "x" * 10})
+    size = store.get_stats()["bytes"]
+    store.save_task("a", "COMPLETED", result={"text": "x" * 10})
+    assert store.get_stats()["bytes"] == size
+
+    store.delete_task("a")
+    assert store.get_stats()["bytes"] == 0
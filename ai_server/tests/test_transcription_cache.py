@@ -0,0 +1,98 @@
+import asyncio
+import os
+import time
+
+from app.services.transcription_cache import TranscriptionCache
+
+
+def test_memory_hit_and_miss():
+    cache = TranscriptionCache(max_entries=4, ttl_seconds=60, disk_dir="")
+
+    async def run():
+        assert await cache.get("a") is None
+        await cache.set("a", {"text": "안녕하세요"})
+        return await cache.get("a")
+
+    assert asyncio.run(run()) == {"text": "안녕하세요"}
+    stats = cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TranscriptionCache(max_entries=2, ttl_seconds=60, disk_dir="")
+
+    async def run():
+        await cache.set("a", {"text": "a"})
+        await cache.set("b", {"text": "b"})
+        await cache.get("a")
+        await cache.set("c", {"text": "c"})
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(run()) == [{"text": "a"}, None, {"text": "c"}]
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_expired_memory_entry_is_a_miss(monkeypatch):
+    cache = TranscriptionCache(max_entries=4, ttl_seconds=10, disk_dir="")
+    asyncio.run(cache.set("a", {"text": "a"}))
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert asyncio.run(cache.get("a")) is None
+    assert cache.get_stats()["expirations"] == 1
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    first = TranscriptionCache(max_entries=4, ttl_seconds=60, disk_dir=str(tmp_path))
+    asyncio.run(first.set("a", {"text": "a"}))
+
+    second = TranscriptionCache(max_entries=4, ttl_seconds=60, disk_dir=str(tmp_path))
+    assert asyncio.run(second.get("a")) == {"text": "a"}
+    assert second.get_stats()["disk_hits"] == 1
+    # Promoted to memory: the next read does not touch the disk
+    assert asyncio.run(second.get("a")) == {"text": "a"}
+    assert second.get_stats()["hits"] == 1
+
+
+def test_expired_disk_entry_is_removed(tmp_path, monkeypatch):
+    cache = TranscriptionCache(max_entries=4, ttl_seconds=10, disk_dir=str(tmp_path))
+    asyncio.run(cache.set("a", {"text": "a"}))
+    cache._entries.clear()
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert asyncio.run(cache.get("a")) is None
+    assert not os.path.exists(cache._disk_path("a"))
+
+
+def test_corrupt_disk_entry_is_a_miss(tmp_path):
+    cache = TranscriptionCache(max_entries=4, ttl_seconds=60, disk_dir=str(tmp_path))
+    with open(cache._disk_path("a"), "w", encoding="utf-8") as f:
+        f.write("{not json")
+    assert asyncio.run(cache.get("a")) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_disk_entry_that_cannot_be_removed_is_a_miss(tmp_path, monkeypatch):
+    cache = TranscriptionCache(max_entries=4, ttl_seconds=10, disk_dir=str(tmp_path))
+    asyncio.run(cache.set("a", {"text": "a"}))
+    cache._entries.clear()
+
+    def fail(path):
+        raise PermissionError(path)
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    monkeypatch.setattr(os, "remove", fail)
+    assert asyncio.run(cache.get("a")) is None
+    assert cache.get_stats()["misses"] == 1
+
+
+def test_disk_entry_with_missing_fields_is_removed(tmp_path):
+    cache = TranscriptionCache(max_entries=4, ttl_seconds=60, disk_dir=str(tmp_path))
+    with open(cache._disk_path("a"), "w", encoding="utf-8") as f:
+        f.write('{"result": {}}')
+    assert asyncio.run(cache.get("a")) is None
+    assert not os.path.exists(cache._disk_path("a"))
@@ -0,0 +1,58 @@
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.api.v1.endpoints import transcription
+from app.services.transcription_service import transcription_service
+
+
+@pytest.fixture
+def client():
+    # Only the transcription router: app.main pulls in the LLM services
+    app = FastAPI()
+    app.include_router(transcription.router, prefix="/api/v1")
+    return TestClient(app)
+
+
+def _stub_transcribe(monkeypatch, result):
+    async def transcribe(audio_url, language=None, profile=None):
+        return result
+
+    monkeypatch.setattr(transcription_service, "transcribe", transcribe)
+
+
+def test_transcript_is_returned(client, monkeypatch):
+    _stub_transcribe(monkeypatch, {"text": "안녕하세요"})
+    response = client.post(
+        "/api/v1/transcriptions", json={"audioUrl": "https://example.com/a.wav"}
+    )
+    assert response.status_code == 200
+    assert response.json() == {
+        "success": True,
+        "data": {"text": "안녕하세요"},
+        "error": None,
+    }
+
+
+def test_worker_error_is_not_an_empty_transcript(client, monkeypatch):
+    _stub_transcribe(monkeypatch, {"error": "Failed to download audio"})
+    response = client.post(
+        "/api/v1/transcriptions", json={"audioUrl": "https://example.com/a.wav"}
+    )
+    assert response.status_code == 500
+    body = response.json()
+    assert body["success"] is False
+    assert body["error"].startswith("DOWNLOAD_FAILURE: ")
+
+
+def test_stream_rejects_long_audio_before_streaming(client, monkeypatch):
+    async def probe(audio_url):
+        raise HTTPException(status_code=413, detail="AUDIO_TOO_LONG: 7200s")
+
+    monkeypatch.setattr(transcription_service, "_probe", probe)
+    response = client.post(
+        "/api/v1/transcriptions/stream",
+        json={"audioUrl": "https://example.com/a.wav"},
+    )
+    assert response.status_code == 413
+    assert response.json()["error"].startswith("AUDIO_TOO_LONG: ")
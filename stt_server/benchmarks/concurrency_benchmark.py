@@ -0,0 +1,105 @@
+"""
+Throughput of one STT worker at different job concurrency levels.
+
+Runs the jobs through the local RunPod emulator with the worker's own
+runpod.serverless.start() config (handler.worker_config), so each level goes
+through the same path as on RunPod: MAX_CONCURRENT_JOBS -> concurrency_modifier
+-> async handler on the worker event loop. Downloads and decoding of waiting
+jobs overlap with inference; inference itself is limited to MODEL_NUM_WORKERS
+at a time. The model is loaded once and shared by every level.
+
+    cd stt_server
+    MODEL_NUM_WORKERS=2 python benchmarks/concurrency_benchmark.py \\
+        --audio-url https://.../a.webm --audio-url https://.../b.webm \\
+        --jobs 24 --concurrency 1 2 4
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Make handler.py / services / emulator importable regardless of the working directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def run_level(job_inputs, concurrency):
+    from config import settings
+    from emulator.runpod_emulator import RunPodEmulator
+
+    # worker_config() reads MAX_CONCURRENT_JOBS when the worker starts
+    # worker_config()는 워커 시작 시점의 MAX_CONCURRENT_JOBS를 읽음
+    settings.MAX_CONCURRENT_JOBS = concurrency
+    emulator = RunPodEmulator(config_path="handler:worker_config", workers=1)
+
+    # Warm-up job: the worker takes one job, then scales up to the modifier
+    # 워밍업 작업: 워커는 작업 하나를 먼저 받은 뒤 modifier 값만큼 늘어남
+    emulator.submit(job_inputs[0]).done.wait()
+
+    started = time.perf_counter()
+    jobs = [emulator.submit(job_input) for job_input in job_inputs]
+    for job in jobs:
+        job.done.wait()
+    wall = time.perf_counter() - started
+
+    latencies = [
+        job.finished_at - job.submitted_at for job in jobs if job.status == "COMPLETED"
+    ]
+    return {
+        "concurrency": concurrency,
+        "succeeded": len(latencies),
+        "failed": len(jobs) - len(latencies),
+        "wall_seconds": round(wall, 3),
+        "jobs_per_hour": round(len(latencies) / wall * 3600, 1),
+        "latency_p50": round(_percentile(latencies, 0.5), 3) if latencies else None,
+        "latency_p95": round(_percentile(latencies, 0.95), 3) if latencies else None,
+        "latency_mean": round(statistics.mean(latencies), 3) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="STT worker concurrency benchmark")
+    parser.add_argument("--audio-url", action="append", required=True)
+    parser.add_argument("--jobs", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--language", default="ko")
+    parser.add_argument("--profile", default=None)
+    args = parser.parse_args()
+
+    from handler import inference_service
+
+    job_inputs = [
+        {
+            "audio_url": args.audio_url[i % len(args.audio_url)],
+            "language": args.language,
+            "profile": args.profile,
+        }
+        for i in range(args.jobs)
+    ]
+
+    report = []
+    for concurrency in args.concurrency:
+        wait_before = inference_service.get_stats()["inference_wait"]
+        level = run_level(job_inputs, concurrency)
+        # Seconds jobs spent queued for a model slot at this level
+        level["inference_wait_seconds"] = round(
+            inference_service.get_stats()["inference_wait"] - wait_before, 3
+        )
+        if report and report[0]["jobs_per_hour"]:
+            level["speedup"] = round(
+                level["jobs_per_hour"] / report[0]["jobs_per_hour"], 2
+            )
+        report.append(level)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Real-time factor (inference seconds per audio second) of the worker model on
+the current node, e.g. to size CPU int8 overflow capacity:
+
+    cd stt_server
+    DEVICE=cpu COMPUTE_TYPE=int8 python benchmarks/rtf_benchmark.py \\
+        --audio ./samples/answer.webm --audio https://.../lecture.mp3 \\
+        --profile fast --profile accurate
+
+Device, compute type, num_workers and cpu_threads come from the same settings
+as the worker (DEVICE, COMPUTE_TYPE, MODEL_NUM_WORKERS, CPU_THREADS).
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Make services / utils importable regardless of the working directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def load_samples(sources):
+    from utils.audio_loader import SAMPLING_RATE, audio_loader
+
+    samples = []
+    for source in sources:
+        if source.startswith(("http://", "https://")):
+            audio, _ = audio_loader.load_audio(source)
+        else:
+            with open(source, "rb") as f:
+                audio = audio_loader.decode_bytes(f.read())
+        samples.append((source, audio, len(audio) / SAMPLING_RATE))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker real-time factor benchmark")
+    parser.add_argument("--audio", action="append", required=True, help="path or URL")
+    parser.add_argument("--profile", action="append", default=None)
+    parser.add_argument("--language", default="ko")
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    from services.decoding_profiles import DECODING_PROFILES
+    from services.model_service import ModelService
+
+    load_started = time.perf_counter()
+    model_service = ModelService()
+    model = model_service.get_model()
+    load_seconds = time.perf_counter() - load_started
+
+    samples = load_samples(args.audio)
+    report = {
+        "runtime": model_service.runtime,
+        "model_load_seconds": round(load_seconds, 3),
+        "profiles": {},
+    }
+
+    for profile in args.profile or ["accurate"]:
+        options = DECODING_PROFILES[profile]
+        rows = []
+        for source, audio, duration in samples:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                segments, _ = model.transcribe(audio, language=args.language, **options)
+                list(segments)
+                elapsed = time.perf_counter() - started
+                rows.append(
+                    {
+                        "audio": source,
+                        "audio_seconds": round(duration, 2),
+                        "inference_seconds": round(elapsed, 3),
+                        "rtf": round(elapsed / duration, 4) if duration else None,
+                    }
+                )
+        total_audio = sum(row["audio_seconds"] for row in rows)
+        total_inference = sum(row["inference_seconds"] for row in rows)
+        report["profiles"][profile] = {
+            "runs": rows,
+            "mean_rtf": round(statistics.mean(row["rtf"] for row in rows), 4),
+            # Total inference time over total audio time for this profile
+            "overall_rtf": round(total_inference / total_audio, 4),
+        }
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Reproducible benchmark of the whole worker pipeline on a fixed Korean sample
+set (benchmarks/samples/manifest.json): model load, download / decode /
+inference time, real-time factor, peak RSS, and WER / CER against the
+reference transcripts. Runs on CPU with a small int8 CTranslate2 model, so it
+fits on a laptop or a CI runner:
+
+    cd stt_server
+    # once: a small CTranslate2 Whisper model
+    MODEL_SIZE=Systran/faster-whisper-small MODEL_PATH=benchmarks/models/small \\
+        python builder/download_model.py
+
+    python benchmarks/stt_benchmark.py --model benchmarks/models/small \\
+        --output baseline.json
+    # after a change: exits with 1 when a metric regressed past its threshold
+    python benchmarks/stt_benchmark.py --model benchmarks/models/small \\
+        --baseline baseline.json --output report.json
+
+The recordings are not checked in yet (see the manifest description for what
+to record); the report stores the SHA-256 of every clip it ran, and timings
+are only compared against a baseline made from the same files. Samples are
+served from a local HTTP server, so AudioLoader's download and decode path is
+measured exactly as in a job. Device, compute type and thread
+counts are pinned (override with the usual worker env vars) because RTF only
+compares across runs with the same runtime.
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# Make services / utils importable regardless of the working directory
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARK_DIR))
+
+DEFAULT_MANIFEST = os.path.join(BENCHMARK_DIR, "samples", "manifest.json")
+
+# Pinned worker settings (environment variables still win)
+# 재현성을 위해 고정한 워커 설정 (환경 변수로 지정하면 그 값을 사용)
+BENCHMARK_ENV = {
+    "DEVICE": "cpu",
+    "COMPUTE_TYPE": "int8",
+    "MODEL_NUM_WORKERS": "1",
+    "CPU_THREADS": "4",
+    "AUTOTUNE_ENABLED": "false",
+}
+
+# Per-sample stage timings copied from the worker result
+# 워커 결과에서 가져오는 샘플별 단계 시간
+STAGES = ("download", "decode", "audio_load", "preprocess", "inference", "total")
+
+# Baseline comparison: (summary key, relative?) -- lower is better for all
+# 기준 비교 항목: (요약 키, 상대 비교 여부) - 모두 낮을수록 좋음
+GATED_METRICS = {
+    "overall_rtf": True,
+    "peak_rss_mb": True,
+    "wer": False,
+    "cer": False,
+}
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_directory(directory: str) -> ThreadingHTTPServer:
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    directory = os.path.dirname(os.path.abspath(path))
+    missing = [
+        sample["audio"]
+        for sample in manifest["samples"]
+        if not os.path.isfile(os.path.join(directory, sample["audio"]))
+    ]
+    if missing:
+        sys.exit(
+            f"Missing sample audio in {directory}: {', '.join(missing)}\n"
+            "Record each 'reference' sentence as a 16 kHz mono WAV under the "
+            "'audio' name next to the manifest."
+        )
+    manifest["directory"] = directory
+    return manifest
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    # ru_maxrss 단위: Linux는 KiB, macOS는 바이트
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_sample(service, url: str, sample: dict, language: str, args) -> dict:
+    from utils.text_metrics import character_error_rate, word_error_rate
+
+    runs = []
+    for _ in range(args.repeat):
+        result = service.transcribe(
+            url, language=language, mode=args.mode, profile=args.profile
+        )
+        timings = result["timings"]
+        runs.append(
+            {
+                **{
+                    stage: timings.get(stage)
+                    for stage in STAGES
+                    if stage != "inference"
+                },
+                "inference": round(
+                    timings["language_detection"] + timings["decoding"], 4
+                ),
+                "rtf": result["real_time_factor"],
+                "text": result["text"],
+                "audio_seconds": result["audio_duration"],
+            }
+        )
+
+    # Median over repeats; the text of the last run is scored
+    # 반복 실행의 중앙값 사용, 정확도는 마지막 실행의 텍스트로 평가
+    row = {"id": sample["id"], "audio_seconds": runs[-1]["audio_seconds"]}
+    for key in STAGES + ("rtf",):
+        values = [run[key] for run in runs if run[key] is not None]
+        row[key] = round(statistics.median(values), 4) if values else None
+    text = runs[-1]["text"].strip()
+    row["wer"] = round(word_error_rate(sample["reference"], text), 4)
+    row["cer"] = round(character_error_rate(sample["reference"], text), 4)
+    row["text"] = text
+    return row
+
+
+def summarize(rows: list, manifest: dict) -> dict:
+    from utils.text_metrics import normalize_words
+
+    references = {sample["id"]: sample["reference"] for sample in manifest["samples"]}
+    total_audio = sum(row["audio_seconds"] for row in rows)
+    total_inference = sum(row["inference"] for row in rows)
+
+    # Corpus-level error rates: weighted by reference length, not per-file means
+    # 코퍼스 단위 오류율 (파일별 평균이 아닌 참조 길이 가중치 적용)
+    def weighted(metric, length):
+        lengths = {row["id"]: length(references[row["id"]]) for row in rows}
+        total = sum(lengths.values())
+        return (
+            round(sum(row[metric] * lengths[row["id"]] for row in rows) / total, 4)
+            if total
+            else None
+        )
+
+    return {
+        "samples": len(rows),
+        "audio_seconds": round(total_audio, 3),
+        "inference_seconds": round(total_inference, 3),
+        # Total inference time over total audio time
+        # 전체 추론 시간 / 전체 오디오 길이
+        "overall_rtf": round(total_inference / total_audio, 4) if total_audio else None,
+        "mean_rtf": round(statistics.mean(row["rtf"] for row in rows), 4),
+        "wer": weighted("wer", lambda text: len(normalize_words(text))),
+        "cer": weighted("cer", lambda text: len("".join(normalize_words(text)))),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(report: dict, baseline: dict, args) -> dict:
+    limits = {
+        "overall_rtf": args.max_slowdown,
+        "peak_rss_mb": args.max_rss_increase,
+        "wer": args.max_wer_increase,
+        "cer": args.max_wer_increase,
+    }
+    metrics = {}
+    regressions = []
+    for key, relative in GATED_METRICS.items():
+        current = report["summary"].get(key)
+        previous = baseline.get("summary", {}).get(key)
+        if current is None or previous is None:
+            continue
+        delta = current - previous
+        change = delta / previous if relative and previous else delta
+        metrics[key] = {
+            "baseline": previous,
+            "current": current,
+            "change": round(change, 4),
+            "limit": limits[key],
+        }
+        if change > limits[key]:
+            regressions.append(key)
+
+    # Timings only compare across the same runtime, model and sample set
+    # 실행 환경, 모델, 샘플 세트가 같을 때만 시간 비교가 의미 있음
+    comparable = all(
+        report.get(key) == baseline.get(key)
+        for key in ("runtime", "model", "sample_sha256", "profile", "mode")
+    )
+    return {
+        "comparable": comparable,
+        "metrics": metrics,
+        "model_load_seconds": {
+            "baseline": baseline.get("model_load", {}).get("seconds"),
+            "current": report["model_load"]["seconds"],
+        },
+        "regressions": regressions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker STT benchmark (RTF / WER)")
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH"))
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("--profile", default=None)
+    parser.add_argument("--mode", default=None, help="sequential or batched")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--baseline", default=None, help="report to compare against")
+    # Regression thresholds: relative for RTF / RSS, absolute for error rates
+    # 회귀 판정 기준: RTF/RSS는 상대 변화, 오류율은 절대 변화
+    parser.add_argument("--max-slowdown", type=float, default=0.10)
+    parser.add_argument("--max-rss-increase", type=float, default=0.10)
+    parser.add_argument("--max-wer-increase", type=float, default=0.01)
+    args = parser.parse_args()
+    if not args.model:
+        parser.error("--model (or MODEL_PATH) is required")
+
+    # Settings are read on import, so the environment is set up first
+    # 설정은 임포트 시점에 읽히므로 환경 변수를 먼저 지정
+    os.environ["MODEL_PATH"] = os.path.abspath(args.model)
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+
+    manifest = load_manifest(args.manifest)
+    language = manifest.get("language", "ko")
+
+    from config import settings
+    from services.decoding_profiles import resolve_profile
+    from services.inference_service import InferenceService
+    from services.model_service import ModelService
+    from utils.cold_start import cold_start
+
+    load_started = time.perf_counter()
+    model_service = ModelService()
+    model_service.load_model()
+    load_seconds = time.perf_counter() - load_started
+    rss_after_load = peak_rss_mb()
+
+    service = InferenceService()
+    server = serve_directory(manifest["directory"])
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        rows = [
+            run_sample(service, f"{base_url}/{sample['audio']}", sample, language, args)
+            for sample in manifest["samples"]
+        ]
+    finally:
+        server.shutdown()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "model": os.path.basename(os.path.normpath(settings.MODEL_PATH)),
+        "runtime": model_service.runtime,
+        "profile": resolve_profile(args.profile),
+        "mode": args.mode or settings.INFERENCE_MODE,
+        "preprocess": settings.PREPROCESS_ENABLED,
+        "repeat": args.repeat,
+        "sample_ids": [sample["id"] for sample in manifest["samples"]],
+        "sample_sha256": {
+            sample["id"]: sha256_file(
+                os.path.join(manifest["directory"], sample["audio"])
+            )
+            for sample in manifest["samples"]
+        },
+        "model_load": {
+            "seconds": round(load_seconds, 3),
+            "phases": cold_start.to_dict()["phases"],
+            "rss_mb": rss_after_load,
+        },
+        "results": rows,
+        "summary": summarize(rows, manifest),
+    }
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["comparison"] = compare(report, json.load(f), args)
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    print(output)
+
+    comparison = report.get("comparison")
+    if comparison and comparison["regressions"]:
+        print(
+            f"Regressed: {', '.join(comparison['regressions'])}"
+            + ("" if comparison["comparable"] else " (runtime or sample set differs)"),
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,21 +4,44 @@ import sys
 
 # Define the model to download (must match config or be parameterized)
 # 다운로드할 모델 정의 (설정과 일치하거나 매개변수화되어야 함)
-MODEL_SIZE = "deepdml/faster-whisper-large-v3-turbo-ct2"
-OUTPUT_DIR = "/app/models"
+MODEL_SIZE = os.environ.get("MODEL_SIZE", "deepdml/faster-whisper-large-v3-turbo-ct2")
+OUTPUT_DIR = os.environ.get("MODEL_PATH", "/app/models")
 
+# CPU images bake an int8-quantized model: converted from the original
+# Transformers checkpoint (needs transformers + torch at build time only)
+# CPU 이미지는 int8 양자화 모델을 빌드 시점에 생성함 (빌드 단계에서만 transformers/torch 필요)
+QUANTIZATION = os.environ.get("MODEL_QUANTIZATION", "")
+SOURCE_MODEL = os.environ.get("MODEL_SOURCE", "openai/whisper-large-v3-turbo")
 
-def main():
-    print(f"Downloading {MODEL_SIZE} model to {OUTPUT_DIR}...")
 
+def convert_model():
+    # Imported lazily: the GPU image never installs the converter dependencies
+    # 변환 의존성은 GPU 이미지에 설치되지 않으므로 지연 임포트
+    from ctranslate2.converters import TransformersConverter
+
+    print(
+        f"Converting {SOURCE_MODEL} to CTranslate2 ({QUANTIZATION}) in {OUTPUT_DIR}..."
+    )
+    converter = TransformersConverter(
+        SOURCE_MODEL,
+        copy_files=["tokenizer.json", "preprocessor_config.json"],
+    )
+    return converter.convert(OUTPUT_DIR, quantization=QUANTIZATION, force=True)
+
+
+def main():
     # Create directory if it doesn't exist
     # 디렉토리가 없으면 생성
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
     try:
-        # Download the model
-        # 모델 다운로드
-        path = download_model(MODEL_SIZE, output_dir=OUTPUT_DIR)
+        if QUANTIZATION:
+            path = convert_model()
+        else:
+            # Download the model
+            # 모델 다운로드
+            print(f"Downloading {MODEL_SIZE} model to {OUTPUT_DIR}...")
+            path = download_model(MODEL_SIZE, output_dir=OUTPUT_DIR)
         print(f"Model downloaded successfully to {path}")
     except Exception as e:
         print(f"Failed to download model: {e}")
@@ -1,3 +1,5 @@
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -8,15 +10,117 @@ class WorkerSettings(BaseSettings):
     # deepdml/faster-whisper-large-v3-turbo-ct2
     MODEL_SIZE: str = "deepdml/faster-whisper-large-v3-turbo-ct2"
 
-    # Device (cuda/cpu)
-    DEVICE: str = "cuda"
+    # Device (cuda/cpu/auto). "auto" picks cuda when a GPU is visible, so the
+    # same image and handler run on CPU-only nodes
+    # 디바이스 (auto: GPU가 있으면 cuda, 없으면 cpu)
+    DEVICE: str = "auto"
+
+    # Compute Type ("auto": float16 on cuda, int8 on cpu)
+    # 연산 타입 (auto: cuda는 float16, cpu는 int8)
+    COMPUTE_TYPE: str = "auto"
+
+    # CPU threads per model worker (0 = derive from available cores)
+    # 모델 워커당 CPU 스레드 수 (0이면 사용 가능한 코어 수로 계산)
+    CPU_THREADS: int = 0
+    # Cores given to each model worker when MODEL_NUM_WORKERS is derived on CPU
+    # CPU에서 MODEL_NUM_WORKERS를 자동 계산할 때 워커당 할당할 코어 수
+    CPU_CORES_PER_WORKER: int = 4
 
-    # Compute Type
-    COMPUTE_TYPE: str = "float16"
+    # Startup calibration: try candidate compute types / worker layouts for the
+    # settings left on auto and keep the fastest within the WER tolerance.
+    # The result is cached per node type, so only the first cold start pays.
+    # 시작 시 자동 보정: auto로 둔 설정에 대해 후보 구성을 측정해 가장 빠른 구성을 선택
+    # (노드 종류별로 결과를 저장하므로 첫 콜드 스타트에서만 측정)
+    AUTOTUNE_ENABLED: bool = False
+    AUTOTUNE_CACHE_PATH: str = "/runpod-volume/stt-autotune.json"
+    # Speech sample in the production language. None ships with the repo: a
+    # clip saved as stt_server/assets/autotune_sample.wav is copied here by the
+    # Dockerfiles. Without it calibration is skipped, since precision cannot
+    # be traded without an accuracy check.
+    # 운영 언어(한국어) 음성 샘플 (저장소에 포함되지 않음). 없으면 보정을 건너뜀
+    AUTOTUNE_SAMPLE_PATH: str = "/app/assets/autotune_sample.wav"
+    AUTOTUNE_SAMPLE_SECONDS: int = 30
+    # Language the sample is transcribed in (ai_server sends "ko")
+    # 샘플 전사 언어 (ai_server는 "ko"로 요청)
+    AUTOTUNE_LANGUAGE: str = "ko"
+    # Maximum word error rate vs the highest-precision candidate
+    # 가장 높은 정밀도 후보 대비 허용 WER
+    AUTOTUNE_MAX_WER_DELTA: float = 0.05
 
     # Baked Model Path
     MODEL_PATH: str = "/app/models"
 
+    # Model registry: MODEL_PATH is registered as MODEL_NAME, MODEL_REGISTRY
+    # adds more CTranslate2 models by name (JSON, e.g. {"small": "/app/models-small"}).
+    # Extra models load on first use.
+    # 모델 레지스트리: MODEL_PATH는 MODEL_NAME으로 등록되고, MODEL_REGISTRY로
+    # 다른 모델을 이름별로 추가함 (처음 사용할 때 로드)
+    MODEL_NAME: str = "turbo"
+    MODEL_REGISTRY: Dict[str, str] = {}
+    # Duration routing (JSON, e.g. {"small": 10}): audio up to 10 s after
+    # silence trimming goes to "small", longer audio to MODEL_NAME. A job's
+    # "model" input field overrides it.
+    # 길이 기반 라우팅: 무음 제거 후 10초 이하 오디오는 "small", 그 외는 MODEL_NAME
+    # (작업 입력의 "model" 필드가 우선함)
+    MODEL_ROUTES: Dict[str, float] = {}
+    # Loaded models above this budget are evicted least recently used first
+    # (estimated from the model files; 0 = unlimited)
+    # 로드된 모델 크기 합이 예산을 넘으면 가장 오래 사용하지 않은 모델부터 해제 (0이면 무제한)
+    MODEL_MEMORY_BUDGET_MB: int = 0
+
+    # Cold start: read the model files into the page cache while imports run,
+    # and run a tiny inference before taking jobs
+    # 콜드 스타트: 임포트 중에 모델 파일을 미리 읽고, 작업을 받기 전에 짧은 추론 실행
+    MODEL_PREFETCH: bool = True
+    WARMUP_INFERENCE: bool = True
+
+    # Jobs one worker runs at once (RunPod concurrency modifier). Extra jobs
+    # download and decode audio while another job holds the model.
+    # 워커 하나가 동시에 처리하는 작업 수 (다운로드/디코딩이 추론과 겹침)
+    MAX_CONCURRENT_JOBS: int = 1
+    # CTranslate2 model replicas (WhisperModel num_workers) = parallel inferences.
+    # 0 = auto: 1 on GPU, cores // CPU_CORES_PER_WORKER on CPU
+    # 동시에 추론 가능한 모델 워커 수 (0이면 자동: GPU 1, CPU는 코어 수 기준)
+    MODEL_NUM_WORKERS: int = 0
+
+    # Inference mode: "sequential" (whole file) or "batched" (VAD segments)
+    # 추론 모드: "sequential"(파일 전체 순차) 또는 "batched"(VAD 구간 배치)
+    INFERENCE_MODE: str = "sequential"
+    INFERENCE_BATCH_SIZE: int = 8
+    # Default decoding profile: "fast" | "balanced" | "accurate"
+    # 기본 디코딩 프로필 (services/decoding_profiles.py 참고)
+    DECODING_PROFILE: str = "accurate"
+    VAD_MIN_SILENCE_MS: int = 500
+    VAD_SPEECH_PAD_MS: int = 200
+
+    # Preprocessing between decode and inference: trim leading/trailing
+    # silence and normalize loudness (utils/audio_preprocess.py)
+    # 디코딩과 추론 사이의 전처리: 앞뒤 무음 제거 및 음량 정규화
+    PREPROCESS_ENABLED: bool = True
+    # Frames quieter than the loud frames by this much (or below the floor) are silence
+    # 큰 프레임 대비 이만큼 작거나 하한보다 작은 프레임은 무음으로 간주
+    SILENCE_RELATIVE_DB: float = 35.0
+    SILENCE_FLOOR_DBFS: float = -60.0
+    SILENCE_PAD_MS: int = 300
+    NORMALIZE_TARGET_DBFS: float = -20.0
+    NORMALIZE_MAX_GAIN_DB: float = 20.0
+
+    # Start the worker with the generator handler (streamed partial results)
+    # 제너레이터 핸들러로 워커 시작 (부분 결과 스트리밍)
+    STREAMING_HANDLER: bool = False
+
+    # Audio download (pooled session, parallel HTTP Range requests, resume)
+    # 오디오 다운로드 설정 (세션 풀, 병렬 Range 요청, 이어받기)
+    DOWNLOAD_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    DOWNLOAD_READ_TIMEOUT_SECONDS: float = 30.0
+    DOWNLOAD_POOL_SIZE: int = 16
+    DOWNLOAD_MAX_RETRIES: int = 3
+    # Objects at least this large are split into parallel ranges
+    # 이 크기 이상이면 병렬 Range 요청으로 분할
+    DOWNLOAD_PARALLEL_MIN_BYTES: int = 16 * 1024 * 1024
+    DOWNLOAD_PART_SIZE_BYTES: int = 8 * 1024 * 1024
+    DOWNLOAD_MAX_PARALLEL: int = 4
+
     class Config:
         env_file = ".env"
 
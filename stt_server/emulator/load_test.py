@@ -0,0 +1,77 @@
+"""
+Closed-loop load generator for the end-to-end transcription path
+(ai_server -> RunPod emulator -> handler).
+
+    python emulator/load_test.py --requests 50 --concurrency 10 \\
+        --audio-url http://127.0.0.1:9000/a.wav --audio-url http://127.0.0.1:9000/b.wav
+
+ai_server caches and coalesces identical audio, so run it with
+TRANSCRIPTION_CACHE_ENABLED=false and pass distinct files (audio URLs are
+used round-robin) to measure real worker throughput.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transcription load test")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api/v1/transcriptions")
+    parser.add_argument("--audio-url", action="append", required=True)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--secret", default="", help="x-internal-secret header")
+    args = parser.parse_args()
+
+    session = requests.Session()
+    headers = {"x-internal-secret": args.secret} if args.secret else {}
+
+    def send(i):
+        audio_url = args.audio_url[i % len(args.audio_url)]
+        started = time.perf_counter()
+        try:
+            response = session.post(
+                args.url, json={"audioUrl": audio_url}, headers=headers, timeout=900
+            )
+            ok = response.ok and response.json().get("success", False)
+        except requests.RequestException:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(send, range(args.requests)))
+    wall = time.perf_counter() - started
+
+    latencies = [latency for ok, latency in results if ok]
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "succeeded": len(latencies),
+        "failed": args.requests - len(latencies),
+        "wall_seconds": round(wall, 3),
+        "throughput_per_minute": round(len(latencies) / wall * 60, 2),
+    }
+    if latencies:
+        report["latency_seconds"] = {
+            "mean": round(statistics.mean(latencies), 3),
+            "p50": round(_percentile(latencies, 0.5), 3),
+            "p95": round(_percentile(latencies, 0.95), 3),
+            "p99": round(_percentile(latencies, 0.99), 3),
+            "max": round(max(latencies), 3),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+"""
+Local RunPod Serverless emulator for the STT worker.
+
+Implements the /run, /runsync, /status/{id}, /stream/{id} and /cancel/{id}
+HTTP contract of RunPod's serverless API and executes jobs with the config
+handler.py passes to runpod.serverless.start() (worker_config(): handler,
+concurrency_modifier), either in-process (threads) or in dedicated worker
+processes. Jobs run the way the RunPod worker loop runs them: sync or async
+handlers, generators aggregated into a list, and as many jobs at once per
+worker as concurrency_modifier allows. Queueing, a configurable number of
+workers, cold starts and idle scale-down are simulated so ai_server can be
+load-tested on a CPU-only box:
+
+    cd stt_server
+    DEVICE=cpu COMPUTE_TYPE=int8 python emulator/runpod_emulator.py --workers 2
+
+    # ai_server
+    RUNPOD_BASE_URL=http://127.0.0.1:8001/v2 RUNPOD_ENDPOINT_ID=local \\
+    RUNPOD_API_KEY=local python -m app.main
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Make handler.py / services importable regardless of the working directory
+STT_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("runpod-emulator")
+
+ROUTE = re.compile(r"^/v2/[^/]+/(run|runsync|status|stream|cancel)(?:/([^/]+))?$")
+
+
+def load_handler(handler_path: str):
+    """
+    Import "module:function" (e.g. handler:handler) from stt_server.
+    """
+    if STT_SERVER_DIR not in sys.path:
+        sys.path.insert(0, STT_SERVER_DIR)
+    module_name, func_name = handler_path.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def load_worker_config(handler_path: Optional[str], config_path: str) -> dict:
+    """
+    The config the worker passes to runpod.serverless.start() (config_path
+    names a function returning it), or {"handler": ...} for a bare handler.
+    """
+    if handler_path:
+        return {"handler": load_handler(handler_path)}
+    return load_handler(config_path)()
+
+
+def worker_concurrency(config: dict) -> int:
+    # RunPod's JobScaler starts at 1 and asks the modifier before taking jobs
+    # RunPod JobScaler는 1에서 시작해 작업을 받기 전에 modifier 값을 적용
+    modifier = config.get("concurrency_modifier")
+    return max(int(modifier(1)), 1) if modifier else 1
+
+
+def run_handler(config: dict, job: dict, on_item, run_async):
+    """
+    Run one job like the RunPod worker loop: the handler may be sync or
+    async, plain or a generator. Yielded items are passed to on_item as they
+    are produced and aggregated into the output (return_aggregate_stream).
+    run_async(coroutine) runs async handlers to completion.
+    """
+    output = config["handler"](job)
+    if inspect.iscoroutine(output) or inspect.isasyncgen(output):
+        return run_async(_drain_async(output, on_item))
+    if inspect.isgenerator(output):
+        items = []
+        for item in output:
+            on_item(item)
+            items.append(item)
+        return items
+    return output
+
+
+async def _drain_async(output, on_item):
+    if inspect.iscoroutine(output):
+        return await output
+    items = []
+    async for item in output:
+        on_item(item)
+        items.append(item)
+    return items
+
+
+def _process_worker_main(handler_path: Optional[str], config_path: str, conn):
+    # Runs inside a spawned worker process: a fresh interpreter, like a container
+    try:
+        config = load_worker_config(handler_path, config_path)
+    except Exception as e:
+        # Import or model load failed: report it instead of dying silently
+        # 임포트/모델 로드 실패를 조용히 종료하지 않고 부모에게 전달
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+        return
+    conn.send(("ready", worker_concurrency(config)))
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        try:
+            # Generator items are forwarded as they are produced
+            # 제너레이터 항목은 생성되는 즉시 부모에게 전달
+            output = run_handler(
+                config, job, lambda item: conn.send(("chunk", item)), asyncio.run
+            )
+            conn.send(("ok", output))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class Job:
+    def __init__(self, job_input: dict):
+        self.id = f"{uuid.uuid4()}-local"
+        self.input = job_input
+        self.status = "IN_QUEUE"
+        self.output = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cold_start = False
+        self.done = threading.Event()
+        # Items yielded by a generator handler, and how many /stream returned
+        self.stream = []
+        self.stream_cursor = 0
+
+    def to_status(self) -> dict:
+        data = {"id": self.id, "status": self.status}
+        if self.started_at:
+            data["delayTime"] = int((self.started_at - self.submitted_at) * 1000)
+        if self.finished_at and self.started_at:
+            data["executionTime"] = int((self.finished_at - self.started_at) * 1000)
+        if self.status == "COMPLETED":
+            data["output"] = self.output
+        elif self.status == "FAILED":
+            data["error"] = self.error
+        return data
+
+
+class EmulatedWorker(threading.Thread):
+    """
+    One serverless worker: pulls jobs from the shared queue, pays a cold start
+    when it was scaled down, and scales down again after idle_timeout. Like
+    RunPod's JobScaler it takes one job until the handler is loaded, then as
+    many at once as concurrency_modifier returns (thread mode), running async
+    handlers on one event loop per worker.
+    """
+
+    def __init__(self, emulator: "RunPodEmulator", index: int):
+        super().__init__(name=f"worker-{index}", daemon=True)
+        self.emulator = emulator
+        self.warm = False
+        self.last_job_at = 0.0
+        self.active = 0
+        self._lock = threading.Lock()
+        self._process = None
+        self._conn = None
+        self._slots = 1
+        self._loop = None
+
+    def run(self):
+        self._serve()
+
+    def _start_slots(self, concurrency: int):
+        for slot in range(self._slots, concurrency):
+            threading.Thread(
+                target=self._serve, name=f"{self.name}-slot-{slot}", daemon=True
+            ).start()
+        self._slots = max(self._slots, concurrency)
+
+    def _run_async(self, coroutine):
+        # One event loop per worker, like the RunPod worker loop
+        # 워커마다 하나의 이벤트 루프 (RunPod 워커 루프와 동일)
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._loop.run_forever, name=f"{self.name}-loop", daemon=True
+                ).start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _serve(self):
+        while True:
+            try:
+                job = self.emulator.queue.get(timeout=1.0)
+            except queue.Empty:
+                self._maybe_scale_down()
+                continue
+
+            if job.status == "CANCELLED":
+                continue
+
+            with self._lock:
+                # Concurrent slots share one container: only the first pays
+                job.cold_start = not self.warm
+                try:
+                    if job.cold_start:
+                        self._cold_start()
+                    startup_error = None
+                except Exception as e:
+                    # The worker stays cold and the next job retries the start
+                    # 워커는 콜드 상태로 남고 다음 작업에서 다시 시작을 시도
+                    logger.error(f"{self.name}: cold start failed: {e}")
+                    startup_error = f"Worker failed to start: {e}"
+                else:
+                    self.active += 1
+            if startup_error:
+                self.emulator.finish_job(job, None, startup_error)
+                continue
+
+            job.status = "IN_PROGRESS"
+            job.started_at = time.time()
+            try:
+                output, error = self._execute(job)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.last_job_at = time.time()
+            self.emulator.finish_job(job, output, error)
+
+    def _cold_start(self):
+        logger.info(f"{self.name}: cold start")
+        time.sleep(self.emulator.cold_start_delay)
+        if self.emulator.mode == "process":
+            ctx = multiprocessing.get_context("spawn")
+            self._conn, child_conn = ctx.Pipe()
+            self._process = ctx.Process(
+                target=_process_worker_main,
+                args=(
+                    self.emulator.handler_path,
+                    self.emulator.config_path,
+                    child_conn,
+                ),
+                daemon=True,
+            )
+            self._process.start()
+            # Only the child may hold its end, so a crash shows up as EOFError
+            # 자식 프로세스가 죽으면 EOFError가 나도록 부모 쪽의 자식 연결은 닫음
+            child_conn.close()
+            try:
+                # "ready" after handler import + model load, or ("error", msg)
+                kind, value = self._conn.recv()
+            except EOFError:
+                self._process.join(timeout=5)
+                kind, value = "error", f"exited with code {self._process.exitcode}"
+            if kind != "ready":
+                self._stop_process()
+                raise RuntimeError(value)
+            if value > 1:
+                logger.warning(
+                    f"{self.name}: process mode runs one job at a time "
+                    f"(handler asks for {value})"
+                )
+        else:
+            config = self.emulator.get_config()
+            self._start_slots(self.emulator.concurrency or worker_concurrency(config))
+        self.warm = True
+
+    def _execute(self, job: Job):
+        payload = {"id": job.id, "input": job.input}
+        try:
+            if self.emulator.mode == "process":
+                self._conn.send(payload)
+                kind, value = self._conn.recv()
+                while kind == "chunk":
+                    job.stream.append(value)
+                    kind, value = self._conn.recv()
+                if kind == "error":
+                    return None, value
+                output = value
+            else:
+                output = run_handler(
+                    self.emulator.get_config(),
+                    payload,
+                    job.stream.append,
+                    self._run_async,
+                )
+        except (EOFError, OSError) as e:
+            if self.emulator.mode != "process":
+                return None, str(e)
+            # The worker process died mid-job: the next job pays a cold start
+            # 작업 도중 워커 프로세스가 종료됨 (다음 작업은 콜드 스타트)
+            with self._lock:
+                self.warm = False
+                self._stop_process()
+            return None, f"Worker process exited: {e or type(e).__name__}"
+        except Exception as e:
+            return None, str(e)
+
+        # RunPod marks a job FAILED when the handler returns {"error": ...}
+        if isinstance(output, dict) and "error" in output:
+            return None, output["error"]
+        return output, None
+
+    def _maybe_scale_down(self):
+        with self._lock:
+            if not self.warm or self.active:
+                return
+            if time.time() - self.last_job_at <= self.emulator.idle_timeout:
+                return
+            logger.info(f"{self.name}: idle, scaling down")
+            self.warm = False
+            self._stop_process()
+
+    def _stop_process(self):
+        if self._process is None:
+            return
+        with contextlib.suppress(OSError):
+            self._conn.send(None)
+        self._process.join(timeout=5)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._conn.close()
+        self._process = None
+        self._conn = None
+
+
+class RunPodEmulator:
+    def __init__(
+        self,
+        handler_path: Optional[str] = None,
+        config_path: str = "handler:worker_config",
+        workers: int = 1,
+        concurrency: Optional[int] = None,
+        mode: str = "thread",
+        cold_start_delay: float = 0.0,
+        idle_timeout: float = 60.0,
+        retention: float = 600.0,
+    ):
+        self.handler_path = handler_path
+        self.config_path = config_path
+        # None: ask the handler's concurrency_modifier
+        self.concurrency = concurrency
+        self.mode = mode
+        self.cold_start_delay = cold_start_delay
+        self.idle_timeout = idle_timeout
+        self.retention = retention
+        self.queue: "queue.Queue[Job]" = queue.Queue()
+        self.jobs = {}
+        self._lock = threading.Lock()
+        self._config = None
+        self._stats = {"submitted": 0, "completed": 0, "failed": 0, "cancelled": 0}
+        self.workers = [EmulatedWorker(self, i) for i in range(workers)]
+        for worker in self.workers:
+            worker.start()
+
+    def get_config(self) -> dict:
+        # In-process mode shares one handler (and one loaded model) across workers
+        with self._lock:
+            if self._config is None:
+                self._config = load_worker_config(self.handler_path, self.config_path)
+            return self._config
+
+    def submit(self, job_input: dict) -> Job:
+        job = Job(job_input)
+        with self._lock:
+            self._evict_expired()
+            self.jobs[job.id] = job
+            self._stats["submitted"] += 1
+        self.queue.put(job)
+        return job
+
+    def finish_job(self, job: Job, output, error):
+        job.finished_at = time.time()
+        if job.status == "CANCELLED":
+            return
+        if error is None:
+            job.status, job.output = "COMPLETED", output
+            self._stats["completed"] += 1
+        else:
+            job.status, job.error = "FAILED", error
+            self._stats["failed"] += 1
+        job.done.set()
+
+    def cancel(self, job: Job):
+        if job.status in ("IN_QUEUE", "IN_PROGRESS"):
+            # A running handler cannot be interrupted; its result is discarded
+            job.status = "CANCELLED"
+            self._stats["cancelled"] += 1
+            job.done.set()
+
+    def get_stats(self) -> dict:
+        return {
+            "jobs": {**self._stats, "in_queue": self.queue.qsize()},
+            "workers": {
+                "total": len(self.workers),
+                "warm": sum(1 for w in self.workers if w.warm),
+            },
+        }
+
+    def _evict_expired(self):
+        now = time.time()
+        expired = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job.finished_at and now - job.finished_at > self.retention
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+def make_request_handler(emulator: RunPodEmulator):
+    class EmulatorRequestHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _route(self):
+            parts = urlsplit(self.path)
+            match = ROUTE.match(parts.path)
+            if not match:
+                return None, None, parts
+            return match.group(1), match.group(2), parts
+
+        def _get_job(self, job_id):
+            job = emulator.jobs.get(job_id)
+            if job is None:
+                self._send(404, {"error": f"job {job_id} not found"})
+            return job
+
+        def do_GET(self):
+            action, job_id, parts = self._route()
+            if parts.path == "/health":
+                return self._send(200, emulator.get_stats())
+            if action not in ("status", "stream"):
+                return self._send(404, {"error": "not found"})
+            job = self._get_job(job_id)
+            if job and action == "stream":
+                # Items produced since the previous /stream call. Status is read
+                # first so a terminal status never hides trailing items.
+                status = job.status
+                items = job.stream[job.stream_cursor :]
+                job.stream_cursor += len(items)
+                self._send(
+                    200,
+                    {
+                        "id": job.id,
+                        "status": status,
+                        "stream": [{"output": item} for item in items],
+                    },
+                )
+            elif job:
+                self._send(200, job.to_status())
+
+        def do_POST(self):
+            action, job_id, parts = self._route()
+            if action in ("run", "runsync"):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                job = emulator.submit(body.get("input", {}))
+                if action == "runsync":
+                    wait_ms = int(parse_qs(parts.query).get("wait", ["90000"])[0])
+                    job.done.wait(wait_ms / 1000)
+                    return self._send(200, job.to_status())
+                return self._send(200, {"id": job.id, "status": job.status})
+
+            if action == "cancel":
+                job = self._get_job(job_id)
+                if job:
+                    emulator.cancel(job)
+                    self._send(200, {"id": job.id, "status": job.status})
+                return
+
+            self._send(404, {"error": "not found"})
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return EmulatorRequestHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local RunPod serverless emulator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Jobs per worker at once (thread mode only); "
+        "default: the handler's concurrency_modifier (MAX_CONCURRENT_JOBS)",
+    )
+    parser.add_argument(
+        "--config",
+        default="handler:worker_config",
+        help="Function returning the runpod.serverless.start() config",
+    )
+    parser.add_argument(
+        "--handler", default=None, help="Run this handler function instead of --config"
+    )
+    parser.add_argument(
+        "--cold-start-delay",
+        type=float,
+        default=0.0,
+        help="Extra seconds per cold start (container boot), on top of real load",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=60.0,
+        help="Seconds without jobs before a worker scales down",
+    )
+    args = parser.parse_args()
+    if args.concurrency and args.concurrency > 1 and args.mode == "process":
+        parser.error("--concurrency > 1 requires --mode thread")
+
+    emulator = RunPodEmulator(
+        handler_path=args.handler,
+        config_path=args.config,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        mode=args.mode,
+        cold_start_delay=args.cold_start_delay,
+        idle_timeout=args.idle_timeout,
+    )
+    server = ThreadingHTTPServer((args.host, args.port), make_request_handler(emulator))
+    logger.info(
+        f"RunPod emulator on http://{args.host}:{args.port}/v2/<endpoint_id> "
+        f"({args.workers} {args.mode} workers)"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,42 @@
+# Imported first: starts the cold-start clock
+# 가장 먼저 임포트 (콜드 스타트 시간 측정 시작)
+from utils.cold_start import cold_start
+
+import asyncio
+import base64
+import binascii
+import logging
+
+from config import settings
+
+# Read the model files into the page cache while the heavy imports below
+# (runpod, faster_whisper/ctranslate2) are running
+# 아래의 무거운 임포트가 진행되는 동안 모델 파일을 페이지 캐시로 미리 읽음
+if settings.MODEL_PREFETCH:
+    cold_start.start_prefetch(settings.MODEL_PATH)
+
 import runpod
+from services.model_service import ModelService
 from services.inference_service import InferenceService
-import logging
+
+cold_start.record("imports", cold_start.elapsed())
 
 # Configure logging for RunPod
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("runpod-handler")
 
-# Initialize Service
+# Initialize the model once during cold start (before InferenceService, which
+# sizes its inference slots from the resolved runtime)
+# 콜드 스타트 시 모델을 한 번만 로드 (InferenceService보다 먼저)
+logger.info("Initializing Inference Service...")
+ModelService().load_model()
 inference_service = InferenceService()
+cold_start.mark_ready()
+logger.info(f"Service initialized. Cold start: {cold_start.to_dict()}")
 
-# Initialize the model once during cold start
-logger.info("Initializing Inference Service...")
-inference_service.model_service.load_model()
-logger.info("Service initialized.")
+# Whether this worker has already served a job since the cold start
+# 콜드 스타트 이후 이 워커가 작업을 처리한 적이 있는지 여부
+_served_jobs = 0
 
 
 # Handler function that RunPod calls for each request
@@ -22,28 +46,76 @@ def handler(job):
     Handler for RunPod serverless worker.
     RunPod serverless 워커를 위한 핸들러.
     """
+    global _served_jobs
     job_input = job.get("input", {})
+    first_job = _served_jobs == 0
+    _served_jobs += 1
 
     # Extract arguments from input
     # 입력에서 인자 추출
     audio_url = job_input.get("audio_url")
+    audio_urls = job_input.get("audio_urls")
+    # Short clips sent inline by the AI server instead of a presigned URL
+    # AI 서버가 Presigned URL 대신 작업 입력에 직접 담아 보낸 짧은 클립
+    audio_base64 = job_input.get("audio_base64")
     language = job_input.get("language")
+    # "sequential" (default) or "batched" (VAD segments decoded in batches)
+    mode = job_input.get("mode")
+    # Decoding profile: "fast" | "balanced" | "accurate" (see decoding_profiles.py)
+    profile = job_input.get("profile")
+    # Registered model name; by default picked from the audio duration
+    # 등록된 모델 이름 (지정하지 않으면 오디오 길이로 선택)
+    model = job_input.get("model")
 
     # Handle Warmup Request
     # 워밍업 요청 처리
     if job_input.get("warmup"):
         logger.info("Warmup signal received. Returning immediately.")
-        return {"status": "success", "message": "Warmed up"}
+        return {
+            "status": "success",
+            "message": "Warmed up",
+            # True when this warmup paid the cold start
+            # 이 워밍업이 콜드 스타트를 유발했는지 여부
+            "cold": first_job,
+            "cold_start": cold_start.to_dict(),
+            "models": ModelService().get_stats(),
+        }
+
+    # Handle Batch Request (several clips in one job)
+    # 배치 요청 처리 (여러 클립을 하나의 작업으로)
+    if audio_urls:
+        logger.info(f"Processing batch job {job.get('id')} ({len(audio_urls)} files)")
+        try:
+            results = inference_service.transcribe_batch(
+                audio_urls, language, mode, profile, model
+            )
+        except ValueError as e:
+            return {"error": str(e)}
+        return {"results": results}
+
+    if audio_base64:
+        try:
+            data = base64.b64decode(audio_base64, validate=True)
+        except (binascii.Error, ValueError) as e:
+            return {"error": f"Invalid 'audio_base64': {e}"}
+        try:
+            logger.info(f"Processing inline job {job.get('id')} ({len(data)} bytes)")
+            return inference_service.transcribe_bytes(
+                data, language, mode, profile, model
+            )
+        except Exception as e:
+            logger.error(f"Job failed: {e}")
+            return {"error": str(e)}
 
     if not audio_url:
-        return {"error": "Missing 'audio_url' in input"}
+        return {"error": "Missing 'audio_url' or 'audio_base64' in input"}
 
     try:
         logger.info(f"Processing job {job.get('id')} for URL: {audio_url}")
 
         # Call the transcription service
         # 전사 서비스 호출
-        result = inference_service.transcribe(audio_url, language)
+        result = inference_service.transcribe(audio_url, language, mode, profile, model)
 
         # Return serializable dict
         # 직렬화 가능한 딕셔너리 반환
@@ -54,6 +126,83 @@ def handler(job):
         return {"error": str(e)}
 
 
-# Start the RunPod worker
-# RunPod 워커 시작
-runpod.serverless.start({"handler": handler})
+# Generator handler for RunPod streaming: yields segments as they are decoded
+# RunPod 스트리밍용 제너레이터 핸들러: 디코딩된 세그먼트를 즉시 반환
+def stream_handler(job):
+    """
+    Streaming handler for RunPod serverless worker.
+    Jobs with input "stream": true yield {"type": "segment", ...} events
+    (read via /stream/{id}) followed by {"type": "final", ...}. Other jobs
+    yield the regular handler() output once.
+    """
+    job_input = job.get("input", {})
+    audio_url = job_input.get("audio_url")
+
+    if not job_input.get("stream") or not audio_url:
+        yield handler(job)
+        return
+
+    try:
+        logger.info(f"Streaming job {job.get('id')} for URL: {audio_url}")
+        yield from inference_service.transcribe_stream(
+            audio_url,
+            job_input.get("language"),
+            job_input.get("mode"),
+            job_input.get("profile"),
+            job_input.get("model"),
+        )
+    except Exception as e:
+        logger.error(f"Job failed: {e}")
+        yield {"type": "error", "error": str(e)}
+
+
+# Async wrappers so RunPod can run several jobs at once: the blocking work
+# runs in a thread and the RunPod event loop stays free to pick up more jobs
+# RunPod가 여러 작업을 동시에 실행할 수 있도록 블로킹 작업을 스레드에서 실행하는 래퍼
+async def async_handler(job):
+    return await asyncio.to_thread(handler, job)
+
+
+async def async_stream_handler(job):
+    generator = stream_handler(job)
+    done = object()
+    while True:
+        item = await asyncio.to_thread(next, generator, done)
+        if item is done:
+            break
+        yield item
+
+
+# Number of jobs RunPod may hand to this worker at once
+# RunPod가 이 워커에 동시에 할당할 수 있는 작업 수
+def concurrency_modifier(current_concurrency: int) -> int:
+    return settings.MAX_CONCURRENT_JOBS
+
+
+# Config for runpod.serverless.start (runpod >= 1.4 for concurrency_modifier).
+# The local emulator runs jobs with the same config.
+# runpod.serverless.start 설정 (로컬 에뮬레이터도 같은 설정으로 작업을 실행)
+def worker_config() -> dict:
+    config = {}
+    if settings.MAX_CONCURRENT_JOBS > 1:
+        config["concurrency_modifier"] = concurrency_modifier
+
+    if settings.STREAMING_HANDLER:
+        # /status returns the list of everything yielded
+        # /status는 반환된 모든 결과를 리스트로 돌려줌
+        config["handler"] = (
+            async_stream_handler if settings.MAX_CONCURRENT_JOBS > 1 else stream_handler
+        )
+        config["return_aggregate_stream"] = True
+    else:
+        config["handler"] = (
+            async_handler if settings.MAX_CONCURRENT_JOBS > 1 else handler
+        )
+    return config
+
+
+# Start the RunPod worker (only when run as the container entrypoint, so the
+# local emulator can import this module without starting the RunPod loop)
+# RunPod 워커 시작 (로컬 에뮬레이터가 임포트할 수 있도록 직접 실행 시에만)
+if __name__ == "__main__":
+    runpod.serverless.start(worker_config())
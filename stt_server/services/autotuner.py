@@ -0,0 +1,239 @@
+import json
+import logging
+import os
+import platform
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+
+from config import settings
+from services.decoding_profiles import DECODING_PROFILES
+from services.model_service import _available_cores
+from utils.text_metrics import word_error_rate
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_RATE = 16000
+
+# Highest precision first: the first supported type is the accuracy reference
+# 정밀도가 높은 순서 (처음 지원되는 타입이 정확도 기준)
+COMPUTE_TYPE_CANDIDATES = {
+    "cuda": ["float16", "int8_float16", "int8"],
+    "cpu": ["float32", "int8_float32", "int8"],
+}
+
+
+# Startup calibration of compute type and thread layout
+# 시작 시 연산 타입과 스레드 구성을 보정하는 서비스 클래스
+class Autotuner:
+    """
+    Loads the model under a few candidate runtimes, transcribes a short sample
+    with the default decoding profile and keeps the highest-throughput
+    candidate whose word error rate against the highest-precision candidate is
+    within AUTOTUNE_MAX_WER_DELTA. Only settings left on "auto" (COMPUTE_TYPE,
+    MODEL_NUM_WORKERS=0, CPU_THREADS=0) are tuned. The choice is persisted per
+    node fingerprint, so later cold starts skip calibration. Without a speech
+    sample the accuracy check cannot run, so calibration is skipped and the
+    configured runtime is used as is.
+    """
+
+    def __init__(self):
+        self.cache_path = settings.AUTOTUNE_CACHE_PATH
+        self._warned_no_sample = False
+
+    def tune(self, runtime: dict) -> dict:
+        fingerprint = self._fingerprint(runtime["device"])
+        cached = self._load_cached(fingerprint)
+        if cached is not None:
+            logger.info(f"Using cached autotune result: {cached}")
+            return {**runtime, **cached}
+
+        candidates = self._candidates(runtime)
+        if len(candidates) < 2:
+            return runtime
+
+        sample = self._load_sample()
+        if sample is None:
+            return runtime
+
+        logger.info(f"Autotuning {len(candidates)} runtime candidates...")
+        results = [
+            self._measure(runtime["device"], candidate, sample)
+            for candidate in candidates
+        ]
+        results = [result for result in results if result is not None]
+        if not results:
+            return runtime
+
+        reference = results[0]
+        for result in results:
+            result["wer"] = round(word_error_rate(reference["text"], result["text"]), 4)
+        eligible = [
+            result
+            for result in results
+            if result["wer"] <= settings.AUTOTUNE_MAX_WER_DELTA
+        ]
+        best = max(eligible, key=lambda result: result["audio_seconds_per_second"])
+        choice = best["runtime"]
+
+        logger.info(
+            "Autotune results: "
+            + json.dumps([{k: v for k, v in r.items() if k != "text"} for r in results])
+        )
+        logger.info(f"Autotune choice: {choice}")
+        self._save(fingerprint, choice)
+        return {**runtime, **choice}
+
+    def _candidates(self, runtime: dict) -> List[dict]:
+        device = runtime["device"]
+        supported = ctranslate2.get_supported_compute_types(device)
+
+        if settings.COMPUTE_TYPE == "auto":
+            compute_types = [
+                compute_type
+                for compute_type in COMPUTE_TYPE_CANDIDATES.get(device, [])
+                if compute_type in supported
+            ]
+        else:
+            compute_types = [runtime["compute_type"]]
+
+        layouts = [(runtime["num_workers"], runtime["cpu_threads"])]
+        if device == "cpu" and settings.MODEL_NUM_WORKERS <= 0:
+            # Few workers with many threads vs many workers with few threads
+            # 적은 워커 x 많은 스레드 vs 많은 워커 x 적은 스레드
+            cores = _available_cores()
+            workers_options = sorted({1, max(1, cores // 4), max(1, cores // 2)})
+            layouts = [
+                (
+                    workers,
+                    settings.CPU_THREADS
+                    if settings.CPU_THREADS > 0
+                    else max(1, cores // workers),
+                )
+                for workers in workers_options
+            ]
+
+        return [
+            {
+                "compute_type": compute_type,
+                "num_workers": workers,
+                "cpu_threads": threads,
+            }
+            for compute_type in compute_types
+            for workers, threads in layouts
+        ]
+
+    def _measure(
+        self, device: str, candidate: dict, sample: np.ndarray
+    ) -> Optional[dict]:
+        options = DECODING_PROFILES[settings.DECODING_PROFILE]
+        try:
+            model = WhisperModel(
+                settings.MODEL_PATH,
+                device=device,
+                compute_type=candidate["compute_type"],
+                num_workers=candidate["num_workers"],
+                cpu_threads=candidate["cpu_threads"],
+            )
+
+            def run(_):
+                segments, _info = model.transcribe(
+                    sample, language=settings.AUTOTUNE_LANGUAGE, **options
+                )
+                return " ".join(segment.text for segment in segments)
+
+            # Warm-up pass, then one pass per model worker in parallel
+            # 워밍업 1회 후, 모델 워커 수만큼 병렬로 측정
+            text = run(None)
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=candidate["num_workers"]) as pool:
+                list(pool.map(run, range(candidate["num_workers"])))
+            elapsed = time.perf_counter() - started
+        except Exception as e:
+            logger.warning(f"Autotune candidate {candidate} failed: {e}")
+            return None
+
+        audio_seconds = len(sample) / SAMPLING_RATE * candidate["num_workers"]
+        return {
+            "runtime": candidate,
+            "seconds": round(elapsed, 3),
+            "audio_seconds_per_second": round(audio_seconds / elapsed, 3),
+            "text": text,
+        }
+
+    def _load_sample(self) -> Optional[np.ndarray]:
+        path = settings.AUTOTUNE_SAMPLE_PATH
+        if not path or not os.path.exists(path):
+            # Without speech there is no accuracy check, so nothing to tune
+            # 음성 샘플이 없으면 정확도 검사를 할 수 없으므로 보정하지 않음
+            if not self._warned_no_sample:
+                logger.warning(
+                    f"Autotune sample {path!r} not found; skipping calibration."
+                )
+                self._warned_no_sample = True
+            return None
+
+        from utils.audio_loader import audio_loader
+
+        with open(path, "rb") as f:
+            audio = audio_loader.decode_bytes(f.read())
+        return audio[: settings.AUTOTUNE_SAMPLE_SECONDS * SAMPLING_RATE]
+
+    def _fingerprint(self, device: str) -> dict:
+        # Same node type + model + tuned settings => same choice
+        # 동일한 노드 종류/모델/설정이면 같은 결과를 재사용
+        return {
+            "device": device,
+            "cuda_devices": ctranslate2.get_cuda_device_count(),
+            "cores": _available_cores(),
+            "machine": platform.machine(),
+            "model_path": settings.MODEL_PATH,
+            "compute_type": settings.COMPUTE_TYPE,
+            "num_workers": settings.MODEL_NUM_WORKERS,
+            "cpu_threads": settings.CPU_THREADS,
+            "profile": settings.DECODING_PROFILE,
+        }
+
+    def _load_cached(self, fingerprint: dict) -> Optional[dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable autotune cache: {e}")
+            return None
+        for entry in entries:
+            if entry.get("fingerprint") == fingerprint:
+                return entry.get("choice")
+        return None
+
+    def _save(self, fingerprint: dict, choice: dict):
+        if not self.cache_path:
+            return
+        try:
+            entries = []
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path) as f:
+                    entries = json.load(f)
+            entries = [e for e in entries if e.get("fingerprint") != fingerprint]
+            entries.append(
+                {"fingerprint": fingerprint, "choice": choice, "tuned_at": time.time()}
+            )
+            os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(entries, f, indent=2)
+            os.replace(tmp_path, self.cache_path)
+        except (OSError, ValueError) as e:
+            # A read-only filesystem only costs a re-calibration next time
+            # 읽기 전용 파일시스템이면 다음 콜드 스타트에서 다시 보정함
+            logger.warning(f"Could not persist autotune result: {e}")
+
+
+# Global instance
+autotuner = Autotuner()
@@ -0,0 +1,146 @@
+import logging
+import time
+from typing import Iterator, List, Optional, Tuple
+
+import ctranslate2
+import numpy as np
+from faster_whisper import WhisperModel
+from faster_whisper.tokenizer import Tokenizer
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_RATE = 16000
+
+# Whisper attends to at most 30 s of audio per window
+# Whisper는 한 번에 최대 30초 구간만 처리함
+WINDOW_SECONDS = 30
+
+
+# Service class for VAD-segmented batched inference
+# VAD로 음성 구간을 나눈 뒤 배치로 추론하는 서비스 클래스
+class BatchedTranscriber:
+    """
+    Splits audio into speech segments (Silero VAD, each at most one 30 s
+    window), packs them into fixed-size batches and runs each batch through
+    the CTranslate2 encoder/decoder in a single call. Silence is never
+    decoded. Segments are decoded independently (no previous-text
+    conditioning), which is what makes batching possible.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.INFERENCE_BATCH_SIZE
+        self.vad_options = VadOptions(
+            max_speech_duration_s=WINDOW_SECONDS,
+            min_silence_duration_ms=settings.VAD_MIN_SILENCE_MS,
+            speech_pad_ms=settings.VAD_SPEECH_PAD_MS,
+        )
+
+    # Returns (segments [{start, end, text}], language)
+    # (세그먼트 목록, 언어)를 반환하는 메서드
+    def transcribe(
+        self,
+        model: WhisperModel,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: int = 5,
+    ) -> Tuple[List[dict], str]:
+        segments = []
+        for segment, language in self.iter_segments(model, audio, language, beam_size):
+            segments.append(segment)
+        return segments, language or "en"
+
+    # Yields (segment, language) batch by batch, in timestamp order.
+    # Language detection seconds are added to `timings` when given.
+    # 배치 단위로 (세그먼트, 언어)를 타임스탬프 순서대로 반환하는 제너레이터
+    def iter_segments(
+        self,
+        model: WhisperModel,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        beam_size: int = 5,
+        timings: Optional[dict] = None,
+    ) -> Iterator[Tuple[dict, str]]:
+        speech_chunks = get_speech_timestamps(audio, self.vad_options)
+
+        tokenizer = None
+        for offset in range(0, len(speech_chunks), self.batch_size):
+            batch = speech_chunks[offset : offset + self.batch_size]
+            encoder_output = self._encode(model, audio, batch)
+
+            if tokenizer is None:
+                # Detect language once, from the first speech segment
+                # 첫 음성 구간으로 한 번만 언어 감지
+                if language is None:
+                    started = time.perf_counter()
+                    language = self._detect_language(model, encoder_output)
+                    if timings is not None:
+                        timings["language_detection"] = time.perf_counter() - started
+                tokenizer = Tokenizer(
+                    model.hf_tokenizer,
+                    model.model.is_multilingual,
+                    task="transcribe",
+                    language=language,
+                )
+
+            texts = self._generate(
+                model, encoder_output, tokenizer, len(batch), beam_size
+            )
+            # VAD chunks are already ordered, so batches stitch back in order
+            # VAD 구간은 이미 시간순이므로 배치 결과를 순서대로 이어 붙임
+            for chunk, text in zip(batch, texts):
+                segment = {
+                    "start": round(chunk["start"] / SAMPLING_RATE, 2),
+                    "end": round(chunk["end"] / SAMPLING_RATE, 2),
+                    "text": text,
+                }
+                yield segment, language
+
+    def _encode(
+        self, model: WhisperModel, audio: np.ndarray, batch: List[dict]
+    ) -> ctranslate2.StorageView:
+        extractor = model.feature_extractor
+        features = []
+        for chunk in batch:
+            # Pad every segment to a full window so the batch is rectangular
+            # 배치를 직사각형으로 맞추기 위해 모든 구간을 한 윈도우 길이로 패딩
+            mel = extractor(audio[chunk["start"] : chunk["end"]], padding=True)
+            features.append(mel[:, : extractor.nb_max_frames])
+        features = np.ascontiguousarray(np.stack(features))
+        to_cpu = model.model.device == "cuda" and len(model.model.device_index) > 1
+        return model.model.encode(
+            ctranslate2.StorageView.from_array(features), to_cpu=to_cpu
+        )
+
+    def _detect_language(
+        self, model: WhisperModel, encoder_output: ctranslate2.StorageView
+    ) -> str:
+        if not model.model.is_multilingual:
+            return "en"
+        token, _ = model.model.detect_language(encoder_output)[0][0]
+        return token[2:-2]
+
+    def _generate(
+        self,
+        model: WhisperModel,
+        encoder_output: ctranslate2.StorageView,
+        tokenizer: Tokenizer,
+        batch_size: int,
+        beam_size: int,
+    ) -> List[str]:
+        prompt = list(tokenizer.sot_sequence) + [tokenizer.no_timestamps]
+        results = model.model.generate(
+            encoder_output,
+            [prompt] * batch_size,
+            beam_size=beam_size,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+        )
+        return [tokenizer.decode(result.sequences_ids[0]).strip() for result in results]
+
+
+# Global instance
+batched_transcriber = BatchedTranscriber()
@@ -0,0 +1,53 @@
+from config import settings
+
+# Named decoding profiles (faster-whisper transcribe() options)
+# 이름이 있는 디코딩 프로필 (faster-whisper transcribe() 옵션)
+#
+# fast      Greedy decoding, no temperature fallback, no timestamp tokens and
+#           no previous-text prompt. Fastest; fine for short practice
+#           answers, but a low-confidence window is never retried and long
+#           files may drift.
+#           그리디 디코딩, 재시도 없음. 짧은 답변용, 가장 빠름.
+# balanced  Beam 3 with a short fallback ladder (0.0 -> 0.4). Recovers from
+#           most repetition/low-confidence windows at a fraction of the
+#           beam-5 cost. No previous-text prompt, which also avoids
+#           hallucination loops carrying across windows.
+#           빔 3 + 짧은 온도 재시도. 속도와 정확도의 절충.
+# accurate  Beam 5 with the full fallback ladder and previous-text
+#           conditioning (the original worker behaviour). Best accuracy on
+#           long lectures, slowest.
+#           빔 5 + 전체 온도 재시도 + 이전 문맥 사용 (기존 동작). 가장 정확함.
+DECODING_PROFILES = {
+    "fast": {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0.0,
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+    },
+    "balanced": {
+        "beam_size": 3,
+        "best_of": 3,
+        "temperature": [0.0, 0.2, 0.4],
+        "condition_on_previous_text": False,
+        "without_timestamps": False,
+    },
+    "accurate": {
+        "beam_size": 5,
+        "best_of": 5,
+        "temperature": [0.0, 0.2, 0.4, 0.6, 0.8, 1.0],
+        "condition_on_previous_text": True,
+        "without_timestamps": False,
+    },
+}
+
+
+def resolve_profile(name: str = None) -> str:
+    """
+    Returns the profile name to use, falling back to DECODING_PROFILE.
+    Raises ValueError for unknown names.
+    """
+    name = name or settings.DECODING_PROFILE
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unsupported decoding profile: {name}")
+    return name
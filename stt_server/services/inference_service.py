@@ -1,12 +1,29 @@
+import contextlib
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
+
+import numpy as np
+from config import settings
+from services.decoding_profiles import DECODING_PROFILES, resolve_profile
 from services.model_service import ModelService
-from utils.audio_loader import AudioLoader
+from utils.audio_loader import AudioLoader, SAMPLING_RATE, detect_format
+from utils.audio_preprocess import audio_preprocessor
 
 # Removed dependency on app.schemas
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Max parallel downloads for a batch job
+# 배치 작업의 최대 동시 다운로드 수
+BATCH_DOWNLOAD_WORKERS = 4
+
+# Per-job inference modes
+# 작업별 추론 모드
+INFERENCE_MODES = ("sequential", "batched")
+
 
 # Service class for handling transcription logic (Worker Side)
 # 전사 로직을 처리하는 서비스 클래스 (워커 사이드)
@@ -14,48 +31,326 @@ class InferenceService:
     def __init__(self):
         self.model_service = ModelService()
         self.audio_loader = AudioLoader()
+        # Concurrent jobs share one WhisperModel; at most MODEL_NUM_WORKERS of
+        # them run inference at a time, the rest keep downloading/decoding
+        # 동시 작업들은 하나의 WhisperModel을 공유하며, 최대 MODEL_NUM_WORKERS개만
+        # 동시에 추론하고 나머지는 다운로드/디코딩을 계속 진행함
+        self._inference_slots = threading.BoundedSemaphore(
+            self.model_service.runtime["num_workers"]
+        )
+        self._stats_lock = threading.Lock()
+        self._stats = {"active_jobs": 0, "max_active_jobs": 0, "inference_wait": 0.0}
 
     # Main method to transcribe audio from a URL
-    def transcribe(self, audio_url: str, language: str = None) -> dict:
+    def transcribe(
+        self,
+        audio_url: str,
+        language: str = None,
+        mode: str = None,
+        profile: str = None,
+        model: str = None,
+    ) -> dict:
         start_time = time.time()
-        temp_file_path = None
+        mode = self._resolve_mode(mode)
+        profile = resolve_profile(profile)
 
         try:
-            # 1. Download audio file
-            logger.info(f"Downloading audio from {audio_url}")
-            temp_file_path = self.audio_loader.download_audio(audio_url)
-
-            # 2. Get Model
-            model = self.model_service.get_model()
-
-            # 3. Transcribe
-            logger.info("Starting transcription...")
-            # beam_size=5 is a common default
-            segments_generator, info = model.transcribe(
-                temp_file_path, beam_size=5, language=language
+            with self._track_job():
+                # 1. Download and decode audio in memory (no temp file)
+                # 메모리에서 오디오 다운로드 및 디코딩 (임시 파일 없음)
+                logger.info(f"Loading audio from {audio_url}")
+                audio, audio_meta = self.audio_loader.load_audio(audio_url)
+
+                # 2-4. Transcribe and format
+                return self._transcribe_audio(
+                    audio, audio_meta, language, start_time, mode, profile, model
+                )
+
+        except Exception as e:
+            logger.error(f"Transcription failed: {e}")
+            raise e
+
+    # Inline variant of transcribe(): the audio bytes came in the job input,
+    # so there is no download
+    # 작업 입력에 포함된 오디오 바이트를 전사하는 메서드 (다운로드 없음)
+    def transcribe_bytes(
+        self,
+        data: bytes,
+        language: str = None,
+        mode: str = None,
+        profile: str = None,
+        model: str = None,
+    ) -> dict:
+        start_time = time.time()
+        mode = self._resolve_mode(mode)
+        profile = resolve_profile(profile)
+
+        with self._track_job():
+            logger.info(f"Decoding inline audio ({len(data)} bytes)")
+            decode_started = time.perf_counter()
+            audio = self.audio_loader.decode_bytes(data)
+            decode_seconds = round(time.perf_counter() - decode_started, 4)
+            audio_meta = {
+                "format": detect_format(data[:16]),
+                "download": None,
+                "decode_seconds": decode_seconds,
+                "load_seconds": decode_seconds,
+            }
+            return self._transcribe_audio(
+                audio, audio_meta, language, start_time, mode, profile, model
             )
 
-            segments = list(segments_generator)
+    # Streaming variant of transcribe(): yields segment events, then the final result
+    # transcribe()의 스트리밍 버전: 세그먼트 이벤트를 순서대로 반환한 뒤 최종 결과 반환
+    def transcribe_stream(
+        self,
+        audio_url: str,
+        language: str = None,
+        mode: str = None,
+        profile: str = None,
+        model: str = None,
+    ) -> Iterator[dict]:
+        start_time = time.time()
+        mode = self._resolve_mode(mode)
+        profile = resolve_profile(profile)
 
-            # 4. Format Response (Return Dict)
-            transcription_segments = [
-                {"start": s.start, "end": s.end, "text": s.text} for s in segments
+        with self._track_job():
+            logger.info(f"Loading audio from {audio_url}")
+            audio, audio_meta = self.audio_loader.load_audio(audio_url)
+            yield from self._iter_transcription(
+                audio, audio_meta, language, start_time, mode, profile, model
+            )
+
+    # Batch method: load all files concurrently, transcribe back to back
+    # 배치 메서드: 모든 파일을 동시에 로드하고, 로드된 모델로 연달아 전사
+    def transcribe_batch(
+        self,
+        audio_urls: List[str],
+        language: str = None,
+        mode: str = None,
+        profile: str = None,
+        model: str = None,
+    ) -> list:
+        mode = self._resolve_mode(mode)
+        profile = resolve_profile(profile)
+        results = []
+        workers = min(BATCH_DOWNLOAD_WORKERS, len(audio_urls)) or 1
+
+        with self._track_job(), ThreadPoolExecutor(max_workers=workers) as pool:
+            # Later downloads keep running while earlier files are transcribed
+            # 앞선 파일을 전사하는 동안 뒤 파일의 다운로드가 계속 진행됨
+            downloads = [
+                (url, time.time(), pool.submit(self.audio_loader.load_audio, url))
+                for url in audio_urls
             ]
 
-            full_text = " ".join([s.text for s in segments])
-            process_time = time.time() - start_time
+            for audio_url, start_time, future in downloads:
+                try:
+                    audio, audio_meta = future.result()
+                    result = self._transcribe_audio(
+                        audio, audio_meta, language, start_time, mode, profile, model
+                    )
+                    results.append({"audio_url": audio_url, **result})
+                except Exception as e:
+                    # One bad file must not fail the whole batch
+                    # 한 파일의 실패가 배치 전체를 실패시키지 않도록 파일 단위로 처리
+                    logger.error(f"Batch item failed ({audio_url}): {e}")
+                    results.append({"audio_url": audio_url, "error": str(e)})
 
+        return results
+
+    @contextlib.contextmanager
+    def _track_job(self):
+        with self._stats_lock:
+            self._stats["active_jobs"] += 1
+            self._stats["max_active_jobs"] = max(
+                self._stats["max_active_jobs"], self._stats["active_jobs"]
+            )
+        try:
+            yield
+        finally:
+            with self._stats_lock:
+                self._stats["active_jobs"] -= 1
+
+    def _add_stat(self, key: str, value: float):
+        with self._stats_lock:
+            self._stats[key] += value
+
+    def get_stats(self) -> dict:
+        """
+        Concurrency counters: jobs in flight, peak concurrency and total
+        seconds jobs spent waiting for a model slot.
+        """
+        with self._stats_lock:
             return {
-                "text": full_text,
-                "segments": transcription_segments,
-                "language": info.language,
-                "processing_time": process_time,
+                **self._stats,
+                "inference_wait": round(self._stats["inference_wait"], 3),
             }
 
-        except Exception as e:
-            logger.error(f"Transcription failed: {e}")
-            raise e
+    def _resolve_mode(self, mode: str) -> str:
+        mode = mode or settings.INFERENCE_MODE
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"Unsupported inference mode: {mode}")
+        return mode
+
+    def _transcribe_audio(
+        self,
+        audio: np.ndarray,
+        audio_meta: dict,
+        language: str,
+        start_time: float,
+        mode: str,
+        profile: str,
+        model_name: str = None,
+    ) -> dict:
+        for event in self._iter_transcription(
+            audio, audio_meta, language, start_time, mode, profile, model_name
+        ):
+            if event["type"] == "final":
+                return {k: v for k, v in event.items() if k != "type"}
+
+    # Yields {"type": "segment", ...} as segments are decoded, then one
+    # {"type": "final", ...} carrying the full result
+    # 세그먼트가 디코딩될 때마다 이벤트를 반환하고, 마지막에 전체 결과를 반환
+    def _iter_transcription(
+        self,
+        audio: np.ndarray,
+        audio_meta: dict,
+        language: str,
+        start_time: float,
+        mode: str,
+        profile: str,
+        model_name: str = None,
+    ) -> Iterator[dict]:
+        audio_duration = len(audio) / SAMPLING_RATE
+
+        # 2. Preprocess: trim leading/trailing silence, normalize loudness.
+        # Runs before taking a model slot; removed seconds are never decoded
+        # 2. 전처리: 앞뒤 무음 제거 및 음량 정규화 (모델 슬롯을 잡기 전에 실행)
+        preprocess_start = time.time()
+        preprocess = None
+        if settings.PREPROCESS_ENABLED:
+            audio, preprocess = audio_preprocessor.process(audio)
+            logger.info(f"Preprocessed audio: {preprocess}")
+        preprocess_time = time.time() - preprocess_start
+        offset = preprocess["leading_trimmed_seconds"] if preprocess else 0.0
+        # Only silence left: nothing to decode, the model is not touched
+        # 무음만 남은 경우 모델을 사용하지 않음
+        has_speech = len(audio) > 0
+
+        # 3. Pick the model by the duration left to decode (or the job's
+        # "model" field); it stays loaded until this job is done
+        # 3. 디코딩할 길이(또는 작업의 "model" 필드)로 모델 선택 (작업이 끝날 때까지 유지)
+        model_name = self.model_service.select_model(
+            len(audio) / SAMPLING_RATE, model_name
+        )
+        model_load_start = time.time()
+        model = self.model_service.acquire_model(model_name) if has_speech else None
+        # Non-zero only when this job loaded the model
+        # 이 작업이 모델을 로드한 경우에만 0보다 큼
+        model_load_time = time.time() - model_load_start
+
+        # 4. Transcribe (waits for a free model slot)
+        # 4. 전사 (사용 가능한 모델 슬롯을 기다림)
+        wait_start = time.time()
+        if has_speech:
+            self._inference_slots.acquire()
+        inference_start = time.time()
+        queue_wait = inference_start - wait_start
+        self._add_stat("inference_wait", queue_wait)
+        stage_timings = {"language_detection": 0.0}
+        try:
+            logger.info(f"Starting transcription ({model_name}, {mode}, {profile})...")
+            options = DECODING_PROFILES[profile]
+            transcription_segments = []
+            detected_language = language
+            if not has_speech:
+                segment_iter = iter(())
+            elif mode == "batched":
+                # VAD segments decoded together in fixed-size batches
+                # VAD 음성 구간을 고정 크기 배치로 함께 디코딩
+                # (imported on first use to keep it out of the cold start)
+                # (콜드 스타트에서 제외하기 위해 처음 사용할 때 임포트)
+                from services.batched_inference import batched_transcriber
+
+                segment_iter = batched_transcriber.iter_segments(
+                    model,
+                    audio,
+                    language=language,
+                    beam_size=options["beam_size"],
+                    timings=stage_timings,
+                )
+            else:
+                # transcribe() computes the features and, without a language,
+                # detects it before returning the lazy segment generator
+                # transcribe()는 특징 추출과 (언어 미지정 시) 언어 감지를 마친 뒤 반환함
+                detect_start = time.time()
+                segments_generator, info = model.transcribe(
+                    audio, language=language, **options
+                )
+                if language is None:
+                    stage_timings["language_detection"] = time.time() - detect_start
+                detected_language = info.language
+                segment_iter = (
+                    ({"start": s.start, "end": s.end, "text": s.text}, info.language)
+                    for s in segments_generator
+                )
+
+            for segment, detected_language in segment_iter:
+                if offset:
+                    # Timestamps relative to the original (untrimmed) audio
+                    # 원본(자르기 전) 오디오 기준 타임스탬프로 보정
+                    segment = {
+                        **segment,
+                        "start": round(segment["start"] + offset, 3),
+                        "end": round(segment["end"] + offset, 3),
+                    }
+                transcription_segments.append(segment)
+                yield {"type": "segment", **segment}
         finally:
-            # 5. Cleanup
-            if temp_file_path:
-                self.audio_loader.cleanup_file(temp_file_path)
+            if has_speech:
+                self._inference_slots.release()
+                self.model_service.release_model(model_name)
+        inference_time = time.time() - inference_start
+
+        # 5. Format Response (Return Dict)
+        full_text = " ".join([s["text"] for s in transcription_segments])
+        process_time = time.time() - start_time
+        download = audio_meta.get("download") or {}
+        # Per-stage seconds. download and decode overlap for streamed formats;
+        # audio_load is their wall time
+        # 단계별 소요 시간 (스트리밍 포맷은 download와 decode가 겹침, audio_load는 합산 경과 시간)
+        timings = {
+            "download": download.get("download_seconds"),
+            "decode": audio_meta.get("decode_seconds"),
+            "audio_load": audio_meta.get("load_seconds"),
+            "preprocess": round(preprocess_time, 4),
+            "model_load": round(model_load_time, 4),
+            "queue_wait": round(queue_wait, 4),
+            "language_detection": round(stage_timings["language_detection"], 4),
+            "decoding": round(inference_time - stage_timings["language_detection"], 4),
+            "total": round(process_time, 4),
+        }
+
+        yield {
+            "type": "final",
+            "text": full_text,
+            "segments": transcription_segments,
+            "language": detected_language or "en",
+            "audio_format": audio_meta.get("format"),
+            "download": audio_meta.get("download"),
+            "processing_time": process_time,
+            "timings": timings,
+            "model": model_name,
+            "mode": mode,
+            "profile": profile,
+            "audio_duration": round(audio_duration, 3),
+            # Leading/trailing silence removed before inference, and the gain applied
+            # 추론 전에 제거한 앞뒤 무음 길이와 적용한 게인
+            "preprocess": preprocess,
+            # Inference seconds per audio second (lower is faster)
+            # 오디오 1초당 추론 시간 (낮을수록 빠름)
+            "real_time_factor": (
+                round(inference_time / audio_duration, 4) if audio_duration else None
+            ),
+        }
@@ -1,53 +1,301 @@
+import contextlib
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import ctranslate2
+import numpy as np
 from faster_whisper import WhisperModel
 
 # Updated import for decoupled worker
 from config import settings
+from services.decoding_profiles import DECODING_PROFILES
+from utils.cold_start import cold_start
 import logging
 
 # Logger setup
 logger = logging.getLogger(__name__)
 
+SAMPLING_RATE = 16000
+
+
+def _available_cores() -> int:
+    # Respect CPU affinity / container limits where the OS exposes them
+    # 컨테이너/affinity로 제한된 코어 수를 우선 사용
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+# Resolves "auto" settings into concrete WhisperModel arguments
+# "auto" 설정을 실제 WhisperModel 인자로 변환하는 함수
+def resolve_runtime() -> dict:
+    device = settings.DEVICE
+    if device == "auto":
+        device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+
+    compute_type = settings.COMPUTE_TYPE
+    if compute_type == "auto":
+        compute_type = "float16" if device == "cuda" else "int8"
+
+    num_workers = settings.MODEL_NUM_WORKERS
+    cpu_threads = settings.CPU_THREADS
+    if device == "cpu":
+        # Split the cores between model workers instead of oversubscribing
+        # 코어를 모델 워커 간에 나누어 과도한 스레드 경쟁을 방지
+        cores = _available_cores()
+        if num_workers <= 0:
+            num_workers = max(1, cores // settings.CPU_CORES_PER_WORKER)
+        if cpu_threads <= 0:
+            cpu_threads = max(1, cores // num_workers)
+    else:
+        num_workers = max(num_workers, 1)
+
+    return {
+        "device": device,
+        "compute_type": compute_type,
+        "num_workers": num_workers,
+        "cpu_threads": max(cpu_threads, 0),
+    }
+
 
-# Service class for managing the Whisper Model
-# Whisper 모델을 관리하는 서비스 클래스
+def _model_size_mb(path: str) -> float:
+    # Size of the model files: a rough estimate of the memory the model takes
+    # 모델 파일 크기 합계 (모델이 차지하는 메모리의 대략적인 추정치)
+    total = 0
+    if os.path.isdir(path):
+        for entry in os.scandir(path):
+            if entry.is_file():
+                total += entry.stat().st_size
+    return total / (1024 * 1024)
+
+
+# Service class for managing the Whisper models (registry)
+# Whisper 모델(레지스트리)을 관리하는 서비스 클래스
 class ModelService:
+    """
+    Holds every configured CTranslate2 Whisper model by name: MODEL_PATH as
+    MODEL_NAME plus MODEL_REGISTRY. Models load on first use; above
+    MODEL_MEMORY_BUDGET_MB the least recently used model that no job is
+    using is dropped. All models share the resolved runtime (device, compute
+    type, workers, threads).
+    """
+
     _instance = None
-    _model = None
+    runtime = resolve_runtime()
 
-    # Singleton pattern to ensure only one model instance loads in memory
-    # 메모리에 하나의 모델 인스턴스만 로드되도록 싱글톤 패턴 적용
+    # Singleton pattern so every model loads at most once per process.
+    # Loading is explicit (handler.py) or lazy (get_model), not on construction
+    # 모델이 프로세스당 한 번만 로드되도록 싱글톤 패턴 적용
+    # (로드는 handler.py에서 명시적으로 하거나 get_model에서 지연 로드)
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(ModelService, cls).__new__(cls)
-            cls._instance.load_model()
+            instance = super(ModelService, cls).__new__(cls)
+            instance._paths = {settings.MODEL_NAME: settings.MODEL_PATH}
+            instance._paths.update(settings.MODEL_REGISTRY)
+            unknown = set(settings.MODEL_ROUTES) - set(instance._paths)
+            if unknown:
+                raise ValueError(f"MODEL_ROUTES names unknown models: {unknown}")
+            # Loaded models, least recently used first
+            # 로드된 모델 (가장 오래 사용하지 않은 모델이 앞)
+            instance._models = OrderedDict()
+            instance._sizes = {}
+            instance._in_use = Counter()
+            instance._lock = threading.Lock()
+            instance._load_locks = {name: threading.Lock() for name in instance._paths}
+            instance._stats = {"loads": 0, "evictions": 0}
+            cls._instance = instance
         return cls._instance
 
-    # Loads the Whisper model using settings
-    # 설정을 사용하여 Whisper 모델을 로드하는 메서드
-    def load_model(self):
-        if self._model is None:
-            logger.info(f"Loading Whisper model from {settings.MODEL_PATH}...")
+    # Loads a model by name (default MODEL_NAME). The first load of the
+    # process is the cold start: each step is timed as a cold-start phase
+    # 이름으로 모델을 로드하는 메서드 (프로세스의 첫 로드는 단계별 콜드 스타트 시간 기록)
+    def load_model(self, name: str = None) -> WhisperModel:
+        name = name or settings.MODEL_NAME
+        if name not in self._paths:
+            raise ValueError(f"Unknown model: {name}")
+        path = self._paths[name]
+
+        with self._load_locks[name]:
+            model = self._touch(name)
+            if model is not None:
+                return model
+
+            first_load = self._stats["loads"] == 0
+
+            def phase(phase_name):
+                return (
+                    cold_start.phase(phase_name)
+                    if first_load
+                    else contextlib.nullcontext()
+                )
+
+            if settings.AUTOTUNE_ENABLED and first_load:
+                # Imported lazily: the autotuner reuses helpers from this module
+                # autotuner가 이 모듈의 함수를 사용하므로 지연 임포트
+                from services.autotuner import autotuner
+
+                with phase("autotune"):
+                    self.runtime = autotuner.tune(self.runtime)
+
+            # Model files are read into the page cache in the background
+            # (started by handler.py); wait for whatever is left
+            # 백그라운드에서 모델 파일을 페이지 캐시로 읽는 작업의 남은 부분을 대기
+            if settings.MODEL_PREFETCH and first_load:
+                with phase("model_file_read"):
+                    cold_start.start_prefetch(path)
+                    cold_start.wait_prefetch()
+
+            size_mb = _model_size_mb(path)
+            self._make_room(name, size_mb)
+
+            logger.info(
+                f"Loading Whisper model '{name}' from {path} ({self.runtime})..."
+            )
+            load_started = time.perf_counter()
             try:
                 # Initialize WhisperModel with parameters from config
                 # 설정 파일의 파라미터로 WhisperModel 초기화
                 # local_files_only=True prevents trying to download if path exists
                 # local_files_only=True는 경로가 존재할 경우 다운로드를 시도하지 않음
-                self._model = WhisperModel(
-                    settings.MODEL_PATH,  # Or just settings.MODEL_SIZE if not using baked path logic yet, but we will use path.
-                    device=settings.DEVICE,
-                    compute_type=settings.COMPUTE_TYPE,
-                )
-                logger.info("Whisper model loaded successfully.")
+                with phase("ctranslate2_init"):
+                    model = WhisperModel(
+                        path,
+                        device=self.runtime["device"],
+                        compute_type=self.runtime["compute_type"],
+                        # Lets concurrent jobs run inference in parallel
+                        # 동시 작업이 병렬로 추론할 수 있도록 설정
+                        num_workers=self.runtime["num_workers"],
+                        cpu_threads=self.runtime["cpu_threads"],
+                    )
+                logger.info(f"Whisper model '{name}' loaded successfully.")
             except Exception as e:
-                logger.error(f"Failed to load Whisper model: {e}")
+                logger.error(f"Failed to load Whisper model '{name}': {e}")
                 raise RuntimeError(f"Could not load model: {e}")
 
-    # Returns the loaded model instance
-    # 로드된 모델 인스턴스를 반환하는 메서드
-    def get_model(self) -> WhisperModel:
-        if self._model is None:
-            self.load_model()
-        return self._model
+            if settings.WARMUP_INFERENCE:
+                with phase("first_inference"):
+                    self._warmup_inference(model)
+            logger.info(
+                f"Model '{name}' ready in {time.perf_counter() - load_started:.2f}s"
+            )
+
+            with self._lock:
+                self._models[name] = model
+                self._sizes[name] = size_mb
+                self._stats["loads"] += 1
+            return model
+
+    # Marks a loaded model as most recently used; None when it is not loaded
+    # 로드된 모델을 가장 최근 사용으로 표시 (로드되지 않았으면 None)
+    def _touch(self, name: str) -> Optional[WhisperModel]:
+        with self._lock:
+            model = self._models.get(name)
+            if model is not None:
+                self._models.move_to_end(name)
+            return model
+
+    # Drops least recently used idle models until `size_mb` more fits the budget
+    # 예산 안에 size_mb만큼 들어갈 때까지 사용 중이 아닌 오래된 모델부터 해제
+    def _make_room(self, name: str, size_mb: float):
+        budget = settings.MODEL_MEMORY_BUDGET_MB
+        if budget <= 0:
+            return
+        with self._lock:
+            loaded = sum(self._sizes[loaded_name] for loaded_name in self._models)
+            for candidate in list(self._models):
+                if loaded + size_mb <= budget:
+                    break
+                if self._in_use[candidate]:
+                    continue
+                # Dropping the last reference frees the CTranslate2 model
+                # 마지막 참조를 제거하면 CTranslate2 모델 메모리가 해제됨
+                del self._models[candidate]
+                loaded -= self._sizes.pop(candidate)
+                self._stats["evictions"] += 1
+                logger.info(f"Evicted model '{candidate}' to load '{name}'")
+            if loaded + size_mb > budget:
+                # Never fail a job over the budget: the models in use stay loaded
+                # 예산 때문에 작업을 실패시키지 않음 (사용 중인 모델은 유지)
+                logger.warning(
+                    f"Loading '{name}' exceeds MODEL_MEMORY_BUDGET_MB "
+                    f"({loaded + size_mb:.0f} > {budget} MB)"
+                )
+
+    # Tiny inference on every model worker so CUDA kernels, allocator pools
+    # and thread pools are initialized before the first real job
+    # 첫 실제 작업 전에 커널/메모리 풀/스레드 풀이 초기화되도록 모든 모델 워커에서 짧은 추론 실행
+    def _warmup_inference(self, model: WhisperModel):
+        audio = np.zeros(SAMPLING_RATE, dtype=np.float32)
+        options = DECODING_PROFILES["fast"]
+
+        def run(_):
+            segments, _info = model.transcribe(audio, language="en", **options)
+            list(segments)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.runtime["num_workers"]) as pool:
+                list(pool.map(run, range(self.runtime["num_workers"])))
+        except Exception as e:
+            # The model itself loaded; a failed warm-up only costs latency
+            # 모델 로드는 성공했으므로 워밍업 실패는 지연 시간만 늘어남
+            logger.warning(f"Warm-up inference failed: {e}")
+
+    # Returns a loaded model instance (loads it on first use)
+    # 로드된 모델 인스턴스를 반환하는 메서드 (처음 사용 시 로드)
+    def get_model(self, name: str = None) -> WhisperModel:
+        return self.load_model(name)
+
+    # Returns the model and keeps it loaded (not evictable) until release()
+    # 모델을 반환하고 release() 전까지 해제되지 않도록 유지
+    def acquire_model(self, name: str = None) -> WhisperModel:
+        name = name or settings.MODEL_NAME
+        while True:
+            model = self.load_model(name)
+            with self._lock:
+                # Evicted between loading and here: load it again
+                # 로드 직후 해제된 경우 다시 로드
+                if self._models.get(name) is model:
+                    self._in_use[name] += 1
+                    return model
+
+    def release_model(self, name: str = None):
+        with self._lock:
+            self._in_use[name or settings.MODEL_NAME] -= 1
+
+    def select_model(self, audio_seconds: float, requested: str = None) -> str:
+        """
+        Model for a job: the requested one if given, else the first
+        MODEL_ROUTES entry (smallest limit first) the audio fits in, else
+        MODEL_NAME.
+        """
+        if requested:
+            if requested not in self._paths:
+                raise ValueError(f"Unknown model: {requested}")
+            return requested
+        for name, max_seconds in sorted(
+            settings.MODEL_ROUTES.items(), key=lambda route: route[1]
+        ):
+            if audio_seconds <= max_seconds:
+                return name
+        return settings.MODEL_NAME
+
+    def get_stats(self) -> dict:
+        """
+        Registered and loaded models (least recently used first), their
+        estimated size against the budget, and load/eviction counters.
+        """
+        with self._lock:
+            return {
+                "registered": sorted(self._paths),
+                "loaded": list(self._models),
+                "loaded_mb": round(sum(self._sizes.values()), 1),
+                "budget_mb": settings.MODEL_MEMORY_BUDGET_MB,
+                **self._stats,
+            }
 
 
 # Dependency/Global accessor
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# handler.py, services/ and emulator/ are imported from the stt_server root,
+# like the worker container does
+# 워커 컨테이너와 동일하게 stt_server 루트 기준으로 모듈을 임포트
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
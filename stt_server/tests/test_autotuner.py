@@ -0,0 +1,85 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from config import settings
+from services import autotuner as autotuner_module
+from services.autotuner import Autotuner
+
+RUNTIME = {
+    "device": "cpu",
+    "compute_type": "float32",
+    "num_workers": 1,
+    "cpu_threads": 4,
+}
+
+# (compute type, workers) -> (throughput, transcript)
+MEASUREMENTS = {
+    ("float32", 1): (1.0, "안녕하세요 반갑습니다"),
+    ("float32", 2): (1.5, "안녕하세요 반갑습니다"),
+    ("int8", 1): (3.0, "안녕하세요 반갑습니다"),
+    ("int8", 2): (4.0, "안녕 하세요 반가워요"),
+}
+
+
+@pytest.fixture
+def tuner(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "AUTOTUNE_CACHE_PATH", str(tmp_path / "tune.json"))
+    tuner = Autotuner()
+    monkeypatch.setattr(
+        tuner,
+        "_candidates",
+        lambda runtime: [
+            {"compute_type": compute_type, "num_workers": workers, "cpu_threads": 2}
+            for compute_type, workers in MEASUREMENTS
+        ],
+    )
+
+    def measure(device, candidate, sample):
+        speed, text = MEASUREMENTS[
+            (candidate["compute_type"], candidate["num_workers"])
+        ]
+        return {"runtime": candidate, "audio_seconds_per_second": speed, "text": text}
+
+    monkeypatch.setattr(tuner, "_measure", measure)
+    return tuner
+
+
+def test_speech_sample_picks_fastest_within_tolerance_and_saves(tuner, monkeypatch):
+    monkeypatch.setattr(tuner, "_load_sample", lambda: np.zeros(16000, np.float32))
+    result = tuner.tune(RUNTIME)
+    assert (result["compute_type"], result["num_workers"]) == ("int8", 1)
+
+    with open(settings.AUTOTUNE_CACHE_PATH) as f:
+        assert json.load(f)[0]["choice"]["compute_type"] == "int8"
+
+
+def test_without_speech_sample_calibration_is_skipped(tuner, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "AUTOTUNE_SAMPLE_PATH", "/nonexistent/sample.wav")
+    measured = []
+    monkeypatch.setattr(tuner, "_measure", lambda *args: measured.append(args))
+
+    assert tuner.tune(RUNTIME) == RUNTIME
+    assert tuner.tune(RUNTIME) == RUNTIME
+    assert measured == []
+    assert not os.path.exists(settings.AUTOTUNE_CACHE_PATH)
+    assert caplog.text.count("skipping calibration") == 1
+
+
+def test_samples_are_transcribed_in_the_production_language(monkeypatch):
+    languages = []
+
+    class FakeModel:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def transcribe(self, audio, language=None, **options):
+            languages.append(language)
+            return [], None
+
+    monkeypatch.setattr(autotuner_module, "WhisperModel", FakeModel)
+    candidate = {"compute_type": "int8", "num_workers": 1, "cpu_threads": 1}
+    Autotuner()._measure("cpu", candidate, np.zeros(16000, dtype=np.float32))
+    assert set(languages) == {settings.AUTOTUNE_LANGUAGE} == {"ko"}
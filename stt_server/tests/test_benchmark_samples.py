@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from benchmarks.stt_benchmark import DEFAULT_MANIFEST, load_manifest
+
+
+def _write_manifest(directory):
+    manifest = {
+        "language": "ko",
+        "samples": [{"id": "ko_01", "audio": "ko_01.wav", "reference": "안녕하세요"}],
+    }
+    path = directory / "manifest.json"
+    path.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def test_missing_audio_names_the_files(tmp_path):
+    path = _write_manifest(tmp_path)
+    with pytest.raises(SystemExit) as exc:
+        load_manifest(str(path))
+    assert "ko_01.wav" in str(exc.value)
+
+    (tmp_path / "ko_01.wav").write_bytes(b"RIFF")
+    assert load_manifest(str(path))["directory"] == str(tmp_path)
+
+
+def test_checked_in_manifest_has_references_for_every_sample():
+    with open(DEFAULT_MANIFEST, encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["language"] == "ko"
+    for sample in manifest["samples"]:
+        assert sample["reference"].strip()
@@ -0,0 +1,140 @@
+import textwrap
+
+import pytest
+
+from emulator.runpod_emulator import RunPodEmulator
+
+HANDLERS = {
+    "echo_handler": """
+        def handler(job):
+            return {"text": job["input"]["text"]}
+    """,
+    "broken_handler": """
+        raise RuntimeError("model load failed")
+    """,
+    "concurrent_worker": """
+        import asyncio
+        import threading
+        import time
+
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def handler(job):
+            global active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.2)
+            with lock:
+                active -= 1
+            return {"peak": peak}
+
+        async def async_handler(job):
+            return await asyncio.to_thread(handler, job)
+
+        async def async_stream_handler(job):
+            for i in range(3):
+                await asyncio.sleep(0)
+                yield {"type": "segment", "index": i}
+
+        def worker_config():
+            global peak
+            peak = 0
+            return {"handler": async_handler, "concurrency_modifier": lambda n: 4}
+
+        def serial_config():
+            global peak
+            peak = 0
+            return {"handler": handler}
+
+        def stream_config():
+            return {"handler": async_stream_handler, "return_aggregate_stream": True}
+    """,
+    "crashing_handler": """
+        import os
+
+        def handler(job):
+            if job["input"].get("crash"):
+                os._exit(1)
+            return {"text": "ok"}
+    """,
+}
+
+
+@pytest.fixture(autouse=True)
+def handler_modules(tmp_path, monkeypatch):
+    # Spawned worker processes inherit sys.path, so they import these too
+    for name, source in HANDLERS.items():
+        (tmp_path / f"{name}.py").write_text(textwrap.dedent(source))
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+
+def run_job(emulator: RunPodEmulator, job_input: dict):
+    job = emulator.submit(job_input)
+    assert job.done.wait(60), f"job stuck in {job.status}"
+    return job
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_jobs_complete(mode):
+    emulator = RunPodEmulator(handler_path="echo_handler:handler", mode=mode)
+    job = run_job(emulator, {"text": "안녕하세요"})
+    assert job.status == "COMPLETED"
+    assert job.output == {"text": "안녕하세요"}
+    assert job.cold_start
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_failed_worker_start_fails_the_job(mode):
+    emulator = RunPodEmulator(handler_path="broken_handler:handler", mode=mode)
+    first = run_job(emulator, {})
+    assert first.status == "FAILED"
+    assert "model load failed" in first.error
+
+    # The worker stays cold and keeps reporting instead of hanging the queue
+    second = run_job(emulator, {})
+    assert second.status == "FAILED"
+    assert emulator.get_stats()["workers"]["warm"] == 0
+
+
+def test_crashed_worker_process_restarts():
+    emulator = RunPodEmulator(handler_path="crashing_handler:handler", mode="process")
+    crashed = run_job(emulator, {"crash": True})
+    assert crashed.status == "FAILED"
+    assert "exited" in crashed.error
+
+    recovered = run_job(emulator, {})
+    assert recovered.status == "COMPLETED"
+    assert recovered.cold_start
+
+
+def run_jobs(emulator: RunPodEmulator, count: int):
+    jobs = [emulator.submit({}) for _ in range(count)]
+    for job in jobs:
+        assert job.done.wait(60), f"job stuck in {job.status}"
+    return jobs
+
+
+def test_concurrency_modifier_sets_jobs_per_worker():
+    emulator = RunPodEmulator(config_path="concurrent_worker:worker_config")
+    run_job(emulator, {})  # cold start: RunPod takes one job, then scales up
+    jobs = run_jobs(emulator, 8)
+    assert all(job.status == "COMPLETED" for job in jobs)
+    assert max(job.output["peak"] for job in jobs) == 4
+
+
+def test_without_concurrency_modifier_jobs_run_one_at_a_time():
+    emulator = RunPodEmulator(config_path="concurrent_worker:serial_config")
+    jobs = run_jobs(emulator, 4)
+    assert max(job.output["peak"] for job in jobs) == 1
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_async_generator_output_is_aggregated(mode):
+    emulator = RunPodEmulator(config_path="concurrent_worker:stream_config", mode=mode)
+    job = run_job(emulator, {})
+    assert job.status == "COMPLETED"
+    assert [item["index"] for item in job.output] == [0, 1, 2]
+    assert job.stream == job.output
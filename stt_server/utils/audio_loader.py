@@ -1,53 +1,397 @@
+import io
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
 import requests
-import tempfile
-import os
+from faster_whisper.audio import decode_audio
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Whisper expects 16 kHz mono input
+# Whisper 입력 형식 (16kHz 모노)
+SAMPLING_RATE = 16000
+
+# Containers that can be decoded front to back without seeking.
+# MP4/M4A may keep its index (moov) at the end, so it is buffered fully.
+# 탐색(seek) 없이 앞에서부터 디코딩 가능한 컨테이너
+# MP4/M4A는 인덱스(moov)가 파일 끝에 있을 수 있어 전체를 버퍼링함
+STREAMABLE_FORMATS = {"wav", "mp3", "ogg", "flac", "webm", "aac"}
+
+
+# Detect the container format from the first bytes (extensions/headers lie)
+# 첫 바이트로 컨테이너 포맷을 판별 (확장자/헤더는 신뢰할 수 없음)
+def detect_format(head: bytes) -> str:
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:3] == b"ID3":
+        return "mp3"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:4] == b"\x30\x26\xb2\x75":
+        return "wma"
+    if len(head) >= 2 and head[0] == 0xFF:
+        # ADTS AAC (layer bits 00) vs MPEG audio frame sync
+        if head[1] & 0xF6 == 0xF0:
+            return "aac"
+        if head[1] & 0xE0 == 0xE0:
+            return "mp3"
+    return "unknown"
+
+
+class StreamingBuffer(io.RawIOBase):
+    """
+    In-memory byte pipe between a download thread (writer) and the decoder
+    (reader). read() blocks until bytes arrive, so decoding overlaps with the
+    download. Deliberately not seekable: PyAV then demuxes it as a stream.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = bytearray()
+        self._closed_for_write = False
+        self._error: Optional[BaseException] = None
+        self.aborted = False
+        # Time the reader spent blocked on the network (excluded from decode time)
+        # 리더가 네트워크를 기다린 시간 (디코딩 시간에서 제외)
+        self.wait_seconds = 0.0
+        self._cond = threading.Condition()
+
+    def readable(self) -> bool:
+        return True
+
+    def write_chunk(self, chunk: bytes):
+        with self._cond:
+            self._chunks.extend(chunk)
+            self._cond.notify()
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._cond:
+            self._closed_for_write = True
+            self._error = error
+            self._cond.notify()
+
+    def abort(self):
+        # Reader gave up (decode error): tell the writer to stop downloading
+        self.aborted = True
+
+    def read(self, size: int = -1) -> bytes:
+        with self._cond:
+            if not self._chunks and not self._closed_for_write:
+                started = time.perf_counter()
+                while not self._chunks and not self._closed_for_write:
+                    self._cond.wait()
+                self.wait_seconds += time.perf_counter() - started
+            if self._error is not None:
+                raise self._error
+            if size is None or size < 0:
+                size = len(self._chunks)
+            data = bytes(self._chunks[:size])
+            del self._chunks[:size]
+            return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+class DownloadStats:
+    """
+    Per-job download metrics: time to first byte, throughput, parallel ranges
+    and resumed transfers. Shared by the range threads of one download.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.ttfb_seconds: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.bytes = 0
+        self.ranges = 1
+        self.resumes = 0
+        self._lock = threading.Lock()
+
+    def mark_first_byte(self):
+        if self.ttfb_seconds is None:
+            self.ttfb_seconds = time.perf_counter() - self.started
+
+    def add_bytes(self, count: int):
+        with self._lock:
+            self.bytes += count
+
+    def add_resume(self):
+        with self._lock:
+            self.resumes += 1
 
+    def finish(self):
+        # Called as each body/range completes; the last call marks the end
+        # 본문/구간이 끝날 때마다 호출되며 마지막 호출 시점이 다운로드 종료 시점
+        self.finished = time.perf_counter()
+
+    def to_dict(self) -> dict:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            "bytes": self.bytes,
+            "ttfb_seconds": round(self.ttfb_seconds or 0.0, 4),
+            "download_seconds": round(elapsed, 4),
+            "bytes_per_second": round(self.bytes / elapsed, 1) if elapsed > 0 else 0.0,
+            "ranges": self.ranges,
+            "resumes": self.resumes,
+        }
 
 
 # Service class for handling audio file operations
 # 오디오 파일 작업을 처리하는 서비스 클래스
 class AudioLoader:
     def __init__(self):
-        # Chunk size for streaming downloads (8KB)
-        # 스트리밍 다운로드를 위한 청크 크기 (8KB)
-        self.chunk_size = 8192
+        # Chunk size for streaming downloads (64KB)
+        # 스트리밍 다운로드를 위한 청크 크기 (64KB)
+        self.chunk_size = 65536
+        self.timeout = (
+            settings.DOWNLOAD_CONNECT_TIMEOUT_SECONDS,
+            settings.DOWNLOAD_READ_TIMEOUT_SECONDS,
+        )
+        self.session = self._create_session()
+
+    # Pooled keep-alive session; connect errors and 429/5xx are retried
+    # 커넥션 풀을 재사용하는 세션 (연결 오류와 429/5xx는 재시도)
+    def _create_session(self) -> requests.Session:
+        retry = Retry(
+            total=settings.DOWNLOAD_MAX_RETRIES,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=settings.DOWNLOAD_POOL_SIZE,
+            pool_maxsize=settings.DOWNLOAD_POOL_SIZE,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    # Downloads and decodes audio from a URL entirely in memory.
+    # Returns (16 kHz mono float32 samples,
+    #          {"format", "download", "decode_seconds", "load_seconds"}).
+    # URL의 오디오를 메모리에서 다운로드/디코딩하여 (샘플, 메타데이터)를 반환하는 메서드
+    def load_audio(self, url: str) -> Tuple[np.ndarray, dict]:
+        stats = DownloadStats()
+        response = self._get(url)
+        # Decoder CPU time; for streamed formats it overlaps the download
+        # 디코딩 시간 (스트리밍 포맷은 다운로드와 겹쳐서 진행됨)
+        decode_seconds = 0.0
+
+        # Range/resume only when bytes on the wire are the bytes we store
+        # 전송 바이트와 저장 바이트가 같을 때만 Range/이어받기 사용
+        resumable = response.headers.get(
+            "Accept-Ranges", ""
+        ).lower() == "bytes" and not response.headers.get("Content-Encoding")
+        total = int(response.headers.get("Content-Length") or 0)
+
+        if resumable and total >= settings.DOWNLOAD_PARALLEL_MIN_BYTES:
+            data = self._download_parallel(url, response, total, stats)
+            audio_format = detect_format(data[:16])
+            decode_started = time.perf_counter()
+            audio = self._decode(io.BytesIO(data))
+            decode_seconds = time.perf_counter() - decode_started
+        else:
+            chunks = self._iter_body(url, response, 0, None, resumable, stats)
+            head = b""
+            for chunk in chunks:
+                head = chunk
+                if head:
+                    break
+            if not head:
+                raise RuntimeError("Failed to download audio: empty response body")
+
+            audio_format = detect_format(head)
+            if audio_format in STREAMABLE_FORMATS:
+                audio, decode_seconds = self._decode_streaming(head, chunks)
+            else:
+                audio, decode_seconds = self._decode_buffered(head, chunks)
 
-    # Downloads audio from a URL to a temporary file
-    # URL에서 오디오를 다운로드하여 임시 파일로 저장하는 메서드
-    def download_audio(self, url: str) -> str:
+        download = stats.to_dict()
+        logger.info(f"Downloaded {url}: {download}")
+        return audio, {
+            "format": audio_format,
+            "download": download,
+            "decode_seconds": round(decode_seconds, 4),
+            "load_seconds": round(time.perf_counter() - stats.started, 4),
+        }
+
+    def _get(self, url: str, byte_range: Optional[str] = None) -> requests.Response:
+        headers = {"Range": f"bytes={byte_range}"} if byte_range else None
         try:
             # Create a GET request with stream=True to handle large files efficiently
             # 대용량 파일을 효율적으로 처리하기 위해 stream=True로 GET 요청 생성
-            response = requests.get(url, stream=True)
+            response = self.session.get(
+                url, stream=True, timeout=self.timeout, headers=headers
+            )
             response.raise_for_status()
-
-            # Create a temporary file to save the downloaded content
-            # 다운로드한 내용을 저장할 임시 파일 생성
-            # delete=False ensures the file exists after closing, so we can pass the path to Whisper
-            # delete=False는 파일을 닫은 후에도 유지하여 Whisper에 경로를 전달할 수 있게 함
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
-                for chunk in response.iter_content(chunk_size=self.chunk_size):
-                    if chunk:
-                        temp_file.write(chunk)
-
-                # Return the absolute path of the temporary file
-                # 임시 파일의 절대 경로 반환
-                return temp_file.name
-
         except requests.RequestException as e:
             # Raise an exception if download fails
             # 다운로드 실패 시 예외 발생
             raise RuntimeError(f"Failed to download audio: {str(e)}")
+        if byte_range and response.status_code != 206:
+            response.close()
+            raise RuntimeError("Failed to download audio: server ignored Range request")
+        return response
+
+    # Yields body bytes [start, end] (end=None: to EOF). A dropped connection
+    # is resumed with a Range request from the last received byte.
+    # 본문 바이트를 순서대로 반환하며, 연결이 끊기면 마지막 바이트부터 이어받음
+    def _iter_body(
+        self,
+        url: str,
+        response: requests.Response,
+        start: int,
+        end: Optional[int],
+        resumable: bool,
+        stats: DownloadStats,
+    ):
+        position = start
+        retries = 0
+        try:
+            while True:
+                try:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        if not chunk:
+                            continue
+                        if end is not None:
+                            chunk = chunk[: end + 1 - position]
+                        stats.mark_first_byte()
+                        stats.add_bytes(len(chunk))
+                        position += len(chunk)
+                        yield chunk
+                        if end is not None and position > end:
+                            stats.finish()
+                            return
+                    stats.finish()
+                    return
+                except (
+                    requests.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError,
+                    requests.Timeout,
+                ) as e:
+                    response.close()
+                    if not resumable or retries >= settings.DOWNLOAD_MAX_RETRIES:
+                        raise RuntimeError(f"Failed to download audio: {str(e)}")
+                    retries += 1
+                    stats.add_resume()
+                    logger.warning(f"Download interrupted at byte {position}, resuming")
+                    byte_range = f"{position}-{'' if end is None else end}"
+                    response = self._get(url, byte_range)
+        finally:
+            response.close()
+
+    # Splits the object into ranges fetched concurrently on pooled connections.
+    # The first range reuses the already open response.
+    # 객체를 여러 Range로 나누어 병렬로 다운로드 (첫 구간은 기존 응답을 재사용)
+    def _download_parallel(
+        self, url: str, response: requests.Response, total: int, stats: DownloadStats
+    ) -> bytearray:
+        part_size = settings.DOWNLOAD_PART_SIZE_BYTES
+        ranges = [
+            (offset, min(offset + part_size, total) - 1)
+            for offset in range(0, total, part_size)
+        ]
+        stats.ranges = len(ranges)
+        buffer = bytearray(total)
+
+        def fill(start: int, end: int, part_response: requests.Response):
+            position = start
+            for chunk in self._iter_body(url, part_response, start, end, True, stats):
+                buffer[position : position + len(chunk)] = chunk
+                position += len(chunk)
+            if position != end + 1:
+                raise RuntimeError(
+                    f"Failed to download audio: incomplete range {start}-{end}"
+                )
+
+        def fetch(start: int, end: int):
+            fill(start, end, self._get(url, f"{start}-{end}"))
+
+        workers = min(settings.DOWNLOAD_MAX_PARALLEL, len(ranges))
+        with ThreadPoolExecutor(max_workers=max(workers - 1, 1)) as pool:
+            futures = [pool.submit(fetch, start, end) for start, end in ranges[1:]]
+            try:
+                fill(*ranges[0], response)
+            finally:
+                for future in futures:
+                    future.result()
+        return buffer
+
+    # Decode bytes already in memory (no network, no disk)
+    # 메모리에 있는 바이트를 디코딩하는 메서드
+    def decode_bytes(self, data: bytes) -> np.ndarray:
+        return self._decode(io.BytesIO(data))
+
+    def _decode_streaming(self, head: bytes, chunks) -> Tuple[np.ndarray, float]:
+        # Download thread feeds the buffer while the decoder consumes it
+        # 다운로드 스레드가 버퍼를 채우는 동안 디코더가 동시에 읽음
+        stream = StreamingBuffer()
+
+        def pump():
+            try:
+                stream.write_chunk(head)
+                for chunk in chunks:
+                    if stream.aborted:
+                        break
+                    stream.write_chunk(chunk)
+                stream.finish()
+            except Exception as e:
+                stream.finish(e)
+            finally:
+                chunks.close()
+
+        writer = threading.Thread(target=pump, daemon=True)
+        writer.start()
+        started = time.perf_counter()
+        try:
+            audio = self._decode(stream)
+            return audio, time.perf_counter() - started - stream.wait_seconds
+        except Exception:
+            stream.abort()
+            raise
+        finally:
+            writer.join()
+
+    def _decode_buffered(self, head: bytes, chunks) -> Tuple[np.ndarray, float]:
+        buffer = io.BytesIO()
+        buffer.write(head)
+        for chunk in chunks:
+            buffer.write(chunk)
+        buffer.seek(0)
+        started = time.perf_counter()
+        audio = self._decode(buffer)
+        return audio, time.perf_counter() - started
+
+    def _decode(self, source) -> np.ndarray:
+        try:
+            return decode_audio(source, sampling_rate=SAMPLING_RATE)
+        except RuntimeError:
+            raise
         except Exception as e:
-            # Raise generic exception for file IO errors
-            # 파일 IO 오류 등 일반적인 예외 처리
-            raise RuntimeError(f"Error saving audio file: {str(e)}")
-
-    # Clean up the temporary file
-    # 임시 파일 정리(삭제) 메서드
-    def cleanup_file(self, file_path: str):
-        if os.path.exists(file_path):
-            os.remove(file_path)
+            # Raise generic exception for corrupt/unsupported audio
+            # 손상되었거나 지원하지 않는 오디오 등 일반적인 예외 처리
+            raise RuntimeError(f"Error decoding audio: {str(e)}")
 
 
 # Global instance
@@ -0,0 +1,91 @@
+import logging
+from typing import Tuple
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_RATE = 16000
+
+# Energy is measured over 30 ms frames
+# 30ms 프레임 단위로 에너지 측정
+FRAME_SAMPLES = SAMPLING_RATE * 30 // 1000
+
+
+# Trims leading/trailing silence and normalizes loudness before inference
+# 추론 전에 앞뒤 무음을 잘라내고 음량을 정규화하는 클래스
+class AudioPreprocessor:
+    """
+    Works on the 16 kHz mono float32 array produced by AudioLoader (the
+    decoder resamples exactly once). Everything is vectorized over frames:
+    - A frame is speech when its RMS level is within SILENCE_RELATIVE_DB of
+      the loud (95th percentile) frames and above SILENCE_FLOOR_DBFS.
+    - Audio before the first and after the last speech frame is dropped,
+      keeping SILENCE_PAD_MS on each side.
+    - One gain brings the speech RMS to NORMALIZE_TARGET_DBFS, capped at
+      NORMALIZE_MAX_GAIN_DB and by the peak so nothing clips.
+    """
+
+    def process(self, audio: np.ndarray) -> Tuple[np.ndarray, dict]:
+        """
+        Returns (processed audio, info). info["leading_trimmed_seconds"] is
+        where the kept audio starts in the original, for shifting timestamps
+        back. Fully silent input comes back empty.
+        """
+        levels = self._frame_levels_db(audio)
+        if not len(levels):
+            return audio, self._info(audio, 0, len(audio), 0.0)
+
+        threshold = max(
+            settings.SILENCE_FLOOR_DBFS,
+            np.percentile(levels, 95) - settings.SILENCE_RELATIVE_DB,
+        )
+        speech = np.flatnonzero(levels > threshold)
+        if not len(speech):
+            return audio[:0], self._info(audio, 0, 0, 0.0)
+
+        pad = settings.SILENCE_PAD_MS * SAMPLING_RATE // 1000
+        start = max(0, int(speech[0]) * FRAME_SAMPLES - pad)
+        end = min(len(audio), (int(speech[-1]) + 1) * FRAME_SAMPLES + pad)
+        trimmed = audio[start:end]
+
+        # Mean power of the speech frames -> dBFS
+        # 음성 프레임의 평균 전력을 dBFS로 변환
+        speech_power = np.mean(np.power(10.0, levels[speech] / 10.0))
+        speech_db = 10.0 * np.log10(speech_power + 1e-12)
+        gain_db = min(
+            settings.NORMALIZE_TARGET_DBFS - speech_db, settings.NORMALIZE_MAX_GAIN_DB
+        )
+        peak = float(np.max(np.abs(trimmed)))
+        if peak > 0:
+            gain_db = min(gain_db, 20.0 * np.log10(0.99 / peak))
+        if abs(gain_db) >= 0.1:
+            # In place: the decoded array is owned by this job
+            # 디코딩된 배열은 이 작업만 사용하므로 제자리 연산
+            np.multiply(trimmed, np.float32(10.0 ** (gain_db / 20.0)), out=trimmed)
+        else:
+            gain_db = 0.0
+
+        return trimmed, self._info(audio, start, end, gain_db)
+
+    def _frame_levels_db(self, audio: np.ndarray) -> np.ndarray:
+        # RMS level (dBFS) of every full frame; the tail shorter than a frame is ignored
+        # 각 프레임의 RMS 레벨 (dBFS), 프레임보다 짧은 꼬리는 무시
+        count = len(audio) // FRAME_SAMPLES
+        frames = audio[: count * FRAME_SAMPLES].reshape(count, FRAME_SAMPLES)
+        power = np.einsum("ij,ij->i", frames, frames) / FRAME_SAMPLES
+        return 10.0 * np.log10(power + 1e-12)
+
+    def _info(self, audio: np.ndarray, start: int, end: int, gain_db: float) -> dict:
+        return {
+            "leading_trimmed_seconds": round(start / SAMPLING_RATE, 3),
+            "trailing_trimmed_seconds": round((len(audio) - end) / SAMPLING_RATE, 3),
+            "trimmed_seconds": round((len(audio) - (end - start)) / SAMPLING_RATE, 3),
+            "gain_db": round(float(gain_db), 2),
+        }
+
+
+# Global instance
+audio_preprocessor = AudioPreprocessor()
@@ -0,0 +1,114 @@
+import contextlib
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+# Only the standard library here: handler.py imports this module first so the
+# import phase itself can be timed
+# handler.py가 가장 먼저 임포트하므로 표준 라이브러리만 사용 (임포트 시간 측정용)
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+def _process_age() -> Optional[float]:
+    # Seconds since the process started (Linux only); covers interpreter
+    # startup before handler.py is imported
+    # 프로세스 시작 후 경과 시간 (Linux 전용, 인터프리터 시작 시간 포함)
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - int(fields[19]) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Phased timing of the worker cold start, reported in the warmup response
+# 워커 콜드 스타트 단계별 시간 측정 (워밍업 응답에 포함)
+class ColdStartProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.interpreter_seconds = _process_age()
+        self.phases = {}
+        self.prefetch = {}
+        self._prefetch_thread = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def record(self, name: str, seconds: float):
+        self.phases[name] = round(seconds, 3)
+        logger.info(f"Cold start phase '{name}': {seconds:.3f}s")
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def start_prefetch(self, model_path: str):
+        """
+        Reads the model files sequentially in a background thread so they are
+        in the page cache by the time CTranslate2 opens them. Runs while the
+        heavy Python imports are still going on.
+        """
+        if self._prefetch_thread is not None or not os.path.isdir(model_path):
+            return
+        self._prefetch_thread = threading.Thread(
+            target=self._prefetch, args=(model_path,), daemon=True
+        )
+        self._prefetch_thread.start()
+
+    def wait_prefetch(self):
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join()
+
+    def _prefetch(self, model_path: str):
+        started = time.perf_counter()
+        total = 0
+        buffer = bytearray(PREFETCH_CHUNK_BYTES)
+        try:
+            for name in sorted(os.listdir(model_path)):
+                path = os.path.join(model_path, name)
+                if not os.path.isfile(path):
+                    continue
+                with open(path, "rb", buffering=0) as f:
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    while True:
+                        read = f.readinto(buffer)
+                        if not read:
+                            break
+                        total += read
+        except OSError as e:
+            logger.warning(f"Model prefetch stopped: {e}")
+        self.prefetch = {
+            "bytes": total,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def mark_ready(self):
+        self.record("total", self.elapsed())
+
+    def to_dict(self) -> dict:
+        return {
+            "interpreter_seconds": (
+                round(self.interpreter_seconds, 3)
+                if self.interpreter_seconds is not None
+                else None
+            ),
+            "phases": dict(self.phases),
+            "prefetch": dict(self.prefetch),
+            "uptime_seconds": round(self.elapsed(), 3),
+        }
+
+
+# Global instance
+cold_start = ColdStartProfile()
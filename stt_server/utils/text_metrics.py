@@ -0,0 +1,49 @@
+import re
+from typing import List, Sequence
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+# Lower-case, drop punctuation and split on whitespace
+# 소문자 변환, 문장 부호 제거 후 공백 기준으로 분리
+def normalize_words(text: str) -> List[str]:
+    return _PUNCTUATION.sub(" ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Word error rate: (substitutions + deletions + insertions) / reference words.
+    단어 오류율 (WER)을 계산합니다.
+    """
+    return _error_rate(normalize_words(reference), normalize_words(hypothesis))
+
+
+def character_error_rate(reference: str, hypothesis: str) -> float:
+    """
+    Character error rate over the normalized text without spaces. Korean
+    spacing varies between transcribers, so this is the fairer metric there.
+    공백을 제외한 문자 오류율 (CER)을 계산합니다 (한국어는 띄어쓰기 차이가 커서 CER이 더 적합).
+    """
+    return _error_rate(
+        list("".join(normalize_words(reference))),
+        list("".join(normalize_words(hypothesis))),
+    )
+
+
+def _error_rate(ref: Sequence[str], hyp: Sequence[str]) -> float:
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    # Levenshtein distance, one row at a time
+    # 편집 거리 (행 단위로 계산)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_token in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_token in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_token != hyp_token),
+            )
+        previous = current
+    return previous[-1] / len(ref)